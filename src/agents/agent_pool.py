@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Tuple
+import threading
+
+from config.settings import AGENT_POOL_MAX_IDLE
+
+
+def bind_evidence(instance: Any, evidence_tracker=None) -> None:
+    """
+    Point an OrchestratorAgent's or ResearcherAgent's evidence lookup tool at
+    ``evidence_tracker``, adding the tool first in its tools, or remove it when None.
+    """
+    from tools.evidence_lookup_tool import EvidenceLookupTool
+    tools = [tool for tool in instance.agent.tools or [] if not isinstance(tool, EvidenceLookupTool)]
+    if evidence_tracker is not None:
+        tools.insert(0, EvidenceLookupTool(evidence_tracker=evidence_tracker))
+    instance.agent.tools = tools
+    instance.tools = tools
+    instance.evidence_tracker = evidence_tracker
+
+
+class AgentPool:
+    """
+    Built OrchestratorAgent and ResearcherAgent instances kept for reuse across requests
+    and sessions, so a click does not construct new agents, LLM clients and tools.
+
+    A crew changes its agents while it runs (it sets their crew and step callback), so an
+    instance is leased to one request at a time: concurrent crews, such as the steps of the
+    full pipeline, always get different instances. The evidence tracker passed to acquire() is
+    bound to an instance for its lease and unbound when it is returned, so pooled instances hold
+    no session state and their number follows peak concurrency, not the number of sessions.
+    Whoever acquires an instance returns it, with release() or release_crew(), or uses lease().
+
+    Args:
+        max_idle: Idle instances kept per class and configuration; more are dropped
+    """
+
+    def __init__(self, max_idle: int = 8):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple, List[Any]] = {}
+        # Leased instances by id of their crewai Agent, for returning the agents of a crew
+        self._leased: Dict[int, Any] = {}
+        self.built = 0
+        self.reused = 0
+
+    def acquire(self, cls: type, evidence_tracker=None, **config: Any) -> Any:
+        """An instance of ``cls`` built with ``config``, bound to ``evidence_tracker``, for one request."""
+        key = (cls, tuple(sorted(config.items())))
+        with self._lock:
+            idle = self._idle.get(key)
+            instance = idle.pop() if idle else None
+            if instance is not None:
+                self.reused += 1
+        if instance is None:
+            instance = cls(**config)
+            instance.pool_key = key
+            with self._lock:
+                self.built += 1
+        bind_evidence(instance, evidence_tracker)
+        with self._lock:
+            self._leased[id(instance.agent)] = instance
+        return instance
+
+    def release(self, *instances: Any) -> None:
+        """Return leased instances to the pool."""
+        for instance in instances:
+            with self._lock:
+                if self._leased.pop(id(instance.agent), None) is None:
+                    continue  # Not leased from this pool, or already returned
+            # Forget the last request, whose crew set these while it ran
+            bind_evidence(instance, None)
+            instance.agent.step_callback = None
+            instance.agent.crew = None
+            with self._lock:
+                idle = self._idle.setdefault(instance.pool_key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(instance)
+
+    def release_crew(self, crew: Any) -> None:
+        """Return the leased instances whose agents ``crew`` uses."""
+        with self._lock:
+            instances = [self._leased.get(id(agent)) for agent in crew.agents]
+        self.release(*[instance for instance in instances if instance is not None])
+
+    @contextmanager
+    def lease(self, cls: type, evidence_tracker=None, **config: Any) -> Iterator[Any]:
+        """acquire() an instance for the ``with`` block and release() it afterwards."""
+        instance = self.acquire(cls, evidence_tracker, **config)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'built': self.built,
+                'reused': self.reused,
+                'idle': sum(len(idle) for idle in self._idle.values()),
+                'leased': len(self._leased),
+            }
+
+
+@lru_cache(maxsize=None)
+def shared_agent_pool() -> AgentPool:
+    """The process-wide agent pool."""
+    return AgentPool(max_idle=AGENT_POOL_MAX_IDLE)
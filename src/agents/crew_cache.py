@@ -0,0 +1,136 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import re
+
+from crewai import Crew
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from utils.disk_cache import DiskCache
+
+# LLM settings that change what a model answers; anything else (keys, timeouts) does not
+MODEL_SETTINGS = (
+    'model', 'base_url', 'temperature', 'top_p', 'max_tokens', 'max_completion_tokens', 'seed',
+    'frequency_penalty', 'presence_penalty', 'stop', 'response_format', 'reasoning_effort',
+)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Prompts built from indented triple-quoted strings differ only in whitespace."""
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+
+def _llm_settings(llm: Any) -> Dict[str, Any]:
+    if llm is None or isinstance(llm, str):
+        return {'model': llm}
+    return {name: getattr(llm, name, None) for name in MODEL_SETTINGS}
+
+
+def _agent_config(agent: Any) -> Dict[str, Any]:
+    return {
+        'role': _normalize(agent.role),
+        'goal': _normalize(agent.goal),
+        'backstory': _normalize(agent.backstory),
+        'tools': sorted(tool.name for tool in agent.tools or ()),
+        'allow_delegation': agent.allow_delegation,
+        'llm': _llm_settings(agent.llm),
+    }
+
+
+def crew_key(crew: Crew) -> str:
+    """
+    Hash of everything that decides what ``crew`` answers: its process, the config and model
+    settings of every agent, and every task's prompt, expected output and output schema.
+    """
+    config = {
+        'process': str(crew.process),
+        'agents': [_agent_config(agent) for agent in crew.agents],
+        'tasks': [
+            {
+                'description': _normalize(task.description),
+                'expected_output': _normalize(task.expected_output),
+                'agent': task.agent.role if task.agent else None,
+                'output_pydantic': task.output_pydantic.model_json_schema() if task.output_pydantic else None,
+            }
+            for task in crew.tasks
+        ],
+    }
+    encoded = json.dumps(config, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+
+def _task_output_data(output: TaskOutput) -> Dict[str, Any]:
+    return {
+        'description': output.description,
+        'name': output.name,
+        'expected_output': output.expected_output,
+        'summary': output.summary,
+        'raw': output.raw,
+        'json_dict': output.json_dict,
+        'agent': output.agent,
+    }
+
+
+class CrewResultCache:
+    """
+    Crew results stored on disk under crew_key, so an identical kickoff is answered from
+    the cache instead of calling the model again.
+
+    The crews here run one task each, so a crew result is also the task's result; for
+    longer crews every task is part of the key, and the per-task outputs are restored with
+    the final one. Structured output is validated again against the last task's schema.
+    """
+
+    def __init__(self, cache: DiskCache):
+        self.cache = cache
+
+    def get(self, crew: Crew) -> Optional[CrewOutput]:
+        key = crew_key(crew)
+        stored = self.cache.get(key)
+        if stored is None:
+            return None
+        data = json.loads(stored)
+        schema = crew.tasks[-1].output_pydantic if crew.tasks else None
+        try:
+            pydantic_output = schema.model_validate(data['pydantic']) if schema and data['pydantic'] else None
+            return CrewOutput(
+                raw=data['raw'],
+                pydantic=pydantic_output,
+                json_dict=data['json_dict'],
+                tasks_output=[TaskOutput(**task) for task in data['tasks_output']],
+            )
+        except (KeyError, TypeError, ValueError):
+            # Written by a version with a different schema; run the crew again
+            self.cache.delete(key)
+            return None
+
+    def put(self, crew: Crew, output: CrewOutput) -> None:
+        data = {
+            'raw': output.raw,
+            'pydantic': output.pydantic.model_dump(mode='json') if output.pydantic is not None else None,
+            'json_dict': output.json_dict,
+            'tasks_output': [_task_output_data(task) for task in output.tasks_output],
+        }
+        self.cache.set(crew_key(crew), json.dumps(data))
+
+    def kickoff(self, crew: Crew, refresh: bool = False) -> CrewOutput:
+        """
+        Run ``crew`` unless an identical run is cached. ``refresh`` runs it anyway and
+        replaces the cached result.
+        """
+        if not refresh:
+            cached = self.get(crew)
+            if cached is not None:
+                return cached
+        output = crew.kickoff()
+        self.put(crew, output)
+        return output
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+    def clear(self) -> None:
+        self.cache.clear()
@@ -1,12 +1,33 @@
 from crewai import Agent, Task, Crew, Process
-from crewai_tools import SerperDevTool
-from typing import List, Dict
-import json
-import re
+from typing import Callable, List, Dict
+
+from agents.agent_pool import shared_agent_pool
+from config.settings import COMPETITOR_PARALLELISM, STRUCTURED_OUTPUT
+from tools.search_cache import search_tool
+from utils.json_extract import extract_json
+from utils.parallel import TaskGraph
+from utils.report_parser import parse_report
+
+# Steps of the full pipeline (create_pipeline), with the headings their outputs get downstream
+PIPELINE_STEPS = {
+    'analysis': 'Initial analysis',
+    'market_research': 'Market research',
+    'segment_research': 'Customer segment research',
+    'competitor_analysis': 'Competitor analysis',
+    'validation_plan': 'Validation plan',
+    'bmc_draft': 'Business Model Canvas draft',
+}
 
 class OrchestratorAgent:
-    def __init__(self):
-        self.tools = [SerperDevTool()]
+    def __init__(self, evidence_tracker=None, structured_output=STRUCTURED_OUTPUT):
+        # Structured output: tasks return the pydantic reports of agents/schemas.py
+        self.structured_output = structured_output
+        self.evidence_tracker = evidence_tracker
+        self.tools = [search_tool()]
+        if evidence_tracker is not None:
+            # Let the agent check what has already been researched before searching the web
+            from tools.evidence_lookup_tool import EvidenceLookupTool
+            self.tools.insert(0, EvidenceLookupTool(evidence_tracker=evidence_tracker))
         self.agent = Agent(
             role='Startup Methodology Orchestrator',
             goal='Guide the startup process following Lean Methodology principles',
@@ -21,6 +42,24 @@ class OrchestratorAgent:
 
     def create_initial_tasks(self, idea_type: str, description: str) -> list:
         """Create initial tasks based on the provided idea type and description."""
+        if self.structured_output:
+            from agents.schemas import AnalysisReport
+            analysis_task = Task(
+                description=f"""Analyze the provided {idea_type} following the Lean Startup methodology.
+                Idea: {description}
+
+                Explain your initial thoughts about this idea, then list the key assumptions
+                that need validation and why, the potential risks and challenges with their
+                impact, specific next steps based on Lean Startup methodology, what needs to
+                be validated through customer interviews/testing and how, and the initial
+                Business Model Canvas elements.
+                """,
+                expected_output="An analysis of the idea in the requested structure",
+                agent=self.agent,
+                output_pydantic=AnalysisReport
+            )
+            return [analysis_task]
+
         analysis_task = Task(
             description=f"""Analyze the provided {idea_type} following the Lean Startup methodology.
             Idea: {description}
@@ -87,21 +126,19 @@ class OrchestratorAgent:
     
     def extract_assumptions(self, analysis_output):
         """Extract key assumptions from the analysis output"""
-        try:
-            # Try to find and parse the JSON summary
-            json_pattern = r'{\s*"key_assumptions":.+}'
-            match = list(re.finditer(json_pattern, analysis_output, re.DOTALL))[-1]
-            json_str = match.group(0)
-            data = json.loads(json_str)
-            
-            # Extract assumptions as strings
-            assumptions = [f"{item['assumption']}" for item in data.get("key_assumptions", [])]
-            return assumptions
-        except:
-            # Fallback to regex extraction if JSON parsing fails
-            assumptions_pattern = r"ASSUMPTION:(.*?)REASONING:(.*?)(?=ASSUMPTION:|RISK:|$)"
-            assumptions = re.finditer(assumptions_pattern, analysis_output, re.DOTALL)
-            return [match.group(1).strip() for match in assumptions]
+        # The JSON summary is repaired if needed, so a truncated one still yields its assumptions
+        data = extract_json(analysis_output, required_key="key_assumptions")
+        if data is None:
+            # No JSON summary at all: use the ASSUMPTION: markers of the analysis
+            return [record["ASSUMPTION"] for record in parse_report(analysis_output).records("assumption")]
+        
+        # Extract assumptions as strings
+        assumptions = []
+        for item in data.get("key_assumptions") or []:
+            assumption = item.get("assumption") if isinstance(item, dict) else item
+            if assumption:
+                assumptions.append(f"{assumption}")
+        return assumptions
 
     def get_crew(self, tasks: list) -> Crew:
         """Create a crew with the orchestrator agent and specified tasks."""
@@ -119,4 +156,127 @@ class OrchestratorAgent:
             tasks=tasks,
             verbose=True,
             process=Process.sequential
-        )
\ No newline at end of file
+        )
+
+    def get_task_crew(self, task: Task) -> Crew:
+        """Create a crew that runs one task with its own agent."""
+        return Crew(
+            agents=[task.agent],
+            tasks=[task],
+            verbose=True,
+            process=Process.sequential
+        )
+
+    def _upstream(self, inputs: Dict[str, str]) -> str:
+        return "\n\n".join(f"### {PIPELINE_STEPS[name]}\n{text}" for name, text in inputs.items())
+
+    def create_validation_plan_task(self, description: str, inputs: Dict[str, str]) -> Task:
+        """Create a task that drafts the customer validation plan from earlier pipeline outputs."""
+        return Task(
+            description=f"""Draft a customer validation plan for this idea following the Lean Startup methodology.
+            Idea: {description}
+
+            Base the plan on these results of earlier steps:
+            {self._upstream(inputs)}
+
+            Pick the assumptions that most need validating before anything is built. For each,
+            say what exactly to validate and the cheapest reliable way to validate it
+            (customer interviews, landing page test, concierge MVP, ...).
+
+            End with a JSON summary following this EXACT format:
+            {{
+                "validations": [
+                    {{"validation": "...", "method": "..."}}
+                ]
+            }}
+            """,
+            expected_output="A validation plan ending with its JSON summary",
+            agent=self.agent
+        )
+
+    def create_bmc_task(self, description: str, inputs: Dict[str, str]) -> Task:
+        """Create a task that drafts the Business Model Canvas from earlier pipeline outputs."""
+        return Task(
+            description=f"""Draft the Business Model Canvas for this idea.
+            Idea: {description}
+
+            Ground every element in these results of earlier steps:
+            {self._upstream(inputs)}
+
+            End with a JSON summary following this EXACT format:
+            {{
+                "bmc_elements": {{
+                    "value_proposition": "...",
+                    "customer_segments": "...",
+                    "channels": "...",
+                    "customer_relationships": "...",
+                    "revenue_streams": "...",
+                    "key_resources": "...",
+                    "key_activities": "...",
+                    "key_partners": "...",
+                    "cost_structure": "..."
+                }}
+            }}
+            """,
+            expected_output="A Business Model Canvas draft ending with its JSON summary",
+            agent=self.agent
+        )
+
+    def create_pipeline(self, idea_type: str, description: str, run_crew: Callable[[Crew], str]) -> TaskGraph:
+        """
+        The full pipeline for an idea as a TaskGraph of one-task crews, keyed as in PIPELINE_STEPS.
+
+        Competitor analysis needs only the idea, so it starts with the initial analysis; market
+        and segment research wait for the analysis' assumptions and customer segments; the
+        validation plan and BMC draft get the outputs they build on. Steps run at the same time,
+        so each leases its own agents from the agent pool (the analysis uses this one).
+
+        Args:
+            run_crew: Kicks off a crew and returns its report text
+        """
+        from agents.researcher import ResearcherAgent
+        pool = shared_agent_pool()
+
+        def lease(cls):
+            return pool.lease(cls, self.evidence_tracker, structured_output=self.structured_output)
+
+        def analysis(inputs):
+            return run_crew(self.get_crew(self.create_initial_tasks(idea_type, description)))
+
+        def market_research(inputs):
+            with lease(OrchestratorAgent) as orchestrator, lease(ResearcherAgent) as researcher:
+                task = researcher.research_market(description, self.extract_assumptions(inputs['analysis']))
+                return run_crew(orchestrator.get_research_crew(orchestrator.agent, researcher.agent, [task]))
+
+        def segment_research(inputs):
+            summary = extract_json(inputs['analysis'], required_key="bmc_elements") or {}
+            bmc_elements = summary.get("bmc_elements") if isinstance(summary.get("bmc_elements"), dict) else {}
+            segment = bmc_elements.get("customer_segments") or description
+            with lease(ResearcherAgent) as researcher:
+                return run_crew(self.get_task_crew(researcher.research_customer_segment(segment)))
+
+        def competitor_analysis(inputs):
+            with lease(ResearcherAgent) as researcher:
+                if COMPETITOR_PARALLELISM:
+                    return researcher.run_competitor_analysis(
+                        None, description, run_crew, max_workers=COMPETITOR_PARALLELISM
+                    )
+                return run_crew(self.get_task_crew(researcher.analyze_competitors(industry=description)))
+
+        def validation_plan(inputs):
+            with lease(OrchestratorAgent) as orchestrator:
+                return run_crew(orchestrator.get_crew([orchestrator.create_validation_plan_task(description, inputs)]))
+
+        def bmc_draft(inputs):
+            with lease(OrchestratorAgent) as orchestrator:
+                return run_crew(orchestrator.get_crew([orchestrator.create_bmc_task(description, inputs)]))
+
+        graph = TaskGraph()
+        graph.add('analysis', analysis)
+        graph.add('market_research', market_research, depends_on=['analysis'])
+        graph.add('segment_research', segment_research, depends_on=['analysis'])
+        graph.add('competitor_analysis', competitor_analysis)
+        graph.add('validation_plan', validation_plan, depends_on=['analysis', 'market_research', 'segment_research'])
+        graph.add('bmc_draft', bmc_draft,
+                  depends_on=['analysis', 'market_research', 'segment_research', 'competitor_analysis'])
+        return graph
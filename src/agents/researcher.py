@@ -1,16 +1,31 @@
 # src/agents/researcher.py
-from crewai import Agent, Task
-from crewai_tools import SerperDevTool, WebsiteSearchTool, ScrapeWebsiteTool, FileReadTool
+from typing import Callable, Dict, List, Optional
+
+from crewai import Agent, Crew, Process, Task
+from crewai_tools import FileReadTool
+
+from agents.agent_pool import shared_agent_pool
+from config.settings import COMPETITOR_FANOUT_MAX, STRUCTURED_OUTPUT
+from tools.search_cache import search_tool
+from tools.web_cache import web_tools
+from utils.json_extract import extract_json
+from utils.parallel import run_concurrently
 
 class ResearcherAgent:
-    def __init__(self):
+    def __init__(self, evidence_tracker=None, structured_output=STRUCTURED_OUTPUT):
+        # Structured output: tasks return the pydantic reports of agents/schemas.py
+        self.structured_output = structured_output
+        self.evidence_tracker = evidence_tracker
         # Enhanced tools for the researcher
         self.tools = [
-            SerperDevTool(),
-            WebsiteSearchTool(),
-            ScrapeWebsiteTool(),
+            search_tool(),
+            *web_tools(),  # Website search and scrape, cached per page and chunk
             FileReadTool()  # For reading uploaded files from user validation
         ]
+        if evidence_tracker is not None:
+            # Checked first so earlier findings are reused instead of re-searched
+            from tools.evidence_lookup_tool import EvidenceLookupTool
+            self.tools.insert(0, EvidenceLookupTool(evidence_tracker=evidence_tracker))
         self.agent = Agent(
             role='Market Research Specialist',
             goal='Gather comprehensive market data and competitor information to validate startup ideas',
@@ -26,6 +41,30 @@ class ResearcherAgent:
 
     def research_market(self, idea_description, key_assumptions, industry=None):
         """Create a task to research the market based on the idea and assumptions."""
+        if self.structured_output:
+            from agents.schemas import MarketResearchReport
+            return Task(
+                description=f"""Research the market potential and competitive landscape for this idea:
+                {idea_description}
+
+                Focus specifically on validating these key assumptions:
+                {key_assumptions}
+
+                Industry focus (if specified): {industry if industry else 'Not specified'}
+
+                Cover the market size and growth trends, 3-5 similar companies or direct
+                competitors, customer pain points with evidence and quotes, pricing models of
+                similar services, relevant regulations, current market trends and their impact
+                on the idea, a conclusion on each assumption, and specific recommendations.
+
+                Cite a source (URL or reference) for every finding and use specific numbers and
+                percentages when available.
+                """,
+                expected_output="Market research findings in the requested structure, with cited sources",
+                agent=self.agent,
+                output_pydantic=MarketResearchReport
+            )
+
         market_research_task = Task(
             description=f"""Research the market potential and competitive landscape for this idea:
             {idea_description}
@@ -115,6 +154,26 @@ class ResearcherAgent:
         
     def research_customer_segment(self, customer_segment, pain_points=None):
         """Create a task to research a specific customer segment in depth."""
+        if self.structured_output:
+            from agents.schemas import SegmentProfileReport
+            return Task(
+                description=f"""Conduct in-depth research on this customer segment:
+                {customer_segment}
+
+                {f'Potential pain points to consider: {pain_points}' if pain_points else ''}
+
+                Cover the demographic and psychographic profile of the segment, where these
+                customers hang out online and offline, pain points in the customers' own words,
+                existing solutions they use and their gaps, willingness to pay and buying
+                behavior, and specific recommendations for targeting the segment.
+
+                Cite a source (URL or reference) for every finding.
+                """,
+                expected_output="A customer segment analysis in the requested structure, with cited sources",
+                agent=self.agent,
+                output_pydantic=SegmentProfileReport
+            )
+
         segment_research_task = Task(
             description=f"""Conduct in-depth research on this customer segment:
             {customer_segment}
@@ -188,6 +247,25 @@ class ResearcherAgent:
     def analyze_competitors(self, competitors=None, industry=None):
         """Create a task to analyze specific competitors or competitors in an industry."""
         competitors_str = ", ".join(competitors) if competitors and isinstance(competitors, list) else "not specified"
+
+        if self.structured_output:
+            from agents.schemas import CompetitorProfileReport
+            return Task(
+                description=f"""Conduct a detailed competitive analysis for:
+
+                Specific competitors to analyze: {competitors_str}
+                Industry: {industry if industry else 'Not specified'}
+
+                Map the direct, indirect and potential future competitors, profile each major
+                competitor in detail, analyze market positioning, review customer feedback on
+                each competitor, and recommend a competitive strategy.
+
+                Cite a source (URL or reference) for every finding.
+                """,
+                expected_output="A competitive analysis in the requested structure, with cited sources",
+                agent=self.agent,
+                output_pydantic=CompetitorProfileReport
+            )
         
         competitor_analysis_task = Task(
             description=f"""Conduct a detailed competitive analysis for:
@@ -255,4 +333,185 @@ class ResearcherAgent:
             agent=self.agent
         )
         
-        return competitor_analysis_task
\ No newline at end of file
+        return competitor_analysis_task
+
+    def identify_competitors(self, industry, limit=COMPETITOR_FANOUT_MAX):
+        """Create a task that names the main competitors in an industry, as JSON."""
+        return Task(
+            description=f"""Identify the {limit} most important competitors for:
+
+            Industry: {industry}
+
+            Include direct competitors first, then the strongest indirect ones. Only name
+            companies or products you found evidence of; do not profile them yet.
+
+            End your answer with this JSON:
+            {{"competitors": ["<name>", "<name>", ...]}}
+            """,
+            expected_output=f"A JSON object listing at most {limit} competitor names",
+            agent=self.agent
+        )
+
+    def profile_competitor(self, competitor, industry=None):
+        """Create a task that profiles one competitor: the map step of run_competitor_analysis."""
+        if self.structured_output:
+            from agents.schemas import CompetitorDeepDive
+            return Task(
+                description=f"""Research one competitor in depth:
+
+                Competitor: {competitor}
+                Industry: {industry if industry else 'Not specified'}
+
+                Profile the company and summarize what its customers like and dislike about it.
+                Cite a source (URL or reference) for every finding.
+                """,
+                expected_output="The competitor's profile and customer feedback, with cited sources",
+                agent=self.agent,
+                output_pydantic=CompetitorDeepDive
+            )
+
+        return Task(
+            description=f"""Research one competitor in depth:
+
+            Competitor: {competitor}
+            Industry: {industry if industry else 'Not specified'}
+
+            Answer in exactly this format and nothing else:
+            COMPETITOR PROFILE:
+            NAME: {competitor}
+            COMPANY SIZE: <employees, funding if available>
+            FOUNDING DATE: <when founded>
+            BUSINESS MODEL: <how they make money>
+            TARGET CUSTOMERS: <who they serve>
+            UNIQUE VALUE PROPOSITION: <what makes them unique>
+            KEY FEATURES: <main product/service features>
+            PRICING STRATEGY: <pricing details>
+            GO-TO-MARKET STRATEGY: <how they acquire customers>
+            STRENGTHS: <competitive advantages>
+            WEAKNESSES: <limitations or disadvantages>
+            SOURCE: <where you found this information>
+
+            CUSTOMER FEEDBACK:
+            COMPETITOR: {competitor}
+            POSITIVE FEEDBACK: <what customers like>
+            NEGATIVE FEEDBACK: <what customers dislike>
+            SOURCE: <where you found this information>
+
+            Keep every field on one line and cite your sources clearly using URLs or references.
+            """,
+            expected_output="One competitor profile and its customer feedback, in the given format",
+            agent=self.agent
+        )
+
+    def summarize_competitors(self, profiles: Dict[str, str], industry=None):
+        """
+        Create a task that draws the landscape, positioning and strategy sections from finished
+        competitor profiles: the reduce step of run_competitor_analysis.
+        """
+        profiles_text = "\n\n".join(profiles.values())
+        context = f"""Industry: {industry if industry else 'Not specified'}
+
+            Competitor profiles, already researched (build on them rather than researching
+            each competitor again):
+            {profiles_text}
+"""
+        if self.structured_output:
+            from agents.schemas import CompetitorOverview
+            return Task(
+                description=f"""Summarize the competitive landscape from these profiles.
+
+            {context}
+            Map the direct, indirect and potential future competitors, analyze market
+            positioning and recommend a competitive strategy. Cite a source for every finding.
+            """,
+                expected_output="The competitor landscape, market positioning and strategy, with cited sources",
+                agent=self.agent,
+                output_pydantic=CompetitorOverview
+            )
+
+        return Task(
+            description=f"""Summarize the competitive landscape from these profiles.
+
+            {context}
+            Answer in exactly this format, without repeating the profiles:
+            COMPETITOR LANDSCAPE:
+            DIRECT COMPETITORS: <list of direct competitors>
+            INDIRECT COMPETITORS: <list of indirect competitors>
+            POTENTIAL FUTURE COMPETITORS: <emerging players>
+            SOURCE: <where you found this information>
+
+            MARKET POSITIONING:
+            MARKET LEADERS: <who dominates and why>
+            MARKET GAPS: <underserved segments or needs>
+            DIFFERENTIATION FACTORS: <how companies differentiate>
+            SOURCE: <where you found this information>
+
+            COMPETITIVE STRATEGY:
+            1. <recommendation>
+            2. <recommendation>
+            ...
+            """,
+            expected_output="The competitor landscape, market positioning and competitive strategy sections",
+            agent=self.agent
+        )
+
+    def get_task_crew(self, task: Task) -> Crew:
+        """Create a crew that runs one task with its own agent."""
+        return Crew(
+            agents=[task.agent],
+            tasks=[task],
+            verbose=True,
+            process=Process.sequential
+        )
+
+    def run_competitor_analysis(self, competitors: Optional[List[str]], industry, run_crew: Callable[[Crew], str],
+                                max_workers: Optional[int] = None,
+                                progress: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Analyze competitors map-reduce style and return the report text: one small crew per
+        competitor (up to ``max_workers`` at once), then one that summarizes their profiles.
+        It takes about as long as the slowest profile plus the summary, however many
+        competitors there are. Without ``competitors`` the main ones in ``industry`` are
+        identified first. Profiles that fail are left out; if all of them fail, so does this.
+
+        Args:
+            run_crew: Kicks off a crew and returns its report text
+            max_workers: Most competitors profiled at once (default: all of them)
+            progress: Called with a short status message as profiles finish
+        """
+        report = progress or (lambda message: None)
+        names = list(dict.fromkeys(name.strip() for name in competitors or [] if name and name.strip()))
+        if not names:
+            report("Identifying competitors")
+            found = extract_json(run_crew(self.get_task_crew(self.identify_competitors(industry))),
+                                 required_key="competitors") or {}
+            names = [str(name).strip() for name in found.get("competitors") or [] if str(name).strip()]
+            names = list(dict.fromkeys(names))[:COMPETITOR_FANOUT_MAX]
+            if not names:
+                raise ValueError(f"No competitors identified for {industry!r}")
+
+        def profile(name):
+            # Profiles run at the same time, so each leases its own agent
+            with shared_agent_pool().lease(ResearcherAgent, self.evidence_tracker,
+                                           structured_output=self.structured_output) as researcher:
+                return run_crew(self.get_task_crew(researcher.profile_competitor(name, industry)))
+
+        profiles: Dict[str, str] = {}
+        errors = {}
+        report(f"Profiling {len(names)} competitors")
+        for name, text, error in run_concurrently({name: (lambda n=name: profile(n)) for name in names},
+                                                  max_workers=max_workers):
+            if error is None:
+                profiles[name] = text.strip()
+            else:
+                errors[name] = error
+            report(f"{len(profiles) + len(errors)} of {len(names)} competitors profiled")
+        if not profiles:
+            raise RuntimeError("; ".join(f"{name}: {error}" for name, error in errors.items()))
+
+        # In the order they were asked for, not the order they finished
+        profiles = {name: profiles[name] for name in names if name in profiles}
+        report("Summarizing the competitor landscape")
+        overview = run_crew(self.get_task_crew(self.summarize_competitors(profiles, industry)))
+        # Sections end at a blank line, so the parts can simply be joined
+        return "\n\n".join([overview.strip(), *profiles.values()]) + "\n"
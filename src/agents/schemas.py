@@ -0,0 +1,402 @@
+"""
+Output schemas for the analysis and research tasks in structured-output mode.
+
+With STRUCTURED_OUTPUT on, each task passes one of the report models below as
+``output_pydantic``, so the crew returns a validated object instead of marker text and a
+JSON summary that have to be scraped. A report renders itself to the marker format
+(``to_report``) so evidence, session state and the marker parser keep working on text,
+and builds the parsed views of that text directly (``to_document``).
+"""
+from typing import ClassVar, Dict, Iterator, List, Optional, Tuple
+import json
+import re
+
+from pydantic import BaseModel, Field
+
+from utils.report_parser import BMC_MARKER, OPTIONAL_FIELDS, RECORDS, Record, ReportDocument, Section
+
+_BLANK_LINES = re.compile(r'\n\s*\n')
+
+
+def _clean(value) -> str:
+    """Field text as the marker parser returns it; blank lines would end a section early."""
+    if isinstance(value, list):
+        value = ' '.join(f'- {item.strip()}' for item in value if item.strip())
+    return _BLANK_LINES.sub('\n', str(value)).strip()
+
+
+def _lines(fields: Dict[str, str]) -> str:
+    return '\n'.join(f'{marker}: {value}' for marker, value in fields.items())
+
+
+class RecordModel(BaseModel):
+    """A repeated entry; its fields map, in order, to the markers of RECORDS[KIND]."""
+    KIND: ClassVar[str]
+
+    def marker_fields(self) -> Dict[str, str]:
+        fields = {}
+        for name, marker in zip(type(self).model_fields, RECORDS[self.KIND]):
+            value = _clean(getattr(self, name))
+            if value or marker not in OPTIONAL_FIELDS:
+                fields[marker] = value
+        return fields
+
+
+class SectionModel(BaseModel):
+    """A section of labelled subfields; each field's marker is its upper-cased name."""
+    SECTION: ClassVar[str]
+
+    def marker_fields(self) -> Dict[str, str]:
+        fields = {}
+        for name in type(self).model_fields:
+            value = _clean(getattr(self, name))
+            if value:
+                fields[name.upper().replace('_', ' ')] = value
+        return fields
+
+
+class StructuredReport(BaseModel):
+    """Base for task outputs; subclasses list their parts in report order in ``_parts``."""
+
+    def _parts(self) -> List[Tuple[str, object]]:
+        """(marker, value) pairs: text, a list of steps, a section model or a list of records."""
+        raise NotImplementedError
+
+    def _bmc_elements(self) -> List[Tuple[str, str]]:
+        return []
+
+    def summary(self) -> Optional[dict]:
+        """The JSON summary the marker-format task appends, if this kind of report has one."""
+        return None
+
+    def _blocks(self) -> Iterator[Tuple[str, Optional[Section], Optional[Record]]]:
+        """(text, section, record) for each block of the rendered report, in order."""
+        for marker, value in self._parts():
+            if isinstance(value, SectionModel):
+                fields = value.marker_fields()
+                if fields:
+                    body = _lines(fields)
+                    yield f'{marker}:\n{body}', Section(marker, body, fields), None
+            elif value and isinstance(value, list) and isinstance(value[0], RecordModel):
+                for record in value:
+                    fields = record.marker_fields()
+                    yield _lines(fields), None, Record(record.KIND, fields)
+            elif isinstance(value, list):
+                steps = [step for step in map(_clean, value) if step]
+                if steps:
+                    body = '\n'.join(f'{i}. {step}' for i, step in enumerate(steps, 1))
+                    yield f'{marker}:\n{body}', Section(marker, body, {}), None
+            elif _clean(value):
+                yield f'{marker}: {_clean(value)}', Section(marker, _clean(value), {}), None
+
+    def to_report(self) -> str:
+        """
+        Render to the marker format the text tasks produce. The JSON summary goes first, so
+        the value of the last marker does not run on into it.
+        """
+        blocks = [text for text, _, _ in self._blocks()]
+        elements = self._bmc_elements()
+        if elements:
+            blocks.append('\n'.join(f'{BMC_MARKER} - {name}: {text}' for name, text in elements))
+        summary = self.summary()
+        if summary is not None:
+            blocks.insert(0, json.dumps(summary, indent=2, ensure_ascii=False))
+        return '\n\n'.join(blocks) + '\n'
+
+    def to_document(self, text: Optional[str] = None) -> ReportDocument:
+        """The parsed views of ``to_report()``, built from the fields without parsing."""
+        sections: Dict[str, Section] = {}
+        records: Dict[str, List[Record]] = {}
+        for _, section, record in self._blocks():
+            if section is not None:
+                sections.setdefault(section.marker, section)
+            else:
+                records.setdefault(record.kind, []).append(record)
+        return ReportDocument.prebuilt(
+            self.to_report() if text is None else text,
+            sections, records, self._bmc_elements(), self.summary()
+        )
+
+
+# Initial analysis
+
+class Assumption(RecordModel):
+    KIND: ClassVar[str] = 'assumption'
+    assumption: str = Field(description="An assumption the idea depends on")
+    reasoning: str = Field(description="Why it needs validation")
+
+
+class Risk(RecordModel):
+    KIND: ClassVar[str] = 'risk'
+    risk: str = Field(description="The risk or challenge")
+    impact: str = Field(description="Its potential impact")
+
+
+class Validation(RecordModel):
+    KIND: ClassVar[str] = 'validation'
+    validation: str = Field(description="What to validate with customers")
+    method: str = Field(description="How to validate it")
+
+
+class BMCElements(BaseModel):
+    value_proposition: str = ""
+    customer_segments: str = ""
+    channels: str = ""
+    customer_relationships: str = ""
+    revenue_streams: str = ""
+    key_resources: str = ""
+    key_activities: str = ""
+    key_partners: str = ""
+    cost_structure: str = ""
+
+
+class AnalysisReport(StructuredReport):
+    initial_thoughts: str = Field(description="Initial thoughts about the idea")
+    key_assumptions: List[Assumption] = Field(default_factory=list)
+    risks_and_challenges: List[Risk] = Field(default_factory=list)
+    next_steps: List[str] = Field(default_factory=list, description="Next steps following Lean Startup")
+    validations_needed: List[Validation] = Field(default_factory=list)
+    bmc_elements: BMCElements = Field(default_factory=BMCElements, description="Initial Business Model Canvas")
+
+    def _parts(self):
+        return [
+            ('INITIAL THOUGHTS', self.initial_thoughts),
+            ('ASSUMPTION', self.key_assumptions),
+            ('RISK', self.risks_and_challenges),
+            ('NEXT STEPS', self.next_steps),
+            ('VALIDATION NEEDED', self.validations_needed),
+        ]
+
+    def _bmc_elements(self):
+        return [
+            (name.replace('_', ' ').title(), _clean(text))
+            for name, text in self.bmc_elements.model_dump().items() if _clean(text)
+        ]
+
+    def summary(self):
+        return self.model_dump(exclude={'initial_thoughts'})
+
+
+# Market research
+
+class Competitor(RecordModel):
+    KIND: ClassVar[str] = 'competitor'
+    name: str
+    description: str = Field(description="What they do")
+    strengths: List[str]
+    weaknesses: List[str]
+    business_model: str = Field(description="How they make money")
+    market_share: str = Field(description="Estimated market share, if available")
+    target_audience: str
+    source: str = Field(default="", description="URL or reference for this information")
+
+
+class CustomerInsight(RecordModel):
+    KIND: ClassVar[str] = 'insight'
+    pain_point: str
+    evidence: str = Field(description="Evidence this pain point exists")
+    customer_quote: str = Field(description="Direct quote from a customer, if available")
+    source: str = Field(default="", description="URL or reference for this information")
+
+
+class PricingModel(RecordModel):
+    KIND: ClassVar[str] = 'pricing_model'
+    model_type: str = Field(description="Subscription, one-time, freemium, etc.")
+    price_range: str
+    value_metrics: str = Field(description="What customers are willing to pay for")
+    competitor_examples: str
+    source: str = Field(default="", description="URL or reference for this information")
+
+
+class MarketTrend(RecordModel):
+    KIND: ClassVar[str] = 'trend'
+    trend: str
+    evidence: str
+    impact_on_business: str
+    source: str = Field(default="", description="URL or reference for this information")
+
+
+class AssumptionValidation(RecordModel):
+    KIND: ClassVar[str] = 'assumption_validation'
+    assumption: str
+    evidence: str = Field(description="Supporting or contradicting evidence")
+    conclusion: str = Field(description="Validated, partially validated or invalidated")
+    confidence: str = Field(description="High, medium or low")
+    sources: str = Field(default="", description="URLs or references")
+
+
+class MarketResearchReport(StructuredReport):
+    market_size_and_trends: str = Field(description="Market size and growth, with sources")
+    competitors: List[Competitor] = Field(default_factory=list)
+    customer_insights: List[CustomerInsight] = Field(default_factory=list)
+    pricing_models: List[PricingModel] = Field(default_factory=list)
+    regulatory_factors: str = Field(default="", description="Relevant regulations, with sources")
+    market_trends: List[MarketTrend] = Field(default_factory=list)
+    assumption_validations: List[AssumptionValidation] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+
+    def _parts(self):
+        return [
+            ('MARKET SIZE AND TRENDS', self.market_size_and_trends),
+            ('COMPETITOR', self.competitors),
+            ('PAIN POINT', self.customer_insights),
+            ('MODEL TYPE', self.pricing_models),
+            ('REGULATORY FACTORS', self.regulatory_factors),
+            ('TREND', self.market_trends),
+            ('ASSUMPTION', self.assumption_validations),
+            ('RECOMMENDATIONS', self.recommendations),
+        ]
+
+
+# Customer segment
+
+class SegmentProfile(SectionModel):
+    SECTION: ClassVar[str] = 'SEGMENT PROFILE'
+    demographics: str = Field(description="Age, gender, location, income, etc.")
+    psychographics: str = Field(description="Values, interests, lifestyle, behaviors")
+    market_size: str
+    growth_trends: str
+    source: str = ""
+
+
+class CustomerChannels(SectionModel):
+    SECTION: ClassVar[str] = 'CUSTOMER CHANNELS'
+    online_channels: str = Field(description="Websites, forums, social media")
+    offline_channels: str = Field(description="Events, locations, communities")
+    influential_voices: str = Field(description="Thought leaders, influencers")
+    source: str = ""
+
+
+class CustomerPainPoint(RecordModel):
+    KIND: ClassVar[str] = 'pain_point'
+    pain_point: str
+    direct_quotes: List[str] = Field(description="How customers describe it in their own words")
+    frequency: str = Field(description="How often this is mentioned")
+    source: str = ""
+
+    def marker_fields(self):
+        fields = super().marker_fields()
+        # Quotes are shown one per line
+        fields['DIRECT QUOTES'] = '\n'.join(_clean(quote) for quote in self.direct_quotes if _clean(quote))
+        return fields
+
+
+class ExistingSolution(RecordModel):
+    KIND: ClassVar[str] = 'solution'
+    solution: str = Field(description="Product or service name")
+    usage: str
+    satisfaction: str
+    gaps: str = Field(description="Unmet needs")
+    source: str = ""
+
+
+class BuyingBehavior(SectionModel):
+    SECTION: ClassVar[str] = 'BUYING BEHAVIOR'
+    price_sensitivity: str = Field(description="High, medium or low")
+    decision_factors: str
+    purchasing_process: str
+    source: str = ""
+
+
+class SegmentProfileReport(StructuredReport):
+    segment_profile: SegmentProfile
+    customer_channels: CustomerChannels
+    customer_language: List[CustomerPainPoint] = Field(default_factory=list)
+    existing_solutions: List[ExistingSolution] = Field(default_factory=list)
+    buying_behavior: BuyingBehavior
+    targeting_recommendations: List[str] = Field(default_factory=list)
+
+    def _parts(self):
+        return [
+            (SegmentProfile.SECTION, self.segment_profile),
+            (CustomerChannels.SECTION, self.customer_channels),
+            ('PAIN POINT', self.customer_language),
+            ('SOLUTION', self.existing_solutions),
+            (BuyingBehavior.SECTION, self.buying_behavior),
+            ('TARGETING RECOMMENDATIONS', self.targeting_recommendations),
+        ]
+
+
+# Competitor analysis
+
+class CompetitorLandscape(SectionModel):
+    SECTION: ClassVar[str] = 'COMPETITOR LANDSCAPE'
+    direct_competitors: str
+    indirect_competitors: str
+    potential_future_competitors: str = Field(description="Emerging players")
+    source: str = ""
+
+
+class CompetitorProfile(RecordModel):
+    KIND: ClassVar[str] = 'competitor_profile'
+    name: str
+    company_size: str = Field(description="Employees, funding if available")
+    founding_date: str
+    business_model: str
+    target_customers: str
+    unique_value_proposition: str
+    key_features: str
+    pricing_strategy: str
+    go_to_market_strategy: str
+    strengths: List[str]
+    weaknesses: List[str]
+    source: str = ""
+
+
+class MarketPositioning(SectionModel):
+    SECTION: ClassVar[str] = 'MARKET POSITIONING'
+    market_leaders: str = Field(description="Who dominates and why")
+    market_gaps: str = Field(description="Underserved segments or needs")
+    differentiation_factors: str
+    source: str = ""
+
+
+class CustomerFeedback(RecordModel):
+    KIND: ClassVar[str] = 'feedback'
+    competitor: str
+    positive_feedback: List[str]
+    negative_feedback: List[str]
+    source: str = ""
+
+
+class CompetitorProfileReport(StructuredReport):
+    competitor_landscape: CompetitorLandscape
+    competitor_profiles: List[CompetitorProfile] = Field(default_factory=list)
+    market_positioning: MarketPositioning
+    customer_feedback: List[CustomerFeedback] = Field(default_factory=list)
+    competitive_strategy: List[str] = Field(default_factory=list)
+
+    def _parts(self):
+        return [
+            (CompetitorLandscape.SECTION, self.competitor_landscape),
+            ('NAME', self.competitor_profiles),
+            (MarketPositioning.SECTION, self.market_positioning),
+            ('COMPETITOR', self.customer_feedback),
+            ('COMPETITIVE STRATEGY', self.competitive_strategy),
+        ]
+
+
+class CompetitorDeepDive(StructuredReport):
+    """One competitor's profile and customer feedback: the map step of a fanned-out analysis."""
+    competitor_profile: CompetitorProfile
+    customer_feedback: Optional[CustomerFeedback] = None
+
+    def _parts(self):
+        return [
+            ('NAME', [self.competitor_profile]),
+            ('COMPETITOR', [self.customer_feedback] if self.customer_feedback else []),
+        ]
+
+
+class CompetitorOverview(StructuredReport):
+    """The sections drawn from all competitor profiles: the reduce step of a fanned-out analysis."""
+    competitor_landscape: CompetitorLandscape
+    market_positioning: MarketPositioning
+    competitive_strategy: List[str] = Field(default_factory=list)
+
+    def _parts(self):
+        return [
+            (CompetitorLandscape.SECTION, self.competitor_landscape),
+            (MarketPositioning.SECTION, self.market_positioning),
+            ('COMPETITIVE STRATEGY', self.competitive_strategy),
+        ]
@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import hashlib
+import threading
+
+from tools.evidence_vectors import default_embedder
+
+# Match threshold for embedders that do not declare a match_threshold of their own
+DEFAULT_THRESHOLD = 0.75
+
+
+def request_text(idea: str, assumptions: Optional[List[str]] = None) -> str:
+    """The text a request is embedded by: the idea description followed by its assumptions."""
+    parts = [(idea or '').strip()]
+    parts.extend(assumption.strip() for assumption in assumptions or () if assumption)
+    return '\n'.join(part for part in parts if part)
+
+
+class SemanticReportCache:
+    """
+    Reports of earlier analyses and research runs, found again by the meaning of the request.
+
+    Each report is stored in a Chroma collection (next to the evidence index) under the
+    embedding of its idea description and assumptions, so a request that only rewords an
+    earlier one ("ADHD learning game for kids" / "educational game for children with ADHD")
+    finds its report. As in EvidenceVectorIndex, the collection name includes the embedder
+    name. Similarity scores are not comparable across embedders (the hashing fallback
+    only counts shared words), so each embedder brings its own ``match_threshold``.
+    A match is only offered to the user, who can still run the request again.
+
+    Args:
+        db_path: Chroma directory
+        threshold: Lowest cosine similarity that counts as the same request (default:
+            the embedder's match_threshold, else DEFAULT_THRESHOLD)
+        embedder: Text embedder (default: see tools.evidence_vectors.default_embedder)
+    """
+
+    def __init__(self, db_path: str = 'db', threshold: Optional[float] = None, embedder=None,
+                 collection_prefix: str = 'reports'):
+        import chromadb
+
+        self.embedder = embedder or default_embedder()
+        self.threshold = threshold or getattr(self.embedder, 'match_threshold', DEFAULT_THRESHOLD)
+        self._lock = threading.Lock()
+        self._client = chromadb.PersistentClient(path=db_path)
+        self._collection = self._client.get_or_create_collection(
+            name=f"{collection_prefix}-{self.embedder.name}",
+            embedding_function=None,
+            metadata={'hnsw:space': 'cosine'},
+        )
+
+    @staticmethod
+    def _id(kind: str, text: str) -> str:
+        # Resubmitting the same request replaces its report instead of adding another
+        normalized = ' '.join(text.lower().split())
+        return f"{kind}::" + hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def add(self, kind: str, idea: str, report: str, assumptions: Optional[List[str]] = None) -> None:
+        """
+        Remember ``report`` as the answer to a request.
+
+        Args:
+            kind: What the report is, e.g. "analysis" or "market_research"
+            idea: Idea description of the request
+            report: Report text to offer for similar requests
+            assumptions: Key assumptions the request was about, if any
+        """
+        text = request_text(idea, assumptions)
+        if not text or not report:
+            return
+        with self._lock:
+            self._collection.upsert(
+                ids=[self._id(kind, text)],
+                embeddings=self.embedder.embed([text]),
+                documents=[text],
+                metadatas=[{
+                    'kind': kind,
+                    'idea': idea,
+                    'report': report,
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                }],
+            )
+
+    def lookup(self, kind: str, idea: str, assumptions: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the stored report of the most similar earlier request of this kind.
+
+        Returns:
+            The 'idea', 'report', 'created' time and cosine similarity 'score' of the best
+            match, or None if no earlier request reaches the threshold
+        """
+        text = request_text(idea, assumptions)
+        if not text:
+            return None
+        with self._lock:
+            if self._collection.count() == 0:
+                return None
+            result = self._collection.query(
+                query_embeddings=self.embedder.embed([text]),
+                n_results=1,
+                where={'kind': kind},
+                include=['metadatas', 'distances'],
+            )
+        if not result['ids'][0]:
+            return None
+        score = 1.0 - result['distances'][0][0]
+        if score < self.threshold:
+            return None
+        metadata = result['metadatas'][0][0]
+        return {
+            'idea': metadata['idea'],
+            'report': metadata['report'],
+            'created': metadata['created'],
+            'score': score,
+        }
+
+    def clear(self) -> None:
+        """Forget every stored report."""
+        with self._lock:
+            existing = self._collection.get(include=[])['ids']
+            if existing:
+                self._collection.delete(ids=existing)
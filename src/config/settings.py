@@ -0,0 +1,93 @@
+import os
+
+# Evidence storage: "json" rewrites one JSON file per change, "journal" appends to a compacted log,
+# "sqlite" keeps evidence in an indexed database (the JSON file is migrated on first run)
+EVIDENCE_STORAGE_PATH = os.getenv("EVIDENCE_STORAGE_PATH", "data/evidence.json")
+EVIDENCE_STORAGE_MODE = os.getenv("EVIDENCE_STORAGE_MODE", "sqlite")
+
+# Chroma directory for the evidence similarity index; set to an empty string to disable it
+EVIDENCE_VECTOR_DB_PATH = os.getenv("EVIDENCE_VECTOR_DB_PATH", "db")
+
+# Write evidence on a background thread that batches bursts of changes ("0" writes synchronously)
+EVIDENCE_ASYNC_WRITES = os.getenv("EVIDENCE_ASYNC_WRITES", "1") not in ("0", "false", "False")
+
+# Journal mode: keep only evidence metadata in memory and read content from disk on demand
+EVIDENCE_LAZY_CONTENT = os.getenv("EVIDENCE_LAZY_CONTENT", "1") not in ("0", "false", "False")
+
+# Codec for stored evidence bodies in sqlite and lazy journal mode: "zlib", "lzma" or "none"
+EVIDENCE_COMPRESSION = os.getenv("EVIDENCE_COMPRESSION", "zlib")
+
+# Evidence retention. Caps apply to evictable evidence (customer interviews are always kept);
+# an empty value disables a cap. EVIDENCE_TTL_DAYS expires types by age, e.g.
+# "market_research=30,competitor_analysis=60". Eviction order is "lru" or "oldest".
+EVIDENCE_MAX_ITEMS = int(os.getenv("EVIDENCE_MAX_ITEMS", "10000") or 0) or None
+EVIDENCE_MAX_BYTES = int(os.getenv("EVIDENCE_MAX_BYTES", str(500 * 1024 * 1024)) or 0) or None
+EVIDENCE_TTL_DAYS = {
+    evidence_type.strip(): float(days)
+    for evidence_type, days in (
+        item.split("=", 1) for item in os.getenv("EVIDENCE_TTL_DAYS", "").split(",") if "=" in item
+    )
+}
+EVIDENCE_EVICTION = os.getenv("EVIDENCE_EVICTION", "lru")
+
+# Parsed agent reports kept per session, so reruns reuse them instead of parsing again
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "16"))
+
+# Have tasks return validated pydantic reports (agents/schemas.py) instead of marker text
+# plus a JSON summary; off by default
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "0") not in ("0", "false", "False")
+
+# Crew results cached on disk so identical runs skip the model; an empty path disables it.
+# Entries expire after CREW_CACHE_TTL_HOURS (empty: never) and the least recently used go
+# first once either cap is exceeded (empty: no cap).
+CREW_CACHE_PATH = os.getenv("CREW_CACHE_PATH", "data/crew_cache.sqlite3")
+CREW_CACHE_TTL_HOURS = float(os.getenv("CREW_CACHE_TTL_HOURS", "168") or 0) or None
+CREW_CACHE_MAX_ENTRIES = int(os.getenv("CREW_CACHE_MAX_ENTRIES", "500") or 0) or None
+CREW_CACHE_MAX_BYTES = int(os.getenv("CREW_CACHE_MAX_BYTES", str(200 * 1024 * 1024)) or 0) or None
+
+# Offer the report of an earlier, similar request instead of running the crew again; kept in the
+# evidence Chroma directory ("0" disables it). Requests match when the cosine similarity of their
+# idea and assumptions reaches SEMANTIC_CACHE_THRESHOLD; empty uses the embedder's own threshold
+# (0.35 for the hashing embedder, which only counts shared words, 0.75 for a local model).
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "1") not in ("0", "false", "False")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "") or 0) or None
+
+# Web search results cached on disk and shared by all sessions; an empty path disables it.
+# Results expire after SEARCH_CACHE_TTL_HOURS (empty: never).
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "data/search_cache.sqlite3")
+SEARCH_CACHE_TTL_HOURS = float(os.getenv("SEARCH_CACHE_TTL_HOURS", "24") or 0) or None
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000") or 0) or None
+
+# Scraped pages and their chunk embeddings for the researcher's website tools, cached in this
+# directory and shared by all sessions; an empty value uses the uncached crewai_tools versions.
+# Pages are fetched again after WEB_PAGE_TTL_HOURS (empty: never); unchanged chunks keep their
+# embeddings. WEB_FIXTURES_DIR reads pages from local files instead of the network (for tests).
+# WEB_SEARCH_EMBEDDER picks the embeddings of the cached website search: "openai" (the model of the
+# uncached tool) or "local" (the evidence index's embedder, see EVIDENCE_VECTOR_DB_PATH; offline,
+# but without a local sentence-transformers model it ranks passages by shared words only).
+WEB_CACHE_DIR = os.getenv("WEB_CACHE_DIR", "data/web_cache")
+WEB_PAGE_TTL_HOURS = float(os.getenv("WEB_PAGE_TTL_HOURS", "72") or 0) or None
+WEB_PAGE_CACHE_MAX_BYTES = int(os.getenv("WEB_PAGE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)) or 0) or None
+WEB_EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("WEB_EMBEDDING_CACHE_MAX_BYTES", str(200 * 1024 * 1024)) or 0) or None
+WEB_FIXTURES_DIR = os.getenv("WEB_FIXTURES_DIR", "")
+WEB_SEARCH_EMBEDDER = os.getenv("WEB_SEARCH_EMBEDDER", "openai")
+
+# Crews run as background jobs recorded in JOBS_PATH. JOB_WORKERS caps the jobs running at once,
+# and the crews running at once across all sessions, counting each pipeline step and competitor
+# profile as a crew; pages check on their jobs every JOB_POLL_SECONDS.
+JOBS_PATH = os.getenv("JOBS_PATH", "data/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+
+# Steps of the full pipeline (analysis, research tracks, validation plan, BMC draft) run at once
+PIPELINE_PARALLELISM = int(os.getenv("PIPELINE_PARALLELISM", "3"))
+
+# Competitor analysis profiles each competitor in its own crew, COMPETITOR_PARALLELISM at a time,
+# and then summarizes the profiles; 0 analyzes all competitors in one task. Given only an
+# industry, it first names up to COMPETITOR_FANOUT_MAX main competitors to profile.
+COMPETITOR_PARALLELISM = int(os.getenv("COMPETITOR_PARALLELISM", "4") or 0)
+COMPETITOR_FANOUT_MAX = int(os.getenv("COMPETITOR_FANOUT_MAX", "6"))
+
+# Built agents (with their LLM clients and tools) kept idle per kind for reuse by later requests;
+# 0 builds new agents for every request
+AGENT_POOL_MAX_IDLE = int(os.getenv("AGENT_POOL_MAX_IDLE", "8") or 0)
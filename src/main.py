@@ -1,13 +1,23 @@
 import streamlit as st
 from dotenv import load_dotenv
+from datetime import datetime, timedelta
+import itertools
 import json
-from datetime import datetime
-import re
 import os
+import time
 
 # Import UI components
 from ui.bmc_visualization import display_bmc, extract_bmc_from_json, interactive_bmc_editor
 from ui.validation_interface import display_validation_plan, human_validation_form, generate_recommendations
+from utils.report_parser import ReportCache, numbered_items
+from utils.jobs import ACTIVE_STATUSES, JobRunner
+from config.settings import (
+    EVIDENCE_STORAGE_PATH, EVIDENCE_STORAGE_MODE, EVIDENCE_VECTOR_DB_PATH, EVIDENCE_ASYNC_WRITES,
+    EVIDENCE_LAZY_CONTENT, EVIDENCE_COMPRESSION, EVIDENCE_MAX_ITEMS, EVIDENCE_MAX_BYTES,
+    EVIDENCE_TTL_DAYS, EVIDENCE_EVICTION, REPORT_CACHE_SIZE, CREW_CACHE_PATH, CREW_CACHE_TTL_HOURS,
+    CREW_CACHE_MAX_ENTRIES, CREW_CACHE_MAX_BYTES, SEMANTIC_CACHE, SEMANTIC_CACHE_THRESHOLD, JOBS_PATH,
+    JOB_WORKERS, JOB_POLL_SECONDS, PIPELINE_PARALLELISM, COMPETITOR_PARALLELISM, STRUCTURED_OUTPUT
+)
 
 import sys
 import platform
@@ -52,6 +62,316 @@ def init_session_state():
         st.session_state.openai_api_key = ""
     if 'serper_api_key' not in st.session_state:
         st.session_state.serper_api_key = ""
+    if 'jobs' not in st.session_state:
+        # Reconnect to the crew runs of this page's URL, e.g. after a browser refresh
+        st.session_state.jobs = {
+            kind: st.query_params[f"{kind}_job"] for kind in JOB_KINDS if f"{kind}_job" in st.query_params
+        }
+    if 'applied_jobs' not in st.session_state:
+        st.session_state.applied_jobs = set()
+
+@st.cache_resource
+def get_evidence_tracker():
+    """
+    The server's evidence tracker, shared by all sessions: one writer thread, similarity
+    index and retention state per process instead of one per session.
+    """
+    from tools.evidence_tracker import EvidenceTracker
+    from tools.evidence_retention import RetentionPolicy
+    retention = RetentionPolicy(
+        max_items=EVIDENCE_MAX_ITEMS,
+        max_bytes=EVIDENCE_MAX_BYTES,
+        ttl={evidence_type: timedelta(days=days) for evidence_type, days in EVIDENCE_TTL_DAYS.items()},
+        eviction=EVIDENCE_EVICTION
+    )
+    return EvidenceTracker(
+        storage_path=EVIDENCE_STORAGE_PATH,
+        storage_mode=EVIDENCE_STORAGE_MODE,
+        vector_db_path=EVIDENCE_VECTOR_DB_PATH,
+        async_writes=EVIDENCE_ASYNC_WRITES,
+        lazy_content=EVIDENCE_LAZY_CONTENT,
+        compression=EVIDENCE_COMPRESSION,
+        retention=retention
+    )
+
+def get_crew_cache():
+    """Return the session's crew result cache, or None if caching is disabled."""
+    if not CREW_CACHE_PATH:
+        return None
+    if 'crew_cache' not in st.session_state:
+        from agents.crew_cache import CrewResultCache
+        from utils.disk_cache import DiskCache
+        st.session_state.crew_cache = CrewResultCache(DiskCache(
+            CREW_CACHE_PATH,
+            max_entries=CREW_CACHE_MAX_ENTRIES,
+            max_bytes=CREW_CACHE_MAX_BYTES,
+            default_ttl=CREW_CACHE_TTL_HOURS * 3600 if CREW_CACHE_TTL_HOURS else None
+        ))
+    return st.session_state.crew_cache
+
+def crew_runner():
+    """
+    A function that kicks off a crew with this session's result cache settings. It does not
+    touch the session, so it can run crews on worker threads. Each run holds one of the
+    process-wide crew slots, however deeply it is nested in jobs, pipelines and fan-outs.
+    """
+    from utils.parallel import with_crew_slot
+    cache = get_crew_cache()
+    if cache is None or not st.session_state.get("use_crew_cache", True):
+        return with_crew_slot(lambda crew: crew.kickoff())
+    refresh = st.session_state.get("refresh_crew_cache", False)
+    return with_crew_slot(lambda crew: cache.kickoff(crew, refresh=refresh))
+
+# Crew runs a session can have in the background, at most one of each
+JOB_KINDS = ("analysis", "pipeline", "market_research", "customer_segment", "competitor_analysis")
+
+@st.cache_resource
+def get_job_runner():
+    """The server's crew job runner, running up to JOB_WORKERS jobs across all sessions."""
+    return JobRunner(JOBS_PATH, max_workers=JOB_WORKERS)
+
+def lease_agent(cls, with_evidence=True):
+    """
+    An OrchestratorAgent or ResearcherAgent from the process-wide agent pool, bound to the
+    evidence tracker. The job that runs its crew returns it to the pool.
+    """
+    from agents.agent_pool import shared_agent_pool
+    tracker = get_evidence_tracker() if with_evidence else None
+    return shared_agent_pool().acquire(cls, tracker, structured_output=STRUCTURED_OUTPUT)
+
+def crew_job(crew):
+    """
+    A job that kicks off ``crew`` with this session's cache settings and returns its report
+    text, with the report model for structured output (see report_result). Pooled agents of
+    the crew go back to the agent pool when it is done.
+    """
+    from agents.agent_pool import shared_agent_pool
+    run = crew_runner()
+    
+    def job(progress):
+        steps = itertools.count(1)
+        crew.step_callback = lambda step: progress(f"Working ({next(steps)} agent steps so far)")
+        progress("Crew started")
+        try:
+            return report_result(run(crew))
+        finally:
+            shared_agent_pool().release_crew(crew)
+    return job
+
+def start_job(kind, crew, **params):
+    """
+    Run ``crew`` in the background as this session's job of ``kind``; ``params`` go with its
+    result. While an identical crew is already running, in any session, this joins that job.
+    """
+    from agents.agent_pool import shared_agent_pool
+    from agents.crew_cache import crew_key
+    job_id = get_job_runner().submit(
+        kind, crew_job(crew), params, key=f"{kind}:{crew_key(crew)}",
+        on_coalesced=lambda: shared_agent_pool().release_crew(crew)
+    )
+    follow_job(kind, job_id)
+    return job_id
+
+def follow_job(kind, job_id):
+    """Make ``job_id`` this session's job of ``kind``, also in the page URL for reconnecting."""
+    st.session_state.jobs[kind] = job_id
+    st.query_params[f"{kind}_job"] = job_id
+
+def forget_job(kind):
+    """Stop following this session's job of ``kind``."""
+    st.session_state.jobs.pop(kind, None)
+    if f"{kind}_job" in st.query_params:
+        del st.query_params[f"{kind}_job"]
+
+def apply_job_result(kind, job):
+    """Store a finished job's result in the session, as running its crew inline would have."""
+    params, text = job["params"], job["result"]
+    if job["structured"] is not None:
+        cache_structured_report(text, job["structured"])
+    # Keyed by job, so applying it again after a reconnect replaces the evidence instead of duplicating it
+    evidence_id = f"{kind}_{job['id']}"
+    if kind == "analysis":
+        apply_analysis(text, params["idea_description"], job["finished"])
+    elif kind == "pipeline":
+        apply_pipeline(json.loads(text), params["idea_description"], job)
+    elif kind == "market_research":
+        store_market_research(text, params["idea_description"], params["assumptions"], evidence_id)
+    elif kind == "customer_segment":
+        store_segment_research(text, evidence_id)
+    elif kind == "competitor_analysis":
+        store_competitor_analysis(text, evidence_id)
+    st.session_state.applied_jobs.add(job["id"])
+
+def apply_analysis(text, idea_description, finished):
+    """Store the text of a finished initial analysis and move on to its results."""
+    st.session_state.stored_idea_description = idea_description
+    st.session_state.analysis_timestamp = datetime.fromtimestamp(finished).strftime("%Y-%m-%d %H:%M:%S")
+    st.session_state.current_results = text
+    st.session_state.analysis_running = False
+    remember_report("analysis", idea_description, text)
+    if st.session_state.project_stage in ('initial', 'analysis'):
+        st.session_state.project_stage = 'analysis_results'
+
+def apply_pipeline(data, idea_description, job):
+    """Store every output of a finished full pipeline job (steps that failed are left out)."""
+    from ui.bmc_visualization import extract_bmc_from_json
+    from utils.json_extract import extract_json
+    
+    outputs = data["outputs"]
+    apply_analysis(outputs["analysis"], idea_description, job["finished"])
+    if "market_research" in outputs:
+        store_market_research(
+            outputs["market_research"], idea_description, data["assumptions"], f"market_research_{job['id']}"
+        )
+    if "segment_research" in outputs:
+        store_segment_research(outputs["segment_research"], f"customer_segment_{job['id']}")
+    if "competitor_analysis" in outputs:
+        store_competitor_analysis(outputs["competitor_analysis"], f"competitor_analysis_{job['id']}")
+    # Kept apart so displaying the initial analysis does not replace them with its first drafts
+    if "validation_plan" in outputs:
+        plan = extract_json(outputs["validation_plan"], required_key="validations") or {}
+        st.session_state.planned_validations = [
+            item for item in plan.get("validations") or [] if isinstance(item, dict)
+        ]
+        st.session_state.validations = st.session_state.planned_validations
+    if "bmc_draft" in outputs:
+        st.session_state.drafted_bmc = extract_bmc_from_json(outputs["bmc_draft"])
+        st.session_state.bmc_data = st.session_state.drafted_bmc
+
+def get_job(kind):
+    """This session's job of ``kind`` (None if there is none), with its result applied once it is done."""
+    job_id = st.session_state.jobs.get(kind)
+    if job_id is None:
+        return None
+    job = get_job_runner().get(job_id)
+    if job is None:
+        # Deleted with old jobs
+        forget_job(kind)
+        return None
+    if job["status"] == "done" and job_id not in st.session_state.applied_jobs:
+        apply_job_result(kind, job)
+    return job
+
+def sync_jobs():
+    """Apply the results of finished jobs and show a reconnected, still running analysis."""
+    for kind in JOB_KINDS:
+        job = get_job(kind)
+        if kind in ("analysis", "pipeline") and job and job["status"] in ACTIVE_STATUSES:
+            if st.session_state.project_stage == 'initial':
+                st.session_state.project_stage = 'analysis'
+
+def display_job_progress(kind, label):
+    """Show the progress of this session's job of ``kind``; returns the job while it is queued or running."""
+    job = get_job(kind)
+    if job is None:
+        return None
+    if job["status"] in ACTIVE_STATUSES:
+        elapsed = int(time.time() - (job["started"] or job["created"]))
+        st.info(f"⏳ {label}: {job['progress']} ({elapsed}s)")
+        return job
+    if job["status"] == "failed":
+        st.error(f"❌ {label} failed: {job['error']}")
+        forget_job(kind)
+    return None
+
+def poll_jobs():
+    """Rerun the page every JOB_POLL_SECONDS while any of this session's jobs is queued or running."""
+    runner = get_job_runner()
+    for job_id in st.session_state.jobs.values():
+        job = runner.get(job_id)
+        if job and job["status"] in ACTIVE_STATUSES:
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
+
+def display_jobs_sidebar():
+    """Sidebar list of this session's crew runs and the server's load."""
+    from agents.agent_pool import shared_agent_pool
+    
+    if not st.session_state.jobs:
+        return
+    runner = get_job_runner()
+    with st.sidebar.expander("Crew Runs"):
+        for kind, job_id in st.session_state.jobs.items():
+            job = runner.get(job_id)
+            if job:
+                st.write(f"**{kind.replace('_', ' ').capitalize()}**: {job['status']}")
+        st.caption(
+            f"{runner.active()} runs queued or running on the server ({runner.max_workers} at a time); "
+            f"{runner.coalesced} duplicate requests joined a run already in progress"
+        )
+        pool = shared_agent_pool().stats()
+        st.caption(
+            f"Agents: {pool['built']} built, {pool['reused']} reused, "
+            f"{pool['leased']} in use and {pool['idle']} idle in the pool"
+        )
+
+def display_crew_cache_settings():
+    """Sidebar controls and statistics of the crew result cache."""
+    cache = get_crew_cache()
+    if cache is None:
+        return
+    with st.sidebar.expander("Result Cache"):
+        st.checkbox("Reuse results of identical runs", value=True, key="use_crew_cache")
+        st.checkbox(
+            "Refresh: run again and replace cached results", value=False, key="refresh_crew_cache",
+            disabled=not st.session_state.use_crew_cache
+        )
+        stats = cache.stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Hits", stats["hits"])
+        col2.metric("Misses", stats["misses"])
+        st.caption(f"{stats['entries']} cached results, {stats['bytes'] / 1024 / 1024:.1f} MB")
+        from tools.search_cache import search_cache_stats
+        search_stats = search_cache_stats()
+        if search_stats:
+            st.caption(
+                f"Web searches: {search_stats['hits']} cached, {search_stats['misses']} searched, "
+                f"{search_stats['coalesced']} shared in flight ({search_stats['hit_rate']:.0%} hit rate)"
+            )
+        if st.button("Clear cache", key="clear_crew_cache"):
+            cache.clear()
+            st.success("Result cache cleared")
+
+def get_semantic_cache():
+    """Return the session's cache of reports by request similarity, or None if it is disabled."""
+    if not EVIDENCE_VECTOR_DB_PATH or not SEMANTIC_CACHE:
+        return None
+    if 'semantic_cache' not in st.session_state:
+        from agents.semantic_cache import SemanticReportCache
+        st.session_state.semantic_cache = SemanticReportCache(
+            EVIDENCE_VECTOR_DB_PATH, threshold=SEMANTIC_CACHE_THRESHOLD
+        )
+    return st.session_state.semantic_cache
+
+def find_similar_report(kind, idea, assumptions=None):
+    """The earlier report of this kind for a similar request, unless the result cache is bypassed."""
+    cache = get_semantic_cache()
+    if (cache is None or not st.session_state.get("use_crew_cache", True)
+            or st.session_state.get("refresh_crew_cache", False)):
+        return None
+    return cache.lookup(kind, idea, assumptions)
+
+def remember_report(kind, idea, report, assumptions=None):
+    """Keep ``report`` so similar requests can start from it."""
+    cache = get_semantic_cache()
+    if cache is not None:
+        cache.add(kind, idea, report, assumptions)
+
+def offer_similar_report(similar, key):
+    """
+    Show the earlier request similar to this one and let the user start from its report.
+    Returns "reuse", "rerun", or None until the user has chosen.
+    """
+    st.info(
+        f"A similar request was answered on {similar['created']} "
+        f"({similar['score']:.0%} similar):\n\n> {similar['idea']}"
+    )
+    col1, col2 = st.columns(2)
+    if col1.button("Start from this report", key=f"reuse_{key}"):
+        return "reuse"
+    if col2.button("Run a new analysis", key=f"rerun_{key}"):
+        return "rerun"
+    return None
 
 def is_api_configured():
     """Check if API keys are configured in session state."""
@@ -103,103 +423,124 @@ def display_api_setup():
             st.success("API keys saved successfully! You can now start using the application.")
             st.rerun()
 
+def get_report_cache():
+    """This session's parsed reports."""
+    if 'report_cache' not in st.session_state:
+        st.session_state.report_cache = ReportCache(REPORT_CACHE_SIZE)
+    return st.session_state.report_cache
+
+def get_report(text):
+    """Return the parsed report for ``text``, reusing this session's earlier parse of the same text."""
+    return get_report_cache().get(text)
+
+def report_result(result):
+    """
+    Marker-format text of a crew result and, for structured output, its report model as JSON
+    (None otherwise), without touching the session (safe on job threads).
+    """
+    from agents.schemas import StructuredReport
+    structured = getattr(result, "pydantic", None)
+    if isinstance(structured, StructuredReport):
+        return structured.to_report(), {
+            "schema": type(structured).__name__, "report": structured.model_dump(mode="json")
+        }
+    return result.raw, None
+
+def render_report(result):
+    """Marker-format text of a crew result, without touching the session (safe on job threads)."""
+    return report_result(result)[0]
+
+def cache_structured_report(text, structured):
+    """
+    Cache the views of a job's structured result (from report_result) for its ``text``, so the
+    display functions do not parse the rendered text.
+    """
+    from agents import schemas
+    try:
+        report = getattr(schemas, structured["schema"]).model_validate(structured["report"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        # Written by a version with a different schema; the text is parsed instead
+        return
+    get_report_cache().put(text, report.to_document(text))
+
 def extract_section(text, section_marker):
     """Extract a section from the analysis text."""
-    pattern = f"{section_marker}:(.*?)(?=\\n\\n|$)"
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1).strip() if match else None
+    return get_report(text).section(section_marker)
 
 def extract_json_summary(text):
     """Extract the JSON summary from the text."""
-    try:
-        # Find the last occurrence of a JSON-like structure
-        json_pattern = r'{\s*"key_assumptions":.+}'
-        match = list(re.finditer(json_pattern, text, re.DOTALL))[-1]
-        json_str = match.group(0)
-        return json.loads(json_str)
-    except Exception as e:
-        st.error(f"Failed to parse JSON summary: {str(e)}")
-        return None
+    json_data = get_report(text).json_summary("key_assumptions")
+    if json_data is None:
+        st.error("Failed to parse JSON summary: no JSON object with key_assumptions found")
+    return json_data
 
-def display_analysis_results(result):
+def display_analysis_results(text):
     """Display the analysis results in a structured and user-friendly way."""
     st.write("### Initial Analysis Results")
     st.write(f"Analysis completed at: {st.session_state.analysis_timestamp}")
     
-    raw_text = result.raw
+    report = get_report(text)
     
     # Display initial thoughts
-    initial_thoughts = extract_section(raw_text, "INITIAL THOUGHTS")
+    initial_thoughts = report.section("INITIAL THOUGHTS")
     if initial_thoughts:
         st.write("#### 💭 Initial Analysis")
         st.write(initial_thoughts)
     
     # Extract and display assumptions
-    assumptions_pattern = r"ASSUMPTION:(.*?)REASONING:(.*?)(?=ASSUMPTION:|RISK:|$)"
-    assumptions = re.finditer(assumptions_pattern, raw_text, re.DOTALL)
+    assumptions = report.records("assumption")
     if assumptions:
         st.write("#### 🎯 Key Assumptions to Validate")
-        for match in assumptions:
-            assumption = match.group(1).strip()
-            reasoning = match.group(2).strip()
-            with st.expander(f"**{assumption}**"):
-                st.write("**Reasoning:**", reasoning)
+        for record in assumptions:
+            with st.expander(f"**{record['ASSUMPTION']}**"):
+                st.write("**Reasoning:**", record["REASONING"])
     
     # Extract and display risks
-    risks_pattern = r"RISK:(.*?)POTENTIAL IMPACT:(.*?)(?=RISK:|NEXT STEPS:|$)"
-    risks = re.finditer(risks_pattern, raw_text, re.DOTALL)
+    risks = report.records("risk")
     if risks:
         st.write("#### ⚠️ Risks and Challenges")
-        for match in risks:
-            risk = match.group(1).strip()
-            impact = match.group(2).strip()
-            with st.expander(f"**{risk}**"):
-                st.write("**Potential Impact:**", impact)
+        for record in risks:
+            with st.expander(f"**{record['RISK']}**"):
+                st.write("**Potential Impact:**", record["POTENTIAL IMPACT"])
     
     # Extract and display next steps
-    next_steps_section = extract_section(raw_text, "NEXT STEPS")
+    next_steps_section = report.section("NEXT STEPS")
     if next_steps_section:
         st.write("#### 👣 Recommended Next Steps")
-        steps = re.findall(r'\d+\.\s*(.*?)(?=\d+\.|$)', next_steps_section, re.DOTALL)
-        for i, step in enumerate(steps, 1):
-            st.write(f"{i}. {step.strip()}")
+        for i, step in enumerate(numbered_items(next_steps_section), 1):
+            st.write(f"{i}. {step}")
     
     # Extract and display validations
-    validations_pattern = r"VALIDATION NEEDED:(.*?)METHOD:(.*?)(?=VALIDATION NEEDED:|BMC ELEMENT|$)"
-    validations = re.finditer(validations_pattern, raw_text, re.DOTALL)
-    if validations:
+    validation_list = [
+        {"validation": record["VALIDATION NEEDED"], "method": record["METHOD"]}
+        for record in report.records("validation")
+    ]
+    if validation_list:
         st.write("#### 🔍 Required Validations")
-        validation_list = []
-        for match in validations:
-            validation = match.group(1).strip()
-            method = match.group(2).strip()
-            with st.expander(f"**{validation}**"):
-                st.write("**Suggested Method:**", method)
-            validation_list.append({"validation": validation, "method": method})
-        
-        # Store validations in session state for later use
-        st.session_state.validations = validation_list
+        for validation in validation_list:
+            with st.expander(f"**{validation['validation']}**"):
+                st.write("**Suggested Method:**", validation["method"])
+    
+    # Store validations in session state for later use, unless the full pipeline planned them
+    st.session_state.validations = st.session_state.get("planned_validations") or validation_list
     
     # Extract and display BMC elements
-    bmc_pattern = r"BMC ELEMENT - (.*?):(.*?)(?=BMC ELEMENT|{|$)"
-    bmc_elements = re.finditer(bmc_pattern, raw_text, re.DOTALL)
-    if bmc_elements:
+    bmc_data = {
+        element.lower().replace(" ", "_"): description
+        for element, description in report.bmc_elements()
+    }
+    
+    # Store BMC data in session state, unless the full pipeline drafted it
+    st.session_state.bmc_data = st.session_state.get("drafted_bmc") or bmc_data
+    if bmc_data:
         st.write("#### 📊 Initial Business Model Canvas Elements")
-        bmc_data = {}
-        for match in bmc_elements:
-            element = match.group(1).strip().lower().replace(" ", "_")
-            description = match.group(2).strip()
-            bmc_data[element] = description
-        
-        # Store BMC data in session state
-        st.session_state.bmc_data = bmc_data
         
         # Display BMC visualization
         display_bmc(bmc_data)
     
     # Try to extract JSON summary for structured data
     try:
-        json_data = extract_json_summary(raw_text)
+        json_data = extract_json_summary(text)
         if json_data and "key_assumptions" in json_data:
             st.session_state.key_assumptions = json_data["key_assumptions"]
     except:
@@ -212,7 +553,7 @@ def display_customer_interviews():
     
     # Display validation plan
     if st.session_state.validations:
-        display_validation_plan(st.session_state.validations)
+        display_validation_plan(st.session_state.validations, evidence_tracker=get_evidence_tracker())
         
         # Human validation form
         results = human_validation_form(st.session_state.validations)
@@ -241,6 +582,13 @@ def display_mvp_design():
         for v in validated:
             st.write(f"✅ {v.get('validation_item')}")
     
+    # Show prior research related to the idea
+    idea_description = st.session_state.get("stored_idea_description")
+    if idea_description:
+        from tools.evidence_tracker import display_related_evidence
+        with st.expander("📚 Related research evidence"):
+            display_related_evidence(get_evidence_tracker(), idea_description, k=5, title="Most relevant evidence for your idea")
+    
     # MVP design form
     with st.form("mvp_form"):
         st.write("## Define Your MVP")
@@ -289,34 +637,35 @@ def display_bmc_review():
 def display_market_research_results(research_data):
     """Display market research results in a structured and visual format."""
     st.write("## Market Research Results")
+    report = get_report(research_data)
+    
     
     # Extract sections
-    market_size = extract_section(research_data, "MARKET SIZE AND TRENDS")
+    market_size = report.section("MARKET SIZE AND TRENDS")
     if market_size:
         st.write("### 📈 Market Size and Trends")
         st.write(market_size)
     
     # Extract competitor analysis
-    competitors_pattern = r"COMPETITOR:(.*?)DESCRIPTION:(.*?)STRENGTHS:(.*?)WEAKNESSES:(.*?)BUSINESS MODEL:(.*?)MARKET SHARE:(.*?)TARGET AUDIENCE:(.*?)SOURCE:(.*?)(?=COMPETITOR:|CUSTOMER INSIGHTS:|$)"
-    competitors = list(re.finditer(competitors_pattern, research_data, re.DOTALL))
+    competitors = report.records("competitor")
     
     if competitors:
         st.write("### 🏢 Competitor Analysis")
         
         # Create tabs for each competitor
-        competitor_names = [match.group(1).strip() for match in competitors]
+        competitor_names = [record["COMPETITOR"] for record in competitors]
         comp_tabs = st.tabs(competitor_names)
         
-        for i, (match, tab) in enumerate(zip(competitors, comp_tabs)):
+        for i, (record, tab) in enumerate(zip(competitors, comp_tabs)):
             with tab:
-                name = match.group(1).strip()
-                description = match.group(2).strip()
-                strengths = match.group(3).strip()
-                weaknesses = match.group(4).strip()
-                business_model = match.group(5).strip() if len(match.groups()) > 4 else "Not specified"
-                market_share = match.group(6).strip() if len(match.groups()) > 5 else "Not specified" 
-                target_audience = match.group(7).strip() if len(match.groups()) > 6 else "Not specified"
-                source = match.group(8).strip() if len(match.groups()) > 7 else "Not specified"
+                name = record["COMPETITOR"]
+                description = record["DESCRIPTION"]
+                strengths = record["STRENGTHS"]
+                weaknesses = record["WEAKNESSES"]
+                business_model = record.get("BUSINESS MODEL", "Not specified")
+                market_share = record.get("MARKET SHARE", "Not specified") 
+                target_audience = record.get("TARGET AUDIENCE", "Not specified")
+                source = record.get("SOURCE", "Not specified")
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -342,10 +691,6 @@ def display_market_research_results(research_data):
                 
                 # Add a button to save competitor to evidence
                 if st.button(f"Save {name} Analysis to Evidence", key=f"save_comp_{i}"):
-                    from tools.evidence_tracker import EvidenceTracker
-                    if 'evidence_tracker' not in st.session_state:
-                        st.session_state.evidence_tracker = EvidenceTracker(storage_path='data/evidence.json')
-                    
                     competitor_info = f"""
                     Competitor: {name}
                     Description: {description}
@@ -357,7 +702,7 @@ def display_market_research_results(research_data):
                     Source: {source}
                     """
                     
-                    st.session_state.evidence_tracker.add_evidence(
+                    get_evidence_tracker().add_evidence(
                         decision_id=f"competitor_{name.lower().replace(' ', '_')}",
                         evidence_type="competitor_analysis",
                         source=source,
@@ -369,17 +714,16 @@ def display_market_research_results(research_data):
                     st.success(f"Saved {name} analysis to evidence!")
     
     # Extract customer insights
-    insights_pattern = r"PAIN POINT:(.*?)EVIDENCE:(.*?)CUSTOMER QUOTE:(.*?)SOURCE:(.*?)(?=PAIN POINT:|PRICING MODELS:|$)"
-    insights = list(re.finditer(insights_pattern, research_data, re.DOTALL))
+    insights = report.records("insight")
     
     if insights:
         st.write("### 👥 Customer Insights")
         
-        for i, match in enumerate(insights):
-            pain_point = match.group(1).strip()
-            evidence = match.group(2).strip()
-            quote = match.group(3).strip()
-            source = match.group(4).strip() if len(match.groups()) > 3 else "Not specified"
+        for i, record in enumerate(insights):
+            pain_point = record["PAIN POINT"]
+            evidence = record["EVIDENCE"]
+            quote = record["CUSTOMER QUOTE"]
+            source = record.get("SOURCE", "Not specified")
             
             with st.expander(f"Pain Point: {pain_point}"):
                 st.write("**Evidence:**", evidence)
@@ -388,10 +732,6 @@ def display_market_research_results(research_data):
                 
                 # Add a button to save insight to evidence
                 if st.button(f"Save This Insight to Evidence", key=f"save_insight_{i}"):
-                    from tools.evidence_tracker import EvidenceTracker
-                    if 'evidence_tracker' not in st.session_state:
-                        st.session_state.evidence_tracker = EvidenceTracker(storage_path='data/evidence.json')
-                    
                     insight_info = f"""
                     Pain Point: {pain_point}
                     Evidence: {evidence}
@@ -399,7 +739,7 @@ def display_market_research_results(research_data):
                     Source: {source}
                     """
                     
-                    st.session_state.evidence_tracker.add_evidence(
+                    get_evidence_tracker().add_evidence(
                         decision_id=f"insight_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                         evidence_type="customer_insight",
                         source=source,
@@ -411,20 +751,19 @@ def display_market_research_results(research_data):
                     st.success(f"Saved customer insight to evidence!")
     
     # Extract pricing models
-    pricing_pattern = r"MODEL TYPE:(.*?)PRICE RANGE:(.*?)VALUE METRICS:(.*?)COMPETITOR EXAMPLES:(.*?)SOURCE:(.*?)(?=MODEL TYPE:|REGULATORY FACTORS:|$)"
-    pricing_models = list(re.finditer(pricing_pattern, research_data, re.DOTALL))
+    pricing_models = report.records("pricing_model")
     
     if pricing_models:
         st.write("### 💰 Pricing Models")
         
         # Create a DataFrame for pricing models
         pricing_data = []
-        for match in pricing_models:
-            model_type = match.group(1).strip()
-            price_range = match.group(2).strip()
-            value_metrics = match.group(3).strip()
-            examples = match.group(4).strip()
-            source = match.group(5).strip() if len(match.groups()) > 4 else "Not specified"
+        for record in pricing_models:
+            model_type = record["MODEL TYPE"]
+            price_range = record["PRICE RANGE"]
+            value_metrics = record["VALUE METRICS"]
+            examples = record["COMPETITOR EXAMPLES"]
+            source = record.get("SOURCE", "Not specified")
             
             pricing_data.append({
                 "Model Type": model_type,
@@ -440,23 +779,22 @@ def display_market_research_results(research_data):
             st.dataframe(df)
     
     # Extract regulatory factors
-    regulatory = extract_section(research_data, "REGULATORY FACTORS")
+    regulatory = report.section("REGULATORY FACTORS")
     if regulatory:
         st.write("### ⚖️ Regulatory Factors")
         st.write(regulatory)
     
     # Extract market trends
-    trends_pattern = r"TREND:(.*?)EVIDENCE:(.*?)IMPACT ON BUSINESS:(.*?)SOURCE:(.*?)(?=TREND:|ASSUMPTION VALIDATION:|$)"
-    trends = list(re.finditer(trends_pattern, research_data, re.DOTALL))
+    trends = report.records("trend")
     
     if trends:
         st.write("### 🔮 Market Trends")
         
-        for i, match in enumerate(trends):
-            trend = match.group(1).strip()
-            evidence = match.group(2).strip()
-            impact = match.group(3).strip()
-            source = match.group(4).strip() if len(match.groups()) > 3 else "Not specified"
+        for i, record in enumerate(trends):
+            trend = record["TREND"]
+            evidence = record["EVIDENCE"]
+            impact = record["IMPACT ON BUSINESS"]
+            source = record.get("SOURCE", "Not specified")
             
             with st.expander(f"Trend: {trend}"):
                 st.write("**Evidence:**", evidence)
@@ -464,18 +802,17 @@ def display_market_research_results(research_data):
                 st.write("**Source:**", source)
     
     # Extract assumption validations
-    validation_pattern = r"ASSUMPTION:(.*?)EVIDENCE:(.*?)CONCLUSION:(.*?)CONFIDENCE:(.*?)SOURCES:(.*?)(?=ASSUMPTION:|RECOMMENDATIONS:|$)"
-    validations = list(re.finditer(validation_pattern, research_data, re.DOTALL))
+    validations = report.records("assumption_validation")
     
     if validations:
         st.write("### 🧪 Assumption Validation")
         
-        for match in validations:
-            assumption = match.group(1).strip()
-            evidence = match.group(2).strip()
-            conclusion = match.group(3).strip()
-            confidence = match.group(4).strip()
-            sources = match.group(5).strip()
+        for record in validations:
+            assumption = record["ASSUMPTION"]
+            evidence = record["EVIDENCE"]
+            conclusion = record["CONCLUSION"]
+            confidence = record["CONFIDENCE"]
+            sources = record.get("SOURCES", "Not specified")
             
             conclusion_icon = "✅" if "validated" in conclusion.lower() else "❌" if "invalidated" in conclusion.lower() else "⚠️"
             
@@ -486,85 +823,86 @@ def display_market_research_results(research_data):
                 st.write("**Sources:**", sources)
     
     # Extract recommendations
-    recommendations = extract_section(research_data, "RECOMMENDATIONS")
+    recommendations = report.section("RECOMMENDATIONS")
     if recommendations:
         st.write("### 🚀 Recommendations")
         
         # Try to extract numbered recommendations
-        rec_list = re.findall(r'\d+\.\s*(.*?)(?=\d+\.|$)', recommendations, re.DOTALL)
+        rec_list = numbered_items(recommendations)
         
         if rec_list:
             for i, rec in enumerate(rec_list, 1):
-                st.write(f"{i}. {rec.strip()}")
+                st.write(f"{i}. {rec}")
         else:
             st.write(recommendations)
 
 def display_customer_segment_results(research_data):
     """Display customer segment research results."""
     st.write("## Customer Segment Analysis Results")
+    report = get_report(research_data)
+    
     
     # Extract segment profile
-    segment_profile = extract_section(research_data, "SEGMENT PROFILE")
+    segment_profile = report.section("SEGMENT PROFILE")
     if segment_profile:
         st.write("### 👤 Customer Segment Profile")
         
         # Try to extract specific parts
-        demographics = re.search(r'DEMOGRAPHICS:(.*?)(?=PSYCHOGRAPHICS:|$)', segment_profile, re.DOTALL)
-        psychographics = re.search(r'PSYCHOGRAPHICS:(.*?)(?=MARKET SIZE:|$)', segment_profile, re.DOTALL)
-        market_size = re.search(r'MARKET SIZE:(.*?)(?=GROWTH TRENDS:|$)', segment_profile, re.DOTALL)
-        growth_trends = re.search(r'GROWTH TRENDS:(.*?)(?=SOURCE:|$)', segment_profile, re.DOTALL)
+        demographics = report.sections["SEGMENT PROFILE"].get("DEMOGRAPHICS")
+        psychographics = report.sections["SEGMENT PROFILE"].get("PSYCHOGRAPHICS")
+        market_size = report.sections["SEGMENT PROFILE"].get("MARKET SIZE")
+        growth_trends = report.sections["SEGMENT PROFILE"].get("GROWTH TRENDS")
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.write("**Demographics:**")
-            st.write(demographics.group(1).strip() if demographics else "Not specified")
+            st.write(demographics or "Not specified")
             
             st.write("**Market Size:**")
-            st.write(market_size.group(1).strip() if market_size else "Not specified")
+            st.write(market_size or "Not specified")
         
         with col2:
             st.write("**Psychographics:**")
-            st.write(psychographics.group(1).strip() if psychographics else "Not specified")
+            st.write(psychographics or "Not specified")
             
             st.write("**Growth Trends:**")
-            st.write(growth_trends.group(1).strip() if growth_trends else "Not specified")
+            st.write(growth_trends or "Not specified")
     
     # Extract customer channels
-    channels = extract_section(research_data, "CUSTOMER CHANNELS")
+    channels = report.section("CUSTOMER CHANNELS")
     if channels:
         st.write("### 📱 Customer Channels")
         
         # Try to extract specific parts
-        online = re.search(r'ONLINE CHANNELS:(.*?)(?=OFFLINE CHANNELS:|$)', channels, re.DOTALL)
-        offline = re.search(r'OFFLINE CHANNELS:(.*?)(?=INFLUENTIAL VOICES:|$)', channels, re.DOTALL)
-        influencers = re.search(r'INFLUENTIAL VOICES:(.*?)(?=SOURCE:|$)', channels, re.DOTALL)
+        online = report.sections["CUSTOMER CHANNELS"].get("ONLINE CHANNELS")
+        offline = report.sections["CUSTOMER CHANNELS"].get("OFFLINE CHANNELS")
+        influencers = report.sections["CUSTOMER CHANNELS"].get("INFLUENTIAL VOICES")
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.write("**Online Channels:**")
-            st.write(online.group(1).strip() if online else "Not specified")
+            st.write(online or "Not specified")
             
             st.write("**Offline Channels:**")
-            st.write(offline.group(1).strip() if offline else "Not specified")
+            st.write(offline or "Not specified")
         
         with col2:
             st.write("**Influential Voices:**")
-            st.write(influencers.group(1).strip() if influencers else "Not specified")
+            st.write(influencers or "Not specified")
     
     # Extract customer language and pain points
-    language_pattern = r"PAIN POINT:(.*?)DIRECT QUOTES:(.*?)FREQUENCY:(.*?)SOURCE:(.*?)(?=PAIN POINT:|EXISTING SOLUTIONS:|$)"
-    language_sections = list(re.finditer(language_pattern, research_data, re.DOTALL))
+    language_sections = report.records("pain_point")
     
     if language_sections:
         st.write("### 💬 Customer Language & Pain Points")
         
-        for i, match in enumerate(language_sections):
-            pain_point = match.group(1).strip()
-            quotes = match.group(2).strip()
-            frequency = match.group(3).strip()
-            source = match.group(4).strip() if len(match.groups()) > 3 else "Not specified"
+        for i, record in enumerate(language_sections):
+            pain_point = record["PAIN POINT"]
+            quotes = record["DIRECT QUOTES"]
+            frequency = record["FREQUENCY"]
+            source = record.get("SOURCE", "Not specified")
             
             with st.expander(f"Pain Point: {pain_point}"):
                 st.write("**Direct Quotes:**")
@@ -577,10 +915,6 @@ def display_customer_segment_results(research_data):
                 
                 # Add a button to save to evidence
                 if st.button(f"Save This Pain Point to Evidence", key=f"save_pain_{i}"):
-                    from tools.evidence_tracker import EvidenceTracker
-                    if 'evidence_tracker' not in st.session_state:
-                        st.session_state.evidence_tracker = EvidenceTracker(storage_path='data/evidence.json')
-                    
                     pain_point_info = f"""
                     Pain Point: {pain_point}
                     Direct Quotes: {quotes}
@@ -588,7 +922,7 @@ def display_customer_segment_results(research_data):
                     Source: {source}
                     """
                     
-                    st.session_state.evidence_tracker.add_evidence(
+                    get_evidence_tracker().add_evidence(
                         decision_id=f"pain_point_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                         evidence_type="customer_pain_point",
                         source=source,
@@ -600,18 +934,17 @@ def display_customer_segment_results(research_data):
                     st.success(f"Saved pain point to evidence!")
     
     # Extract existing solutions
-    solutions_pattern = r"SOLUTION:(.*?)USAGE:(.*?)SATISFACTION:(.*?)GAPS:(.*?)SOURCE:(.*?)(?=SOLUTION:|BUYING BEHAVIOR:|$)"
-    solutions = list(re.finditer(solutions_pattern, research_data, re.DOTALL))
+    solutions = report.records("solution")
     
     if solutions:
         st.write("### 🔄 Existing Solutions")
         
-        for i, match in enumerate(solutions):
-            solution = match.group(1).strip()
-            usage = match.group(2).strip()
-            satisfaction = match.group(3).strip()
-            gaps = match.group(4).strip()
-            source = match.group(5).strip() if len(match.groups()) > 4 else "Not specified"
+        for i, record in enumerate(solutions):
+            solution = record["SOLUTION"]
+            usage = record["USAGE"]
+            satisfaction = record["SATISFACTION"]
+            gaps = record["GAPS"]
+            source = record.get("SOURCE", "Not specified")
             
             with st.expander(f"Solution: {solution}"):
                 st.write("**How Customers Use It:**", usage)
@@ -620,99 +953,100 @@ def display_customer_segment_results(research_data):
                 st.write("**Source:**", source)
     
     # Extract buying behavior
-    buying = extract_section(research_data, "BUYING BEHAVIOR")
+    buying = report.section("BUYING BEHAVIOR")
     if buying:
         st.write("### 💰 Buying Behavior")
         
         # Try to extract specific parts
-        sensitivity = re.search(r'PRICE SENSITIVITY:(.*?)(?=DECISION FACTORS:|$)', buying, re.DOTALL)
-        factors = re.search(r'DECISION FACTORS:(.*?)(?=PURCHASING PROCESS:|$)', buying, re.DOTALL)
-        process = re.search(r'PURCHASING PROCESS:(.*?)(?=SOURCE:|$)', buying, re.DOTALL)
+        sensitivity = report.sections["BUYING BEHAVIOR"].get("PRICE SENSITIVITY")
+        factors = report.sections["BUYING BEHAVIOR"].get("DECISION FACTORS")
+        process = report.sections["BUYING BEHAVIOR"].get("PURCHASING PROCESS")
         
         if sensitivity or factors or process:
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**Price Sensitivity:**")
-                st.write(sensitivity.group(1).strip() if sensitivity else "Not specified")
+                st.write(sensitivity or "Not specified")
                 
                 st.write("**Decision Factors:**")
-                st.write(factors.group(1).strip() if factors else "Not specified")
+                st.write(factors or "Not specified")
             
             with col2:
                 st.write("**Purchasing Process:**")
-                st.write(process.group(1).strip() if process else "Not specified")
+                st.write(process or "Not specified")
         else:
             st.write(buying)
     
     # Extract recommendations
-    recommendations = extract_section(research_data, "TARGETING RECOMMENDATIONS")
+    recommendations = report.section("TARGETING RECOMMENDATIONS")
     if recommendations:
         st.write("### 🎯 Targeting Recommendations")
         
         # Try to extract numbered recommendations
-        rec_list = re.findall(r'\d+\.\s*(.*?)(?=\d+\.|$)', recommendations, re.DOTALL)
+        rec_list = numbered_items(recommendations)
         
         if rec_list:
             for i, rec in enumerate(rec_list, 1):
-                st.write(f"{i}. {rec.strip()}")
+                st.write(f"{i}. {rec}")
         else:
             st.write(recommendations)
 
 def display_competitor_analysis(research_data):
     """Display competitor analysis results."""
     st.write("## Competitor Analysis Results")
+    report = get_report(research_data)
+    
     
     # Extract competitor landscape
-    landscape = extract_section(research_data, "COMPETITOR LANDSCAPE")
+    landscape = report.section("COMPETITOR LANDSCAPE")
     if landscape:
         st.write("### 🌐 Competitor Landscape")
         
         # Try to extract specific parts
-        direct = re.search(r'DIRECT COMPETITORS:(.*?)(?=INDIRECT COMPETITORS:|$)', landscape, re.DOTALL)
-        indirect = re.search(r'INDIRECT COMPETITORS:(.*?)(?=POTENTIAL FUTURE COMPETITORS:|$)', landscape, re.DOTALL)
-        future = re.search(r'POTENTIAL FUTURE COMPETITORS:(.*?)(?=SOURCE:|$)', landscape, re.DOTALL)
+        direct = report.sections["COMPETITOR LANDSCAPE"].get("DIRECT COMPETITORS")
+        indirect = report.sections["COMPETITOR LANDSCAPE"].get("INDIRECT COMPETITORS")
+        future = report.sections["COMPETITOR LANDSCAPE"].get("POTENTIAL FUTURE COMPETITORS")
         
         if direct or indirect or future:
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**Direct Competitors:**")
-                st.write(direct.group(1).strip() if direct else "Not specified")
+                st.write(direct or "Not specified")
                 
                 st.write("**Indirect Competitors:**")
-                st.write(indirect.group(1).strip() if indirect else "Not specified")
+                st.write(indirect or "Not specified")
             
             with col2:
                 st.write("**Potential Future Competitors:**")
-                st.write(future.group(1).strip() if future else "Not specified")
+                st.write(future or "Not specified")
         else:
             st.write(landscape)
     
     # Extract competitor profiles
-    profile_pattern = r"NAME:(.*?)COMPANY SIZE:(.*?)FOUNDING DATE:(.*?)BUSINESS MODEL:(.*?)TARGET CUSTOMERS:(.*?)UNIQUE VALUE PROPOSITION:(.*?)KEY FEATURES:(.*?)PRICING STRATEGY:(.*?)GO-TO-MARKET STRATEGY:(.*?)STRENGTHS:(.*?)WEAKNESSES:(.*?)SOURCE:(.*?)(?=NAME:|MARKET POSITIONING:|$)"
-    profiles = list(re.finditer(profile_pattern, research_data, re.DOTALL))
+    profiles = report.records("competitor_profile")
     
     if profiles:
         st.write("### 🏢 Competitor Profiles")
         
-        competitor_names = [match.group(1).strip() for match in profiles]
+        competitor_names = [record["NAME"] for record in profiles]
         comp_tabs = st.tabs(competitor_names)
         
-        for i, (match, tab) in enumerate(zip(profiles, comp_tabs)):
+        for i, (record, tab) in enumerate(zip(profiles, comp_tabs)):
             with tab:
-                name = match.group(1).strip()
-                size = match.group(2).strip()
-                founding = match.group(3).strip()
-                business_model = match.group(4).strip()
-                target = match.group(5).strip()
-                value_prop = match.group(6).strip()
-                features = match.group(7).strip()
-                pricing = match.group(8).strip()
-                go_to_market = match.group(9).strip()
-                strengths = match.group(10).strip()
-                weaknesses = match.group(11).strip()
-                source = match.group(12).strip() if len(match.groups()) > 11 else "Not specified"
+                name = record["NAME"]
+                size = record["COMPANY SIZE"]
+                founding = record["FOUNDING DATE"]
+                business_model = record["BUSINESS MODEL"]
+                target = record["TARGET CUSTOMERS"]
+                value_prop = record["UNIQUE VALUE PROPOSITION"]
+                features = record["KEY FEATURES"]
+                pricing = record["PRICING STRATEGY"]
+                go_to_market = record["GO-TO-MARKET STRATEGY"]
+                strengths = record["STRENGTHS"]
+                weaknesses = record["WEAKNESSES"]
+                source = record.get("SOURCE", "Not specified")
                 
                 col1, col2 = st.columns(2)
                 
@@ -749,10 +1083,6 @@ def display_competitor_analysis(research_data):
                 
                 # Add a button to save to evidence
                 if st.button(f"Save {name} Analysis to Evidence", key=f"save_comp_profile_{i}"):
-                    from tools.evidence_tracker import EvidenceTracker
-                    if 'evidence_tracker' not in st.session_state:
-                        st.session_state.evidence_tracker = EvidenceTracker(storage_path='data/evidence.json')
-                    
                     competitor_info = f"""
                     Name: {name}
                     Company Size: {size}
@@ -768,7 +1098,7 @@ def display_competitor_analysis(research_data):
                     Source: {source}
                     """
                     
-                    st.session_state.evidence_tracker.add_evidence(
+                    get_evidence_tracker().add_evidence(
                         decision_id=f"competitor_profile_{name.lower().replace(' ', '_')}",
                         evidence_type="competitor_profile",
                         source=source,
@@ -780,43 +1110,42 @@ def display_competitor_analysis(research_data):
                     st.success(f"Saved {name} profile to evidence!")
     
     # Extract market positioning
-    positioning = extract_section(research_data, "MARKET POSITIONING")
+    positioning = report.section("MARKET POSITIONING")
     if positioning:
         st.write("### 📊 Market Positioning")
         
         # Try to extract specific parts
-        leaders = re.search(r'MARKET LEADERS:(.*?)(?=MARKET GAPS:|$)', positioning, re.DOTALL)
-        gaps = re.search(r'MARKET GAPS:(.*?)(?=DIFFERENTIATION FACTORS:|$)', positioning, re.DOTALL)
-        differentiation = re.search(r'DIFFERENTIATION FACTORS:(.*?)(?=SOURCE:|$)', positioning, re.DOTALL)
+        leaders = report.sections["MARKET POSITIONING"].get("MARKET LEADERS")
+        gaps = report.sections["MARKET POSITIONING"].get("MARKET GAPS")
+        differentiation = report.sections["MARKET POSITIONING"].get("DIFFERENTIATION FACTORS")
         
         if leaders or gaps or differentiation:
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**Market Leaders:**")
-                st.write(leaders.group(1).strip() if leaders else "Not specified")
+                st.write(leaders or "Not specified")
                 
                 st.write("**Market Gaps:**")
-                st.write(gaps.group(1).strip() if gaps else "Not specified")
+                st.write(gaps or "Not specified")
             
             with col2:
                 st.write("**Differentiation Factors:**")
-                st.write(differentiation.group(1).strip() if differentiation else "Not specified")
+                st.write(differentiation or "Not specified")
         else:
             st.write(positioning)
     
     # Extract customer feedback
-    feedback_pattern = r"COMPETITOR:(.*?)POSITIVE FEEDBACK:(.*?)NEGATIVE FEEDBACK:(.*?)SOURCE:(.*?)(?=COMPETITOR:|COMPETITIVE STRATEGY:|$)"
-    feedback_sections = list(re.finditer(feedback_pattern, research_data, re.DOTALL))
+    feedback_sections = report.records("feedback")
     
     if feedback_sections:
         st.write("### 👥 Customer Feedback Analysis")
         
-        for i, match in enumerate(feedback_sections):
-            competitor = match.group(1).strip()
-            positive = match.group(2).strip()
-            negative = match.group(3).strip()
-            source = match.group(4).strip() if len(match.groups()) > 3 else "Not specified"
+        for i, record in enumerate(feedback_sections):
+            competitor = record["COMPETITOR"]
+            positive = record["POSITIVE FEEDBACK"]
+            negative = record["NEGATIVE FEEDBACK"]
+            source = record.get("SOURCE", "Not specified")
             
             with st.expander(f"Feedback for {competitor}"):
                 col1, col2 = st.columns(2)
@@ -836,19 +1165,229 @@ def display_competitor_analysis(research_data):
                 st.write("**Source:**", source)
     
     # Extract competitive strategy
-    strategy = extract_section(research_data, "COMPETITIVE STRATEGY")
+    strategy = report.section("COMPETITIVE STRATEGY")
     if strategy:
         st.write("### 🧠 Competitive Strategy Recommendations")
         
         # Try to extract numbered recommendations
-        rec_list = re.findall(r'\d+\.\s*(.*?)(?=\d+\.|$)', strategy, re.DOTALL)
+        rec_list = numbered_items(strategy)
         
         if rec_list:
             for i, rec in enumerate(rec_list, 1):
-                st.write(f"{i}. {rec.strip()}")
+                st.write(f"{i}. {rec}")
         else:
             st.write(strategy)
 
+def market_research_request():
+    """The idea description and key assumptions that market research is run for."""
+    # Get key assumptions from session state
+    assumptions = []
+    if st.session_state.key_assumptions:
+        assumptions = [a.get("assumption") if isinstance(a, dict) else a for a in st.session_state.key_assumptions]
+    elif st.session_state.validations:
+        assumptions = [v.get("validation") for v in st.session_state.validations]
+    # Summary items without text (e.g. from a truncated summary) would only blur the request
+    assumptions = [assumption for assumption in assumptions if assumption]
+    
+    # Get the idea description
+    idea_description = st.session_state.get("stored_idea_description", "")
+    return idea_description, assumptions
+
+def market_research_crew(idea_description, assumptions):
+    """The crew that researches the market for an idea and its key assumptions."""
+    from agents.orchestrator import OrchestratorAgent
+    from agents.researcher import ResearcherAgent
+    
+    # Lease agents from the pool
+    orchestrator = lease_agent(OrchestratorAgent)
+    researcher = lease_agent(ResearcherAgent)
+    
+    # Create market research task
+    market_research_task = researcher.research_market(
+        idea_description=idea_description,
+        key_assumptions=assumptions
+    )
+    
+    # Create the crew
+    return orchestrator.get_research_crew(
+        orchestrator_agent=orchestrator.agent,
+        researcher_agent=researcher.agent,
+        tasks=[market_research_task]
+    )
+
+def store_market_research(text, idea_description, assumptions, evidence_id=None):
+    """Keep a market research report in the session, the semantic cache and the evidence."""
+    st.session_state.market_research = text
+    st.session_state.market_research_completed = True
+    remember_report("market_research", idea_description, st.session_state.market_research, assumptions)
+    
+    # Add research findings to evidence tracker
+    get_evidence_tracker().add_evidence(
+        decision_id=evidence_id or f"market_research_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        evidence_type="market_research",
+        source="AI Research",
+        content=st.session_state.market_research,
+        agent_name="Market Research Specialist",
+        confidence=4
+    )
+
+def start_market_research(idea_description, assumptions):
+    """Start the market research crew in the background."""
+    start_job(
+        "market_research", market_research_crew(idea_description, assumptions),
+        idea_description=idea_description, assumptions=assumptions
+    )
+
+def segment_research_crew(customer_segment, pain_points=None):
+    """The crew that researches a customer segment."""
+    from agents.researcher import ResearcherAgent
+    from crewai import Crew, Process
+    
+    # Lease a researcher from the pool
+    researcher = lease_agent(ResearcherAgent)
+    
+    # Create research task
+    segment_research_task = researcher.research_customer_segment(
+        customer_segment=customer_segment,
+        pain_points=pain_points
+    )
+    
+    return Crew(
+        agents=[researcher.agent],
+        tasks=[segment_research_task],
+        verbose=True,
+        process=Process.sequential
+    )
+
+def store_segment_research(text, evidence_id=None):
+    """Keep a customer segment research report in the session and the evidence."""
+    st.session_state.customer_segment_research = text
+    st.session_state.customer_segment_research_completed = True
+    
+    # Add to evidence tracker
+    get_evidence_tracker().add_evidence(
+        decision_id=evidence_id or f"segment_research_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        evidence_type="customer_research",
+        source="AI Research",
+        content=st.session_state.customer_segment_research,
+        agent_name="Market Research Specialist",
+        confidence=4
+    )
+
+def competitor_analysis_crew(competitors, industry):
+    """The crew that analyzes competitors, given as comma-separated names, and/or an industry."""
+    from agents.researcher import ResearcherAgent
+    from crewai import Crew, Process
+    
+    # Lease a researcher from the pool
+    researcher = lease_agent(ResearcherAgent)
+    
+    # Create research task
+    competitors_list = [c.strip() for c in competitors.split(",")] if competitors else None
+    competitor_task = researcher.analyze_competitors(
+        competitors=competitors_list,
+        industry=industry
+    )
+    
+    return Crew(
+        agents=[researcher.agent],
+        tasks=[competitor_task],
+        verbose=True,
+        process=Process.sequential
+    )
+
+def start_competitor_analysis(competitors, industry):
+    """
+    Start a competitor analysis job. With COMPETITOR_PARALLELISM set, each competitor is
+    profiled by its own crew, several at once, before one crew summarizes them
+    (ResearcherAgent.run_competitor_analysis); otherwise one crew analyzes them all.
+    """
+    from agents.agent_pool import shared_agent_pool
+    from agents.researcher import ResearcherAgent
+    
+    if not COMPETITOR_PARALLELISM:
+        return start_job("competitor_analysis", competitor_analysis_crew(competitors, industry))
+    
+    tracker = get_evidence_tracker()
+    competitors_list = [c.strip() for c in competitors.split(",")] if competitors else None
+    run = crew_runner()
+    
+    def job(progress):
+        with shared_agent_pool().lease(ResearcherAgent, tracker, structured_output=STRUCTURED_OUTPUT) as researcher:
+            return researcher.run_competitor_analysis(
+                competitors_list, industry,
+                run_crew=lambda crew: render_report(run(crew)),
+                max_workers=COMPETITOR_PARALLELISM,
+                progress=progress
+            )
+    
+    normalized = [" ".join((text or "").lower().split()) for text in (competitors, industry)]
+    job_id = get_job_runner().submit(
+        "competitor_analysis", job, key=f"competitor_analysis:fanout:{normalized[0]}:{normalized[1]}"
+    )
+    follow_job("competitor_analysis", job_id)
+    return job_id
+
+def store_competitor_analysis(text, evidence_id=None):
+    """Keep a competitor analysis report in the session and the evidence."""
+    st.session_state.competitor_analysis = text
+    st.session_state.competitor_analysis_completed = True
+    
+    # Add to evidence tracker
+    get_evidence_tracker().add_evidence(
+        decision_id=evidence_id or f"competitor_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        evidence_type="competitor_analysis",
+        source="AI Research",
+        content=st.session_state.competitor_analysis,
+        agent_name="Market Research Specialist",
+        confidence=4
+    )
+
+def run_all_research(customer_segment, pain_points, competitors, industry):
+    """
+    Start every research track that has its inputs and is neither done nor running as its
+    own background job, so the tracks run concurrently and each is stored when it finishes.
+    """
+    idea_description, assumptions = market_research_request()
+    started = []
+    if (not st.session_state.market_research_completed and not st.session_state.jobs.get("market_research")
+            and idea_description and assumptions):
+        start_market_research(idea_description, assumptions)
+        started.append("market research")
+    if (not st.session_state.customer_segment_research_completed and not st.session_state.jobs.get("customer_segment")
+            and customer_segment):
+        start_job("customer_segment", segment_research_crew(customer_segment, pain_points))
+        started.append("customer segment analysis")
+    if (not st.session_state.competitor_analysis_completed and not st.session_state.jobs.get("competitor_analysis")
+            and (competitors or industry)):
+        start_competitor_analysis(competitors, industry)
+        started.append("competitor analysis")
+    if not started:
+        st.warning("Nothing to research: every track is done, running or missing its inputs.")
+        return
+    st.rerun()
+
+def display_run_all_research():
+    """Form that runs all outstanding research tracks at once."""
+    with st.expander("Run all research", expanded=False):
+        st.write("Run market, customer segment and competitor research at the same time.")
+        with st.form("run_all_research_form"):
+            customer_segment = st.text_area(
+                "Target customer segment",
+                value=(st.session_state.bmc_data or {}).get("customer_segments", "")
+            )
+            pain_points = st.text_area("Potential pain points (optional)")
+            competitors = st.text_area("Competitors to analyze (optional)", placeholder="E.g., QuickBooks, Xero")
+            industry = st.text_input("Industry for competitive analysis")
+            if st.form_submit_button("Run all research"):
+                run_all_research(customer_segment, pain_points, competitors, industry)
+        
+        # Per-track progress; each track is stored as soon as its crew finishes
+        for kind, label in (("market_research", "Market research"),
+                            ("customer_segment", "Customer segment analysis"),
+                            ("competitor_analysis", "Competitor analysis")):
+            display_job_progress(kind, label)
+
 def conduct_market_research():
     """Initiate and display market research."""
     st.write("# Market Research")
@@ -856,90 +1395,57 @@ def conduct_market_research():
     if 'market_research_completed' not in st.session_state:
         st.session_state.market_research_completed = False
     
-    if 'market_research_in_progress' not in st.session_state:
-        st.session_state.market_research_in_progress = False
-    
     if 'customer_segment_research_completed' not in st.session_state:
         st.session_state.customer_segment_research_completed = False
     
     if 'competitor_analysis_completed' not in st.session_state:
         st.session_state.competitor_analysis_completed = False
     
+    if not (st.session_state.market_research_completed and st.session_state.customer_segment_research_completed
+            and st.session_state.competitor_analysis_completed):
+        display_run_all_research()
+    
     # Display tabs for different research types
     tabs = st.tabs(["General Market Research", "Customer Segment Analysis", "Competitor Analysis"])
     
     with tabs[0]:  # General Market Research
         if not st.session_state.market_research_completed:
-            if not st.session_state.market_research_in_progress:
+            if display_job_progress("market_research", "Market research") is None:
                 if st.button("Start Market Research"):
-                    st.session_state.market_research_in_progress = True
-                    with st.spinner("Researching the market for your idea..."):
-                        from agents.orchestrator import OrchestratorAgent
-                        from agents.researcher import ResearcherAgent
-                        from tools.evidence_tracker import EvidenceTracker
-                        
-                        # Initialize evidence tracker
-                        if 'evidence_tracker' not in st.session_state:
-                            st.session_state.evidence_tracker = EvidenceTracker(storage_path='data/evidence.json')
-                        
-                        # Get key assumptions from session state
-                        assumptions = []
-                        if st.session_state.key_assumptions:
-                            assumptions = [a.get("assumption") for a in st.session_state.key_assumptions]
-                        elif st.session_state.validations:
-                            assumptions = [v.get("validation") for v in st.session_state.validations]
-                        
-                        # Get the idea description
-                        idea_description = st.session_state.get("stored_idea_description", "")
-                        
-                        if not assumptions or not idea_description:
-                            st.error("No assumptions or idea description available. Please complete the initial analysis first.")
-                            st.session_state.market_research_in_progress = False
-                            return
-                        
-                        # Initialize agents
-                        orchestrator = OrchestratorAgent()
-                        researcher = ResearcherAgent()
-                        
-                        # Create market research task
-                        market_research_task = researcher.research_market(
-                            idea_description=idea_description,
-                            key_assumptions=assumptions
-                        )
-                        
-                        # Create and run the crew
-                        research_crew = orchestrator.get_research_crew(
-                            orchestrator_agent=orchestrator.agent,
-                            researcher_agent=researcher.agent,
-                            tasks=[market_research_task]
-                        )
-                        
-                        # Execute the crew and get results
-                        result = research_crew.kickoff()
-                        
-                        # Store results in session state
-                        st.session_state.market_research = result.raw
+                    idea_description, assumptions = market_research_request()
+                    
+                    if not assumptions or not idea_description:
+                        st.error("No assumptions or idea description available. Please complete the initial analysis first.")
+                        return
+                    
+                    # Offer the research of a similar earlier request before running the crew
+                    st.session_state.similar_market_research = find_similar_report(
+                        "market_research", idea_description, assumptions
+                    )
+                    if st.session_state.similar_market_research is None:
+                        start_market_research(idea_description, assumptions)
+                        st.rerun()
+                
+                similar = st.session_state.get("similar_market_research")
+                if similar:
+                    choice = offer_similar_report(similar, "market_research")
+                    if choice == "reuse":
+                        st.session_state.similar_market_research = None
+                        st.session_state.market_research = similar["report"]
                         st.session_state.market_research_completed = True
-                        st.session_state.market_research_in_progress = False
-                        
-                        # Add research findings to evidence tracker
-                        st.session_state.evidence_tracker.add_evidence(
-                            decision_id=f"market_research_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                            evidence_type="market_research",
-                            source="AI Research",
-                            content=result.raw,
-                            agent_name="Market Research Specialist",
-                            confidence=4
-                        )
-            else:
-                st.info("Market research is in progress. Please wait...")
+                        st.rerun()
+                    elif choice == "rerun":
+                        st.session_state.similar_market_research = None
+                        start_market_research(*market_research_request())
+                        st.rerun()
         
         # Display market research results if available
         if st.session_state.market_research_completed and st.session_state.get("market_research"):
             display_market_research_results(st.session_state.market_research)
     
     with tabs[1]:  # Customer Segment Analysis
-        if not st.session_state.customer_segment_research_completed:
+        if (not st.session_state.customer_segment_research_completed
+                and display_job_progress("customer_segment", "Customer segment analysis") is None):
             st.write("## Customer Segment Analysis")
             st.write("Analyze your target customer segment in detail.")
             
@@ -958,49 +1464,16 @@ def conduct_market_research():
                 submit_button = st.form_submit_button("Research Customer Segment")
                 
                 if submit_button and customer_segment:
-                    with st.spinner("Researching your target customer segment..."):
-                        from agents.researcher import ResearcherAgent
-                        
-                        # Initialize researcher
-                        researcher = ResearcherAgent()
-                        
-                        # Create research task
-                        segment_research_task = researcher.research_customer_segment(
-                            customer_segment=customer_segment,
-                            pain_points=pain_points
-                        )
-                        
-                        # Execute the task
-                        from crewai import Crew, Process
-                        segment_crew = Crew(
-                            agents=[researcher.agent],
-                            tasks=[segment_research_task],
-                            verbose=True,
-                            process=Process.sequential
-                        )
-                        
-                        result = segment_crew.kickoff()
-                        
-                        # Store results
-                        st.session_state.customer_segment_research = result.raw
-                        st.session_state.customer_segment_research_completed = True
-                        
-                        # Add to evidence tracker
-                        st.session_state.evidence_tracker.add_evidence(
-                            decision_id=f"segment_research_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                            evidence_type="customer_research",
-                            source="AI Research",
-                            content=result.raw,
-                            agent_name="Market Research Specialist",
-                            confidence=4
-                        )
+                    start_job("customer_segment", segment_research_crew(customer_segment, pain_points))
+                    st.rerun()
         
         # Display customer segment research results if available
         if st.session_state.customer_segment_research_completed and st.session_state.get("customer_segment_research"):
             display_customer_segment_results(st.session_state.customer_segment_research)
     
     with tabs[2]:  # Competitor Analysis
-        if not st.session_state.competitor_analysis_completed:
+        if (not st.session_state.competitor_analysis_completed
+                and display_job_progress("competitor_analysis", "Competitor analysis") is None):
             st.write("## Competitor Analysis")
             st.write("Analyze your competitors in detail.")
             
@@ -1019,48 +1492,85 @@ def conduct_market_research():
                 submit_button = st.form_submit_button("Research Competitors")
                 
                 if submit_button and (competitors or industry):
-                    with st.spinner("Analyzing competitors..."):
-                        from agents.researcher import ResearcherAgent
-                        
-                        # Initialize researcher
-                        researcher = ResearcherAgent()
-                        
-                        # Create research task
-                        competitors_list = [c.strip() for c in competitors.split(",")] if competitors else None
-                        competitor_task = researcher.analyze_competitors(
-                            competitors=competitors_list,
-                            industry=industry
-                        )
-                        
-                        # Execute the task
-                        from crewai import Crew, Process
-                        competitor_crew = Crew(
-                            agents=[researcher.agent],
-                            tasks=[competitor_task],
-                            verbose=True,
-                            process=Process.sequential
-                        )
-                        
-                        result = competitor_crew.kickoff()
-                        
-                        # Store results
-                        st.session_state.competitor_analysis = result.raw
-                        st.session_state.competitor_analysis_completed = True
-                        
-                        # Add to evidence tracker
-                        st.session_state.evidence_tracker.add_evidence(
-                            decision_id=f"competitor_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                            evidence_type="competitor_analysis",
-                            source="AI Research",
-                            content=result.raw,
-                            agent_name="Market Research Specialist",
-                            confidence=4
-                        )
+                    start_competitor_analysis(competitors, industry)
+                    st.rerun()
         
         # Display competitor analysis results if available
         if st.session_state.competitor_analysis_completed and st.session_state.get("competitor_analysis"):
             display_competitor_analysis(st.session_state.competitor_analysis)
 
+def start_initial_analysis(idea_type, idea_description):
+    """Start the initial analysis crew for an idea in the background."""
+    from agents.orchestrator import OrchestratorAgent
+    
+    st.session_state.analysis_running = True
+    st.session_state.project_stage = 'analysis'
+    st.session_state.analysis_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Lease an orchestrator agent from the pool
+    orchestrator = lease_agent(OrchestratorAgent, with_evidence=False)
+    
+    # Create initial tasks based on user input
+    tasks = orchestrator.create_initial_tasks(
+        idea_type=idea_type,
+        description=idea_description
+    )
+    
+    # Create the crew and run it as a job
+    crew = orchestrator.get_crew(tasks)
+    start_job("analysis", crew, idea_type=idea_type, idea_description=idea_description)
+
+def start_pipeline(idea_type, idea_description):
+    """
+    Start the full pipeline for an idea in the background: analysis, the three research tracks,
+    validation plan and BMC draft, scheduled by their dependencies (OrchestratorAgent.create_pipeline).
+    """
+    from agents.agent_pool import shared_agent_pool
+    from agents.orchestrator import OrchestratorAgent, PIPELINE_STEPS
+    from utils.parallel import TaskGraphError
+    
+    st.session_state.analysis_running = True
+    st.session_state.project_stage = 'analysis'
+    st.session_state.analysis_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    tracker = get_evidence_tracker()
+    run = crew_runner()
+    
+    def job(progress):
+        with shared_agent_pool().lease(OrchestratorAgent, tracker, structured_output=STRUCTURED_OUTPUT) as orchestrator:
+            return run_pipeline(orchestrator, progress)
+    
+    def run_pipeline(orchestrator, progress):
+        graph = orchestrator.create_pipeline(
+            idea_type, idea_description,
+            run_crew=lambda crew: render_report(run(crew))
+        )
+        finished = []
+        
+        def on_done(name, output, error):
+            finished.append(name)
+            outcome = "failed" if error else "done"
+            progress(f"{len(finished)} of {len(PIPELINE_STEPS)} steps finished ({PIPELINE_STEPS[name]} {outcome})")
+        
+        try:
+            outputs = graph.run(max_workers=PIPELINE_PARALLELISM, on_done=on_done)
+        except TaskGraphError as error:
+            # Keep what finished, unless there is not even an analysis
+            if "analysis" not in error.results:
+                raise
+            outputs = error.results
+        return json.dumps({
+            "outputs": outputs,
+            "assumptions": orchestrator.extract_assumptions(outputs["analysis"])
+        })
+    
+    normalized = " ".join(idea_description.lower().split())
+    job_id = get_job_runner().submit(
+        "pipeline", job, {"idea_type": idea_type, "idea_description": idea_description},
+        key=f"pipeline:{idea_type}:{normalized}"
+    )
+    follow_job("pipeline", job_id)
+
 def main():
     st.set_page_config(
         page_title="Lean Startup AI Advisor",
@@ -1075,6 +1585,9 @@ def main():
         display_api_setup()
         return
 
+    # Pick up results of crews that finished since the last run
+    sync_jobs()
+
     # Sidebar navigation - only show if not in API setup
     st.sidebar.title("Lean Startup Navigator")
     
@@ -1110,6 +1623,9 @@ def main():
             os.environ["SERPER_API_KEY"] = new_serper_key
             st.success("API keys updated successfully!")
 
+    display_crew_cache_settings()
+    display_jobs_sidebar()
+
     # Main page content
     st.title("Lean Startup AI Advisor 🚀")
     st.subheader("Your AI-powered startup methodology guide")
@@ -1130,67 +1646,68 @@ def main():
                 key='idea_description'
             )
             
+            full_pipeline = st.checkbox(
+                "Also run the market, segment and competitor research, validation plan and BMC draft",
+                key='full_pipeline'
+            )
+            
             submit_button = st.form_submit_button("Start Analysis")
 
         if submit_button and idea_description:
-            st.session_state.analysis_running = True
-            st.session_state.project_stage = 'analysis'
-            st.session_state.analysis_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
             # Store the idea description for later use
             st.session_state.stored_idea_description = idea_description
             
-            # Display processing status
-            with st.spinner("🤖 AI agents are analyzing your input..."):
-                from agents.orchestrator import OrchestratorAgent
-                
-                # Create progress placeholder
-                progress_placeholder = st.empty()
-                progress_placeholder.write("🔄 Initializing analysis...")
-                
-                # Initialize the orchestrator agent
-                orchestrator = OrchestratorAgent()
-                
-                progress_placeholder.write("🤖 Creating analysis tasks...")
-                # Create initial tasks based on user input
-                tasks = orchestrator.create_initial_tasks(
-                    idea_type=idea_type,
-                    description=idea_description
-                )
-                
-                progress_placeholder.write("📊 Analyzing your input...")
-                # Create and run the crew
-                crew = orchestrator.get_crew(tasks)
-                
-                # Execute the crew and get results
-                result = crew.kickoff()
-                
-                progress_placeholder.empty()
-                
-                # Store results in session state
-                st.session_state.current_results = result
-
-            # Display the results
-            if st.session_state.current_results:
-                display_analysis_results(st.session_state.current_results)
-                
-                # Add action buttons for next steps
-                st.write("### 🚀 Next Actions")
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("Start Customer Interviews"):
-                        st.session_state.project_stage = 'customer_interviews'
-                with col2:
-                    if st.button("Design MVP"):
-                        st.session_state.project_stage = 'mvp_design'
-                with col3:
-                    if st.button("Review Business Model"):
-                        st.session_state.project_stage = 'bmc_review'
+            if full_pipeline:
+                start_pipeline(idea_type, idea_description)
+                st.rerun()
+            
+            # Offer the analysis of a similar earlier idea before running the crew
+            st.session_state.similar_analysis = find_similar_report("analysis", idea_description)
+            if st.session_state.similar_analysis is None:
+                start_initial_analysis(idea_type, idea_description)
+                st.rerun()
+        
+        similar = st.session_state.get("similar_analysis")
+        if similar:
+            choice = offer_similar_report(similar, "analysis")
+            if choice == "reuse":
+                st.session_state.similar_analysis = None
+                st.session_state.project_stage = 'analysis_results'
+                st.session_state.analysis_timestamp = similar["created"]
+                st.session_state.current_results = similar["report"]
+                st.rerun()
+            elif choice == "rerun":
+                st.session_state.similar_analysis = None
+                start_initial_analysis(idea_type, st.session_state.stored_idea_description)
+                st.rerun()
+    
+    elif st.session_state.project_stage == 'analysis':
+        # The analysis runs as a job; its result moves the session on to 'analysis_results'
+        display_job_progress("analysis", "🤖 AI agents are analyzing your input")
+        display_job_progress("pipeline", "🤖 AI agents are working through the full pipeline")
+        if not (st.session_state.jobs.get("analysis") or st.session_state.jobs.get("pipeline")):
+            # The job failed
+            if st.button("Start over"):
+                st.session_state.project_stage = 'initial'
+                st.rerun()
     
     elif st.session_state.project_stage == 'analysis_results':
         # Display previously generated analysis results
         if st.session_state.current_results:
             display_analysis_results(st.session_state.current_results)
+            
+            # Add action buttons for next steps
+            st.write("### 🚀 Next Actions")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("Start Customer Interviews"):
+                    st.session_state.project_stage = 'customer_interviews'
+            with col2:
+                if st.button("Design MVP"):
+                    st.session_state.project_stage = 'mvp_design'
+            with col3:
+                if st.button("Review Business Model"):
+                    st.session_state.project_stage = 'bmc_review'
     
     elif st.session_state.project_stage == 'market_research':
         # Conduct and display market research
@@ -1208,5 +1725,8 @@ def main():
         # Display BMC review interface
         display_bmc_review()
 
+    # Keep following this session's running crews
+    poll_jobs()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import hashlib
+import mmap
+import threading
+
+# The codec is shared with utils.disk_cache; the evidence stores import it from here
+from utils.compression import decode_blob, encode_blob
+
+
+def content_hash(text: str) -> str:
+    """Address of a content body: hex BLAKE2b digest of its UTF-8 encoding."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def blob_stats(blobs: Iterable[Tuple[str, int, int]]) -> Dict[str, Any]:
+    """
+    Summarize how much deduplication and compression save.
+
+    Args:
+        blobs: One (hash, raw_size, stored_size) tuple per evidence item with content
+
+    Returns:
+        Item and unique body counts, how many bodies are shared by several items, byte
+        totals before dedup ('logical'), after dedup ('unique') and after compression
+        ('stored'), and the dedup, compression and overall ratios
+    """
+    refcounts: Counter = Counter()
+    sizes: Dict[str, Tuple[int, int]] = {}
+    for digest, raw_size, stored_size in blobs:
+        refcounts[digest] += 1
+        sizes[digest] = (raw_size, stored_size)
+
+    logical = sum(sizes[digest][0] * count for digest, count in refcounts.items())
+    unique = sum(raw for raw, _ in sizes.values())
+    stored = sum(stored for _, stored in sizes.values())
+    return {
+        'items': sum(refcounts.values()),
+        'unique_bodies': len(refcounts),
+        'shared_bodies': sum(1 for count in refcounts.values() if count > 1),
+        'logical_bytes': logical,
+        'unique_bytes': unique,
+        'stored_bytes': stored,
+        'dedup_ratio': logical / unique if unique else 1.0,
+        'compression_ratio': unique / stored if stored else 1.0,
+        'overall_ratio': logical / stored if stored else 1.0,
+    }
+
+
+class ContentFile:
+    """
+    Append-only file of content blobs, read back by (offset, length) through a memory map.
+
+    Appends must be serialized by the caller (the journal holds its cross-process lock).
+    The map is re-created whenever a read reaches past its end, which happens after this
+    or another process appended to the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    def append(self, blobs: List[bytes]) -> List[Tuple[int, int]]:
+        """Append ``blobs`` and return the (offset, length) of each."""
+        refs = []
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            for blob in blobs:
+                f.write(blob)
+                refs.append((offset, len(blob)))
+                offset += len(blob)
+        return refs
+
+    def read(self, offset: int, length: int) -> bytes:
+        if length == 0:
+            return b''
+        with self._lock:
+            if self._map is None or offset + length > len(self._map):
+                self._remap()
+            return self._map[offset:offset + length]
+
+    def _remap(self) -> None:
+        self._unmap()
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap()
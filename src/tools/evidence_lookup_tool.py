@@ -0,0 +1,28 @@
+from typing import Any, Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+
+class EvidenceLookupInput(BaseModel):
+    query: str = Field(..., description="What you are about to research, e.g. 'ADHD educational games market size'")
+
+
+class EvidenceLookupTool(BaseTool):
+    name: str = "Look up prior research evidence"
+    description: str = (
+        "Searches evidence this project has already collected (earlier market research, "
+        "competitor profiles, customer insights and interviews) for text similar to the query. "
+        "Use it BEFORE searching the internet; only search the web for what is not covered here."
+    )
+    args_schema: Type[BaseModel] = EvidenceLookupInput
+    evidence_tracker: Any = None
+    k: int = 5
+
+    def _run(self, query: str) -> str:
+        results = self.evidence_tracker.similar(query, k=self.k) if self.evidence_tracker else []
+        if not results:
+            return "No prior evidence found for this query."
+        return "\n\n".join(
+            f"[{item['type']}] {item['source']} (similarity {item['score']:.2f}):\n{item['snippet']}"
+            for item in results
+        )
@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+import threading
+import weakref
+
+EVICTION_ORDERS = ('lru', 'oldest')
+
+
+class RetentionPolicy:
+    """
+    Limits on how much evidence is kept.
+
+    Args:
+        max_items: Most evidence items to keep (None for no limit)
+        max_bytes: Most content bytes to keep, counted before deduplication (None for no limit)
+        ttl: Maximum age per evidence type, e.g. {'market_research': timedelta(days=30)};
+            types not listed never expire
+        protected_types: Types that are never evicted and do not count toward the limits
+        eviction: Which items make room when a limit is exceeded: 'lru' (least recently
+            read or written first) or 'oldest' (earliest timestamp first)
+        max_evictions_per_write: Upper bound on items removed after one write, so a large
+            backlog of expired evidence is worked off over several writes instead of one
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[Dict[str, timedelta]] = None,
+        protected_types: Iterable[str] = ('customer_interview',),
+        eviction: str = 'lru',
+        max_evictions_per_write: int = 100
+    ):
+        if eviction not in EVICTION_ORDERS:
+            raise ValueError(f"Unknown eviction order: {eviction}")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = dict(ttl or {})
+        self.protected_types = frozenset(protected_types)
+        self.eviction = eviction
+        self.max_evictions_per_write = max_evictions_per_write
+
+    def key(self) -> tuple:
+        """Hashable summary of the limits; equal policies have equal keys."""
+        return (self.max_items, self.max_bytes, tuple(sorted(self.ttl.items())),
+                self.protected_types, self.eviction, self.max_evictions_per_write)
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(timestamp) if timestamp else None
+    except (TypeError, ValueError):
+        return None
+
+
+class EvidenceRetention:
+    """
+    Mirrors the evictable evidence of a store and decides what to evict. Trackers of one
+    store in a process share a mirror (see shared_retention), so a read through any of them
+    counts as a use. Each tracker checks the mirror against the store's own totals after
+    every write and loads it again when another process has changed the store.
+
+    Items are kept in an OrderedDict in eviction order (access order for LRU, insertion
+    order for oldest-first, seeded from timestamps at startup), plus one timestamp-ordered
+    OrderedDict per evidence type with a TTL, so every check only looks at the front of
+    those queues. Recency is tracked in memory per process: reads in other processes do
+    not reorder this one's LRU queue.
+    """
+
+    def __init__(self, policy: RetentionPolicy):
+        self.policy = policy
+        self._lock = threading.Lock()
+        # decision_id -> (type, content bytes)
+        self._entries: 'OrderedDict[str, Tuple[Optional[str], int]]' = OrderedDict()
+        # type -> OrderedDict(decision_id -> timestamp), oldest first
+        self._ages: Dict[str, 'OrderedDict[str, datetime]'] = {t: OrderedDict() for t in policy.ttl}
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def load(self, footprint: Iterable[Tuple[str, Optional[str], Optional[str], int]]) -> None:
+        """
+        Seed from (id, type, timestamp, bytes) tuples of the stored evidence. Under LRU,
+        items already in the mirror keep their place, so reloading after another process
+        wrote does not forget recent reads; the others follow them, oldest first.
+        """
+        by_age = sorted(footprint, key=lambda item: item[2] or '')
+        with self._lock:
+            items = by_age
+            if self.policy.eviction == 'lru' and self._entries:
+                rank = {decision_id: n for n, decision_id in enumerate(self._entries)}
+                items = sorted(by_age, key=lambda item: rank.get(item[0], len(rank)))
+            self._entries.clear()
+            for ages in self._ages.values():
+                ages.clear()
+            self._bytes = 0
+            for decision_id, evidence_type, timestamp, size in items:
+                self._add(decision_id, evidence_type, timestamp, size)
+            if items is not by_age:
+                # The TTL queues stay in timestamp order
+                for ages in self._ages.values():
+                    ages.clear()
+                for decision_id, evidence_type, timestamp, _ in by_age:
+                    born = parse_timestamp(timestamp)
+                    if evidence_type in self._ages and born is not None and decision_id in self._entries:
+                        self._ages[evidence_type][decision_id] = born
+
+    def _add(self, decision_id: str, evidence_type: Optional[str],
+             timestamp: Optional[str], size: int) -> None:
+        self._remove(decision_id)
+        if evidence_type in self.policy.protected_types:
+            return
+        self._entries[decision_id] = (evidence_type, size)
+        self._bytes += size
+        born = parse_timestamp(timestamp)
+        if evidence_type in self._ages and born is not None:
+            self._ages[evidence_type][decision_id] = born
+
+    def _remove(self, decision_id: str) -> None:
+        entry = self._entries.pop(decision_id, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        if entry[0] in self._ages:
+            self._ages[entry[0]].pop(decision_id, None)
+
+    def record_add(self, decision_id: str, evidence_type: Optional[str],
+                   timestamp: Optional[str], size: int) -> None:
+        with self._lock:
+            self._add(decision_id, evidence_type, timestamp, size)
+
+    def record_delete(self, decision_id: str) -> None:
+        with self._lock:
+            self._remove(decision_id)
+
+    def record_clear(self) -> None:
+        self.load([])
+
+    def touch(self, decision_id: str) -> None:
+        """Mark an item as just used (only affects LRU eviction)."""
+        if self.policy.eviction != 'lru':
+            return
+        with self._lock:
+            if decision_id in self._entries:
+                self._entries.move_to_end(decision_id)
+
+    def collect(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Pick the items to evict now: expired items first, then items in eviction order
+        until the limits hold. At most ``max_evictions_per_write`` items are returned.
+        """
+        policy = self.policy
+        budget = policy.max_evictions_per_write
+        now = now or datetime.now()
+        victims = []
+        with self._lock:
+            for evidence_type, max_age in policy.ttl.items():
+                ages = self._ages[evidence_type]
+                while ages and len(victims) < budget:
+                    decision_id, born = next(iter(ages.items()))
+                    if now - born <= max_age:
+                        break
+                    self._remove(decision_id)
+                    victims.append(decision_id)
+
+            while self._entries and len(victims) < budget and (
+                (policy.max_items is not None and len(self._entries) > policy.max_items)
+                or (policy.max_bytes is not None and self._bytes > policy.max_bytes)
+            ):
+                decision_id = next(iter(self._entries))
+                self._remove(decision_id)
+                victims.append(decision_id)
+        return victims
+
+
+# (store, policy key) -> the retention mirror shared by the trackers of that store
+_shared: 'weakref.WeakValueDictionary[tuple, EvidenceRetention]' = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def shared_retention(storage_mode: str, storage_path: Optional[str],
+                     policy: RetentionPolicy) -> EvidenceRetention:
+    """
+    The retention mirror of a store, shared by the trackers that open it in this process
+    with an equal policy, so LRU recency is the same whichever tracker reads or writes.
+    In-memory stores (no path) get a mirror of their own. The mirror is dropped with the
+    last tracker using it.
+    """
+    if not storage_path:
+        return EvidenceRetention(policy)
+    key = (storage_mode, os.path.abspath(storage_path), policy.key())
+    with _shared_lock:
+        retention = _shared.get(key)
+        if retention is None:
+            retention = _shared[key] = EvidenceRetention(policy)
+        return retention
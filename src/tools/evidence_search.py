@@ -0,0 +1,273 @@
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Iterable
+import heapq
+import math
+import re
+import unicodedata
+
+# Letters and digits, as SQLite's unicode61 tokenizer splits text (underscores separate words)
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+VOWELS = 'aeiou'
+
+
+def _normalize(word: str) -> str:
+    """Lowercase ``word`` and strip diacritics from Latin letters, like unicode61 (Greek ί stays)."""
+    word = word.lower()
+    if word.isascii():
+        return word
+    kept: List[str] = []
+    for c in unicodedata.normalize('NFD', word):
+        if not (unicodedata.combining(c) and kept and kept[-1].isascii()):
+            kept.append(c)
+    return unicodedata.normalize('NFC', ''.join(kept))
+
+
+def words(text: str) -> List[str]:
+    """Lowercase words of ``text``, split and folded the way unicode61 does it."""
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFC', text)  # so combining accents do not split words
+    return [_normalize(word) for word in TOKEN_PATTERN.findall(text)]
+
+
+def _consonants(word: str) -> List[bool]:
+    """Per letter, whether it is a consonant; "y" is one only at the start or after a vowel."""
+    flags = []
+    for i, c in enumerate(word):
+        flags.append(c not in VOWELS and not (c == 'y' and i > 0 and flags[i - 1]))
+    return flags
+
+
+def _measure(word: str) -> int:
+    """Porter's m: the number of vowel-consonant sequences in ``word``."""
+    flags = _consonants(word)
+    return sum(1 for i in range(1, len(flags)) if flags[i] and not flags[i - 1])
+
+
+def _has_vowel(word: str) -> bool:
+    # As in SQLite, any "y" after the first letter counts as a vowel here
+    return any(c in VOWELS or (c == 'y' and i > 0) for i, c in enumerate(word))
+
+
+def _ends_cvc(word: str) -> bool:
+    """Porter's *o: ends consonant-vowel-consonant, the last not w, x or y."""
+    if len(word) < 3 or word[-1] in 'wxy':
+        return False
+    flags = _consonants(word)
+    return flags[-1] and not flags[-2] and flags[-3]
+
+
+def _replace(word: str, rules: Tuple[Tuple[str, str, int], ...]) -> str:
+    """
+    Apply the first rule whose suffix ``word`` ends in (and is longer than): the suffix is
+    replaced if the rest has a measure above the rule's minimum; either way no other rule
+    is tried.
+    """
+    for suffix, replacement, min_measure in rules:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            rest = word[:-len(suffix)]
+            return rest + replacement if _measure(rest) > min_measure else word
+    return word
+
+
+_STEP2 = tuple((suffix, replacement, 0) for suffix, replacement in (
+    ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'),
+    ('logi', 'log'), ('bli', 'ble'), ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous'),
+    ('ization', 'ize'), ('ation', 'ate'), ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'),
+    ('fulness', 'ful'), ('ousness', 'ous'), ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'),
+))
+_STEP3 = tuple((suffix, replacement, 0) for suffix, replacement in (
+    ('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'), ('ical', 'ic'), ('ful', ''), ('ness', ''),
+))
+_STEP4 = tuple((suffix, '', 1) for suffix in (
+    'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent', 'ou',
+    'ism', 'ate', 'iti', 'ous', 'ive', 'ize',
+))
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Porter stem of a lowercase word, as SQLite's FTS5 ``porter`` tokenizer computes it, so
+    the in-memory index and the SQLite index match the same words ("interviews" finds
+    "interview"). Words under three or over 64 bytes are left as they are.
+    """
+    if word.isascii():
+        return _porter(word) if 3 <= len(word) <= 64 else word
+    # SQLite stems the UTF-8 bytes, so other letters count as one consonant per byte
+    encoded = word.encode('utf-8')
+    if not 3 <= len(encoded) <= 64:
+        return word
+    return _porter(encoded.decode('latin-1')).encode('latin-1').decode('utf-8', errors='ignore')
+
+
+def _porter(word: str) -> str:
+    """The steps of Porter's algorithm, in the order and with the conditions of SQLite's fts5_tokenize.c."""
+    # Step 1a: plurals
+    if word.endswith('s'):
+        if word.endswith('sses') and len(word) > 4 or word.endswith('ies') and len(word) > 3:
+            word = word[:-2]
+        elif not word.endswith('ss'):
+            word = word[:-1]
+
+    # Step 1b: -ed and -ing
+    stripped = False
+    if word.endswith('eed') and len(word) > 3:
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and len(word) > len(suffix):
+                if _has_vowel(word[:-len(suffix)]):
+                    word = word[:-len(suffix)]
+                    stripped = True
+                break
+    if stripped:
+        if word[-2:] in ('at', 'bl', 'iz') and len(word) > 2:
+            word += 'e'
+        elif word[-1] not in VOWELS + 'lsz' and word[-1] == word[-2:-1]:
+            word = word[:-1]
+        elif _measure(word) == 1 and _ends_cvc(word):
+            word += 'e'
+
+    # Step 1c: y -> i
+    if word.endswith('y') and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+
+    # Steps 2 to 4: suffixes, the rule picked by the longest match within each step
+    word = _replace(word, _STEP2)
+    word = _replace(word, _STEP3)
+    if word.endswith('ion') and len(word) > 3:
+        if word[-4] in 'st' and _measure(word[:-3]) > 1:
+            word = word[:-3]
+    else:
+        word = _replace(word, _STEP4)
+
+    # Step 5: final -e and -ll
+    if word.endswith('e'):
+        measure = _measure(word[:-1])
+        if measure > 1 or measure == 1 and not _ends_cvc(word[:-1]):
+            word = word[:-1]
+    if word.endswith('ll') and _measure(word[:-1]) > 1:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed word tokens used for both indexing and querying (see words and stem)."""
+    return [stem(word) for word in words(text)]
+
+
+def make_snippet(text: str, query_terms: Iterable[str], width: int = 160) -> str:
+    """Return a window of ``text`` around the first word matching a (stemmed) query term, with matches in bold."""
+    text = text or ''
+    terms = {t for t in query_terms if t}
+    if not terms:
+        return text[:width]
+
+    def matches(word: re.Match) -> bool:
+        return stem(_normalize(word.group())) in terms
+
+    match = next((word for word in TOKEN_PATTERN.finditer(text) if matches(word)), None)
+    start = max(0, match.start() - width // 3) if match else 0
+    window = text[start:start + width]
+    snippet = TOKEN_PATTERN.sub(lambda m: f"**{m.group(0)}**" if matches(m) else m.group(0), window)
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if start + width < len(text) else ''
+    return f"{prefix}{snippet}{suffix}".replace('\n', ' ')
+
+
+class BM25Index:
+    """
+    In-memory inverted index ranked with Okapi BM25.
+
+    Documents can be added, replaced and removed one at a time, so the index is
+    kept up to date incrementally instead of being rebuilt on every change.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index ``text`` under ``doc_id``, replacing any previous version."""
+        if doc_id in self._doc_lengths:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, freq in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = freq
+        self._doc_terms[doc_id] = list(counts)
+        self._doc_lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        """Drop ``doc_id`` from the index."""
+        length = self._doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id, []):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_lengths.clear()
+        self._doc_terms.clear()
+        self._total_length = 0
+
+    def search(self, query: str, limit: int = 10,
+               allowed: Optional[set] = None) -> List[Tuple[str, float]]:
+        """
+        Rank documents containing every query term.
+
+        Args:
+            query: Free text query
+            limit: Maximum number of results
+            allowed: Optional set of document IDs to restrict the search to
+
+        Returns:
+            (doc_id, score) pairs, best match first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_lengths:
+            return []
+
+        postings = [self._postings.get(term, {}) for term in terms]
+        if any(not p for p in postings):
+            return []
+
+        # Intersect starting from the rarest term so the candidate set stays small
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates &= p.keys()
+        if allowed is not None:
+            candidates &= allowed
+
+        n_docs = len(self._doc_lengths)
+        avg_length = self._total_length / n_docs
+        scores = {}
+        for doc_id in candidates:
+            doc_length = self._doc_lengths[doc_id]
+            score = 0.0
+            for p in postings:
+                freq = p[doc_id]
+                idf = math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5))
+                norm = freq + self.k1 * (1 - self.b + self.b * doc_length / avg_length)
+                score += idf * freq * (self.k1 + 1) / norm
+            scores[doc_id] = score
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
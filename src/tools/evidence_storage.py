@@ -0,0 +1,1169 @@
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from tools.evidence_blobs import ContentFile, blob_stats, content_hash, decode_blob, encode_blob
+from tools.evidence_search import BM25Index, make_snippet, tokenize, words
+
+# A storage operation is a tuple of ('add', decision_id, record), ('delete', decision_id) or ('clear',)
+Operation = Tuple[Any, ...]
+
+# Key of the content file reference that replaces 'content' in lazily loaded records
+CONTENT_REF = 'content_ref'
+# Bookkeeping kept next to a content reference; never returned to callers
+CONTENT_FIELDS = ('content', CONTENT_REF, 'content_hash', 'content_length')
+
+METADATA_FIELDS = ('type', 'source', 'agent', 'confidence', 'timestamp')
+
+# Search filters: exact match on type/agent/source, lower bound on confidence
+FILTER_FIELDS = ('type', 'agent', 'source')
+
+# Fields evidence listings can be sorted by
+SORT_FIELDS = ('timestamp', 'confidence', 'type', 'source', 'agent')
+
+
+def check_sort_field(sort_by: str) -> None:
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort evidence by {sort_by!r}; use one of {', '.join(SORT_FIELDS)}")
+
+
+def apply_operations(store: Dict[str, Dict[str, Any]], ops: List[Operation]) -> None:
+    """Apply a list of storage operations to an in-memory evidence dict."""
+    for op in ops:
+        if op[0] == 'add':
+            store[op[1]] = op[2]
+        elif op[0] == 'delete':
+            store.pop(op[1], None)
+        elif op[0] == 'clear':
+            store.clear()
+
+
+def matches_filters(record: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """Check a record against search filters (see FILTER_FIELDS and 'min_confidence')."""
+    if not filters:
+        return True
+    for field in FILTER_FIELDS:
+        if filters.get(field) is not None and record.get(field) != filters[field]:
+            return False
+    min_confidence = filters.get('min_confidence')
+    if min_confidence is not None and (record.get('confidence') or 0) < min_confidence:
+        return False
+    return True
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every process (and thread) using the same lock file.
+
+    Uses ``flock`` on POSIX and ``msvcrt.locking`` on Windows. Each acquisition opens
+    its own descriptor, so the lock also serializes threads within one process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self) -> 'FileLock':
+        self._file = open(self.path, 'a+')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+
+def file_state(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identity of a file's current version: (inode, mtime_ns, size), or None if missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def atomic_write(path: str, write) -> None:
+    """Write a file via a temporary file and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class MemoryEvidenceStorage:
+    """
+    Keeps all evidence in a dict. Used directly when no storage path is given,
+    and as the base class of the file-backed stores that load everything into memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._store: Dict[str, Dict[str, Any]] = {}
+        # Full-text index, built on the first search and then maintained on every write
+        self._index: Optional[BM25Index] = None
+
+    def load(self) -> None:
+        """Load evidence from the backing file (nothing to do in memory)."""
+
+    def apply(self, ops: List[Operation]) -> None:
+        """Persist ``ops`` and apply them to the store."""
+        with self._lock:
+            stored = self._persist(ops)
+            apply_operations(self._store, stored)
+            if self._index is not None:
+                self._update_index(ops)
+
+    def _persist(self, ops: List[Operation]) -> List[Operation]:
+        """
+        Write ``ops`` to the backing file; called with the lock held, before the ops are
+        applied in memory. File-backed stores first merge in changes made by other processes.
+
+        Returns the operations to apply in memory (records may carry a content reference
+        instead of their content).
+        """
+        return ops
+
+    def _refresh(self) -> None:
+        """Pick up changes other processes made to the backing file; called with the lock held."""
+
+    def _update_index(self, ops: List[Operation]) -> None:
+        for op in ops:
+            if op[0] == 'add':
+                self._index.add(op[1], self._search_text(op[2]))
+            elif op[0] == 'delete':
+                self._index.remove(op[1])
+            elif op[0] == 'clear':
+                self._index.clear()
+
+    def _content(self, record: Dict[str, Any]) -> Optional[str]:
+        """Content of a stored record (stores that load content lazily read it from disk)."""
+        return record.get('content')
+
+    def _materialize(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Stored record with its content in place."""
+        if CONTENT_REF not in record:
+            return record
+        item = {k: v for k, v in record.items() if k not in CONTENT_FIELDS}
+        item['content'] = self._content(record)
+        return item
+
+    def _blob_info(self, decision_id: str, record: Dict[str, Any]) -> Optional[Tuple[str, int, int]]:
+        """
+        (key, raw_size, stored_size) of a record's stored content, or None without content.
+        Records sharing a key share one stored copy; inline content belongs to its record alone.
+        """
+        content = record.get('content')
+        if content is None:
+            return None
+        size = len(content.encode('utf-8'))
+        return decision_id, size, size
+
+    @staticmethod
+    def _metadata(decision_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        item = {'id': decision_id}
+        item.update((k, v) for k, v in record.items() if k not in CONTENT_FIELDS)
+        return item
+
+    def query(self, filters: Optional[Dict[str, Any]] = None, sort_by: str = 'timestamp',
+              descending: bool = True, offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """One page of evidence metadata matching ``filters``, sorted by ``sort_by``."""
+        check_sort_field(sort_by)
+        with self._lock:
+            self._refresh()
+            matching = [(decision_id, record) for decision_id, record in self._store.items()
+                        if matches_filters(record, filters)]
+            # Missing values sort before any value, as they do in SQLite
+            def key(item):
+                value = item[1].get(sort_by)
+                return (value is not None, value if value is not None else 0, item[0])
+            select = heapq.nlargest if descending else heapq.nsmallest
+            page = select(offset + limit, matching, key=key)[offset:]
+            return [self._metadata(decision_id, record) for decision_id, record in page]
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            self._refresh()
+            return sum(1 for record in self._store.values() if matches_filters(record, filters))
+
+    def facets(self, field: str) -> Dict[Any, int]:
+        """Number of items per distinct value of ``field``."""
+        check_sort_field(field)
+        with self._lock:
+            self._refresh()
+            return dict(Counter(record.get(field) for record in self._store.values()))
+
+    def get_footprint(self) -> List[Tuple[str, Optional[str], Optional[str], int]]:
+        """(id, type, timestamp, content bytes) of every item, without reading content."""
+        with self._lock:
+            self._refresh()
+            footprint = []
+            for decision_id, record in self._store.items():
+                info = self._blob_info(decision_id, record)
+                footprint.append((decision_id, record.get('type'), record.get('timestamp'),
+                                  info[1] if info else 0))
+            return footprint
+
+    def get_totals(self, excluded_types: Iterable[str] = ()) -> Tuple[int, int]:
+        """(items, content bytes) of the evidence whose type is not in ``excluded_types``."""
+        excluded = frozenset(excluded_types)
+        with self._lock:
+            self._refresh()
+            items = size = 0
+            for decision_id, record in self._store.items():
+                if record.get('type') not in excluded:
+                    info = self._blob_info(decision_id, record)
+                    items += 1
+                    size += info[1] if info else 0
+            return items, size
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """Deduplication and compression ratios of the stored content (see blob_stats)."""
+        with self._lock:
+            self._refresh()
+            infos = (self._blob_info(decision_id, record) for decision_id, record in self._store.items())
+            return blob_stats(info for info in infos if info is not None)
+
+    def _search_text(self, record: Dict[str, Any]) -> str:
+        return f"{record.get('source') or ''}\n{self._content(record) or ''}"
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank evidence matching every term of ``query`` with BM25."""
+        with self._lock:
+            self._refresh()
+            if self._index is None:
+                self._index = BM25Index()
+                for decision_id, record in self._store.items():
+                    self._index.add(decision_id, self._search_text(record))
+            allowed = None
+            if filters:
+                allowed = {decision_id for decision_id, record in self._store.items()
+                           if matches_filters(record, filters)}
+            hits = self._index.search(query, limit, allowed)
+
+            terms = tokenize(query)
+            results = []
+            for decision_id, score in hits:
+                record = self._store[decision_id]
+                item = {'id': decision_id, **{f: record.get(f) for f in METADATA_FIELDS}}
+                item['score'] = score
+                item['snippet'] = make_snippet(self._content(record), terms)
+                results.append(item)
+            return results
+
+    def get(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            record = self._store.get(decision_id)
+            return self._materialize(record) if record is not None else None
+
+    def get_content(self, decision_id: str) -> Optional[str]:
+        with self._lock:
+            self._refresh()
+            record = self._store.get(decision_id)
+            return self._content(record) if record is not None else None
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return {decision_id: self._materialize(record) for decision_id, record in self._store.items()}
+
+    def get_by_type(self, evidence_type: Optional[str],
+                    include_content: bool = True) -> List[Dict[str, Any]]:
+        """Evidence of one type, or of every type if ``evidence_type`` is None."""
+        with self._lock:
+            self._refresh()
+            items = []
+            for decision_id, evidence in self._store.items():
+                if evidence_type is None or evidence.get('type') == evidence_type:
+                    if include_content:
+                        item = {'id': decision_id, **self._materialize(evidence)}
+                    else:
+                        item = self._metadata(decision_id, evidence)
+                    items.append(item)
+            return items
+
+    def close(self) -> None:
+        pass
+
+
+class JsonEvidenceStorage(MemoryEvidenceStorage):
+    """
+    Stores the whole evidence dict as a single JSON document (the original format).
+
+    Writes are merged rather than overwritten: under a cross-process lock the current
+    file is re-read if another process changed it, the new operations are applied on
+    top, and the result replaces the file atomically via a temporary file.
+    """
+
+    def __init__(self, storage_path: str):
+        super().__init__()
+        self.storage_path = storage_path
+        self._file_lock = FileLock(f"{storage_path}.lock")
+        self._loaded_state = None
+
+    def read(self) -> Dict[str, Dict[str, Any]]:
+        """Read the evidence dict from the storage file."""
+        try:
+            with open(self.storage_path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+
+    def load(self) -> None:
+        """Load evidence from storage file."""
+        with self._lock:
+            self._loaded_state = file_state(self.storage_path)
+            self._store = self.read()
+            self._index = None
+
+    def _refresh(self) -> None:
+        if file_state(self.storage_path) != self._loaded_state:
+            self.load()
+
+    def _persist(self, ops: List[Operation]) -> List[Operation]:
+        """Save evidence to storage file, merged with whatever other processes wrote."""
+        with self._file_lock:
+            self._refresh()
+            merged = dict(self._store)
+            apply_operations(merged, ops)
+            atomic_write(self.storage_path, lambda f: json.dump(merged, f, indent=2))
+            self._loaded_state = file_state(self.storage_path)
+        return ops
+
+
+class JournalEvidenceStorage(MemoryEvidenceStorage):
+    """
+    Append-only journal storage.
+
+    Every add, delete or clear is appended as one JSON line to the current journal segment,
+    so the cost of a write does not depend on how much evidence is stored. Loading
+    replays the latest snapshot followed by every journal segment it does not cover.
+    Once enough operations have accumulated, a background thread folds the journal
+    into a new snapshot and deletes the segments it replaced.
+
+    Several processes can share one journal: appends happen under a cross-process lock
+    after replaying whatever other processes appended since, so every process applies
+    the same operations in the same order. Compactions are serialized by a second lock,
+    and a process that finds the snapshot replaced reloads it.
+
+    In lazy mode content bodies are appended to a separate content file and records keep
+    only a reference to them, so loading parses metadata alone and each body is read
+    through a memory map when it is asked for. Startup time and memory then grow with the
+    number of items rather than the amount of text. Records written inline (before lazy
+    mode was enabled) move to the content file at the next compaction.
+
+    Bodies in the content file are content-addressed: each is stored once, compressed,
+    under the hash of its text, and every record with the same text references that one
+    blob. Blobs no record references any more are dropped at compaction once they make
+    up most of the content file, by copying the live ones into a new content file.
+
+    Files, for a storage path of ``data/evidence.json``:
+        data/evidence.snapshot.jsonl   - header line plus one 'add' record per item
+        data/evidence.journal.<seq>.jsonl - journal segments, replayed in seq order
+        data/evidence.content[.<gen>].bin - compressed content blobs of lazy records
+
+    An existing ``data/evidence.json`` is imported as the initial snapshot.
+    """
+
+    def __init__(self, storage_path: str, compact_threshold: int = 1000, lazy: bool = False,
+                 compression: str = 'zlib'):
+        super().__init__()
+        self.storage_path = storage_path
+        self.compact_threshold = compact_threshold
+        self.lazy = lazy
+        self.compression = compression
+        root, _ = os.path.splitext(storage_path)
+        self.directory = os.path.dirname(storage_path) or '.'
+        self.prefix = os.path.basename(root)
+        self.snapshot_path = f"{root}.snapshot.jsonl"
+        self._content_files: Dict[int, ContentFile] = {}
+        # Content hash -> reference of a blob already in a content file, built on demand
+        self._blobs: Optional[Dict[str, List[int]]] = None
+
+        self._file_lock = FileLock(f"{root}.journal.lock")
+        self._compaction_file_lock = FileLock(f"{root}.compaction.lock")
+        self._compaction_lock = threading.Lock()
+        self._snapshot_state = None
+        self._covered_seq = 0
+        # Bytes of each segment already replayed into the in-memory store
+        self._offsets: Dict[int, int] = {}
+        self._log = None
+        self._log_seq = None
+        self._ops_since_compaction = 0
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}.journal.{seq}.jsonl")
+
+    def _segments(self) -> List[int]:
+        """Return the sequence numbers of the journal segments on disk, in order."""
+        pattern = re.compile(rf"^{re.escape(self.prefix)}\.journal\.(\d+)\.jsonl$")
+        seqs = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                seqs.append(int(match.group(1)))
+        return sorted(seqs)
+
+    def _replay(self, f, store: Dict[str, Dict[str, Any]]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Replay complete lines from binary file ``f`` (from its current position) into ``store``.
+
+        Returns the number of bytes consumed and the snapshot header, if one was read.
+        A trailing partial line (an append in progress, or torn by a crash) is left unread.
+        """
+        consumed = 0
+        header = None
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            consumed += len(line)
+            if entry.get('op') == 'snapshot':
+                header = entry
+            elif entry.get('op') == 'add':
+                store[entry['id']] = entry['record']
+            elif entry.get('op') == 'delete':
+                store.pop(entry['id'], None)
+            elif entry.get('op') == 'clear':
+                store.clear()
+        return consumed, header
+
+    def load(self) -> None:
+        """Rebuild the evidence dict from the snapshot and the journal segments."""
+        with self._lock:
+            if not os.path.exists(self.snapshot_path) and os.path.exists(self.storage_path):
+                with self._file_lock:
+                    if not os.path.exists(self.snapshot_path) and not self._segments():
+                        # First run in journal mode: import the legacy JSON file
+                        legacy = JsonEvidenceStorage(self.storage_path).read()
+                        if self.lazy:
+                            legacy = self._externalize(legacy)
+                        self._write_snapshot(legacy, 0)
+            self._reload()
+
+    def _reload(self) -> None:
+        store: Dict[str, Dict[str, Any]] = {}
+        covered_seq = 0
+        self._snapshot_state = file_state(self.snapshot_path)
+        if self._snapshot_state is not None:
+            with open(self.snapshot_path, 'rb') as f:
+                _, header = self._replay(f, store)
+            if header:
+                covered_seq = header.get('seq', 0)
+
+        self._offsets = {}
+        self._covered_seq = covered_seq
+        self._store = store
+        self._index = None
+        self._blobs = None
+        self._replay_segments()
+
+    def _replay_segments(self) -> bool:
+        """Replay segment bytes not seen yet; returns False if a segment vanished under us."""
+        changed = False
+        for seq in self._segments():
+            if seq < self._covered_seq:
+                continue
+            offset = self._offsets.get(seq, 0)
+            try:
+                with open(self._segment_path(seq), 'rb') as f:
+                    f.seek(offset)
+                    consumed, _ = self._replay(f, self._store)
+            except FileNotFoundError:
+                return False
+            if consumed:
+                self._offsets[seq] = offset + consumed
+                changed = True
+        if changed:
+            self._index = None
+            self._blobs = None
+        return True
+
+    def _refresh(self) -> None:
+        if file_state(self.snapshot_path) != self._snapshot_state or not self._replay_segments():
+            # Another process compacted the journal
+            self._reload()
+
+    def _current_seq(self) -> int:
+        return max(self._segments() + [self._covered_seq])
+
+    def _content_path(self, gen: int) -> str:
+        name = f"{self.prefix}.content.bin" if gen == 0 else f"{self.prefix}.content.{gen}.bin"
+        return os.path.join(self.directory, name)
+
+    def _content_gens(self) -> List[int]:
+        """Generations of the content files on disk, in order (0 is ``<prefix>.content.bin``)."""
+        pattern = re.compile(rf"^{re.escape(self.prefix)}\.content(?:\.(\d+))?\.bin$")
+        gens = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                gens.append(int(match.group(1) or 0))
+        return sorted(gens)
+
+    def _content_file(self, gen: int) -> ContentFile:
+        if gen not in self._content_files:
+            self._content_files[gen] = ContentFile(self._content_path(gen))
+        return self._content_files[gen]
+
+    def _read_blob(self, ref: List[int]) -> str:
+        # Two-element references predate compression: raw UTF-8 in the generation 0 file
+        if len(ref) == 2:
+            return self._content_file(0).read(*ref).decode('utf-8')
+        gen, offset, length = ref
+        return decode_blob(self._content_file(gen).read(offset, length))
+
+    def _content(self, record: Dict[str, Any]) -> Optional[str]:
+        if CONTENT_REF not in record:
+            return record.get('content')
+        try:
+            return self._read_blob(record[CONTENT_REF])
+        except FileNotFoundError:
+            # Another process compacted the content file away; its snapshot has the new location
+            self._reload()
+            ref = self._blob_index().get(record.get('content_hash'))
+            if ref is None:
+                raise
+            return self._read_blob(ref)
+
+    def _blob_index(self) -> Dict[str, List[int]]:
+        if self._blobs is None:
+            self._blobs = {}
+            for record in self._store.values():
+                ref = record.get(CONTENT_REF)
+                if ref is not None and len(ref) == 3 and record.get('content_hash'):
+                    self._blobs[record['content_hash']] = ref
+        return self._blobs
+
+    def _blob_info(self, decision_id: str, record: Dict[str, Any]) -> Optional[Tuple[str, int, int]]:
+        ref = record.get(CONTENT_REF)
+        if ref is None:
+            return super()._blob_info(decision_id, record)
+        if len(ref) == 2:
+            # Uncompressed and not shared
+            return decision_id, ref[1], ref[1]
+        return record['content_hash'], record['content_length'], ref[2]
+
+    def _externalize(self, records: Dict[Any, Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Move inline content bodies to the content file, returning records that reference
+        them instead. Bodies already stored are referenced rather than written again; new
+        ones are compressed and appended. Must be called with the journal file lock held.
+        """
+        inline = [key for key, record in records.items()
+                  if CONTENT_REF not in record and record.get('content') is not None]
+        if not inline:
+            return records
+
+        blobs = self._blob_index()
+        # Append to the newest content file; older ones are deleted by the compaction that
+        # created it, so their blobs are not reused either
+        gens = self._content_gens()
+        gen = gens[-1] if gens else 0
+        new_blobs: Dict[str, bytes] = {}
+        hashes = {}
+        for key in inline:
+            content = records[key]['content']
+            digest = content_hash(content)
+            hashes[key] = digest
+            if (digest not in blobs or blobs[digest][0] != gen) and digest not in new_blobs:
+                new_blobs[digest] = encode_blob(content, self.compression)
+        if new_blobs:
+            refs = self._content_file(gen).append(list(new_blobs.values()))
+            for digest, (offset, length) in zip(new_blobs, refs):
+                blobs[digest] = [gen, offset, length]
+
+        result = dict(records)
+        for key in inline:
+            record = {k: v for k, v in records[key].items() if k != 'content'}
+            record[CONTENT_REF] = blobs[hashes[key]]
+            record['content_hash'] = hashes[key]
+            record['content_length'] = len(records[key]['content'].encode('utf-8'))
+            result[key] = record
+        return result
+
+    def _collect_garbage(self, gen: int) -> bool:
+        """
+        Copy the blobs that live records reference into a new content file ``gen`` when
+        unreferenced blobs take up more than half of the content files. Must be called
+        with the journal file lock held; returns True if the content was moved.
+        """
+        live = blob_stats(self._blob_info(decision_id, record)
+                          for decision_id, record in self._store.items() if CONTENT_REF in record)
+        live_bytes = live['stored_bytes']
+        old_gens = self._content_gens()
+        disk_bytes = sum(os.path.getsize(self._content_path(g)) for g in old_gens)
+        if not old_gens or disk_bytes <= 2 * live_bytes:
+            return False
+
+        pending: Dict[str, bytes] = {}
+        hashes: Dict[str, Tuple[str, int]] = {}
+        for decision_id, record in self._store.items():
+            ref = record.get(CONTENT_REF)
+            if ref is None:
+                continue
+            if len(ref) == 3:
+                digest, raw_size = record['content_hash'], record['content_length']
+                if digest not in pending:
+                    pending[digest] = self._content_file(ref[0]).read(ref[1], ref[2])
+            else:
+                # Bodies from before content addressing are hashed and compressed on the way
+                content = self._read_blob(ref)
+                digest, raw_size = content_hash(content), len(content.encode('utf-8'))
+                if digest not in pending:
+                    pending[digest] = encode_blob(content, self.compression)
+            hashes[decision_id] = (digest, raw_size)
+        refs = self._content_file(gen).append(list(pending.values()))
+        moved = {digest: [gen, offset, length] for digest, (offset, length) in zip(pending, refs)}
+
+        store = {}
+        for decision_id, record in self._store.items():
+            if decision_id in hashes:
+                digest, raw_size = hashes[decision_id]
+                record = {**record, CONTENT_REF: moved[digest],
+                          'content_hash': digest, 'content_length': raw_size}
+            store[decision_id] = record
+        self._store = store
+        self._blobs = moved
+        return True
+
+    def _persist(self, ops: List[Operation]) -> List[Operation]:
+        """Append ``ops`` to the current journal segment after catching up with other writers."""
+        with self._file_lock:
+            self._refresh()
+            if self.lazy:
+                adds = self._externalize({i: op[2] for i, op in enumerate(ops) if op[0] == 'add'})
+                ops = [('add', op[1], adds[i]) if op[0] == 'add' else op for i, op in enumerate(ops)]
+
+            lines = []
+            for op in ops:
+                if op[0] == 'add':
+                    lines.append(json.dumps({'op': 'add', 'id': op[1], 'record': op[2]}))
+                elif op[0] == 'delete':
+                    lines.append(json.dumps({'op': 'delete', 'id': op[1]}))
+                elif op[0] == 'clear':
+                    lines.append(json.dumps({'op': 'clear'}))
+            data = ('\n'.join(lines) + '\n').encode('utf-8')
+
+            seq = self._current_seq()
+            if self._log is None or self._log_seq != seq:
+                if self._log is not None:
+                    self._log.close()
+                self._log = open(self._segment_path(seq), 'ab')
+                self._log_seq = seq
+            replayed = self._offsets.get(seq, 0)
+            if self._log.seek(0, os.SEEK_END) > replayed:
+                # A writer died part-way through a line (nobody else appends while we hold
+                # the lock); cut it off, or replay would stop there and miss every later line
+                self._log.truncate(replayed)
+            self._log.write(data)
+            self._log.flush()
+            # Nobody else can append while we hold the lock, so our own lines are already "seen"
+            self._offsets[seq] = self._offsets.get(seq, 0) + len(data)
+
+        self._ops_since_compaction += len(ops)
+        if (self._ops_since_compaction >= self.compact_threshold
+                and not (self._compaction_thread and self._compaction_thread.is_alive())):
+            self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compaction_thread.start()
+        return ops
+
+    def _write_snapshot(self, store: Dict[str, Dict[str, Any]], seq: int) -> None:
+        """Atomically replace the snapshot with ``store``, marked as covering segments < ``seq``."""
+        def write(f):
+            f.write(json.dumps({'op': 'snapshot', 'seq': seq}) + '\n')
+            for decision_id, record in store.items():
+                f.write(json.dumps({'op': 'add', 'id': decision_id, 'record': record}) + '\n')
+
+        atomic_write(self.snapshot_path, write)
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot and remove the segments it covers."""
+        with self._compaction_lock, self._compaction_file_lock:
+            with self._lock, self._file_lock:
+                self._refresh()
+                # Rotate to a fresh segment so writers never wait on the snapshot being written
+                seq = self._current_seq() + 1
+                open(self._segment_path(seq), 'ab').close()
+                collected = False
+                if self.lazy:
+                    self._store = self._externalize(self._store)
+                    collected = self._collect_garbage(seq)
+                state = dict(self._store)
+                self._ops_since_compaction = 0
+
+            self._write_snapshot(state, seq)
+            with self._lock:
+                self._snapshot_state = file_state(self.snapshot_path)
+                self._covered_seq = seq
+                for old_seq in list(self._offsets):
+                    if old_seq < seq:
+                        del self._offsets[old_seq]
+            for old_seq in self._segments():
+                if old_seq < seq:
+                    os.remove(self._segment_path(old_seq))
+            if collected:
+                for old_gen in self._content_gens():
+                    if old_gen < seq:
+                        with self._lock:
+                            content_file = self._content_files.pop(old_gen, None)
+                        if content_file is not None:
+                            content_file.close()
+                        os.remove(self._content_path(old_gen))
+
+    def close(self) -> None:
+        """Wait for a running compaction and close the journal segment."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for content_file in self._content_files.values():
+                content_file.close()
+
+
+class SQLiteEvidenceStorage:
+    """
+    Evidence kept in a SQLite database next to the JSON path (``data/evidence.sqlite3``
+    for ``data/evidence.json``).
+
+    Metadata lives in the ``evidence`` table, indexed on type, agent, confidence and
+    timestamp; content bodies live in ``evidence_blobs`` so metadata queries never
+    touch them. Bodies are content-addressed: each distinct text is stored once,
+    compressed, under its hash, with a reference count of the evidence rows using it,
+    and is deleted when the count drops to zero. Source and content are also indexed in
+    the ``evidence_fts`` FTS5 table, updated in the same transaction as every write; it
+    reads text through the ``evidence_text`` view instead of keeping its own copy.
+    Nothing is held in memory, so the store can grow past available RAM. The legacy
+    JSON file is migrated on first run.
+
+    SQLite's own locking makes the store safe for several processes: the database runs
+    in WAL mode and every batch of operations is a single IMMEDIATE transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS evidence (
+            id TEXT PRIMARY KEY,
+            type TEXT,
+            source TEXT,
+            agent TEXT,
+            confidence INTEGER,
+            timestamp TEXT,
+            content_length INTEGER,
+            content_hash TEXT
+        );
+        CREATE TABLE IF NOT EXISTS evidence_blobs (
+            hash TEXT PRIMARY KEY,
+            data BLOB,
+            size INTEGER,
+            refcount INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS storage_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    # Objects that need the content_hash column, which older databases only get on open
+    INDEX_SCHEMA = """
+        CREATE INDEX IF NOT EXISTS idx_evidence_type ON evidence(type, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_evidence_agent ON evidence(agent);
+        CREATE INDEX IF NOT EXISTS idx_evidence_confidence ON evidence(confidence);
+        CREATE INDEX IF NOT EXISTS idx_evidence_timestamp ON evidence(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_evidence_content_hash ON evidence(content_hash);
+        CREATE VIEW IF NOT EXISTS evidence_text AS
+            SELECT e.rowid AS rowid, e.source AS source, evidence_text(b.data) AS content
+            FROM evidence e LEFT JOIN evidence_blobs b ON b.hash = e.content_hash;
+    """
+
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5(
+            source,
+            content,
+            content = 'evidence_text',
+            tokenize = 'porter unicode61'
+        )
+    """
+
+    def __init__(self, storage_path: str, compression: str = 'zlib'):
+        self.storage_path = storage_path
+        self.compression = compression
+        root, _ = os.path.splitext(storage_path)
+        self.db_path = f"{root}.sqlite3"
+        self._lock = threading.Lock()
+        # Streamlit reruns a session's script on different threads, so the connection
+        # is shared across threads and serialized with the lock instead
+        self._conn = sqlite3.connect(
+            self.db_path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        # Lets the full-text index read compressed bodies through the evidence_text view
+        self._conn.create_function(
+            'evidence_text', 1, lambda data: decode_blob(data) if data is not None else None,
+            deterministic=True,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(evidence)")}
+        if 'content_hash' not in columns:
+            try:
+                self._conn.execute("ALTER TABLE evidence ADD COLUMN content_hash TEXT")
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+        self._conn.executescript(self.INDEX_SCHEMA)
+        self._conn.execute(self.FTS_SCHEMA)
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM storage_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str = '1') -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO storage_meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def load(self) -> None:
+        """Migrate the legacy JSON file into the database the first time it is opened."""
+        with self._lock, self._transaction():
+            moved_content = False
+            if not self._meta('json_migrated'):
+                if os.path.exists(self.storage_path):
+                    legacy = JsonEvidenceStorage(self.storage_path).read()
+                    for decision_id, record in legacy.items():
+                        self._insert(decision_id, record)
+                self._set_meta('json_migrated')
+
+            # Databases from before content addressing keep plain bodies in evidence_content
+            # and a second copy of them in the full-text index; move both over once
+            has_content_table = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'evidence_content'"
+            ).fetchone()
+            if has_content_table:
+                rows = self._conn.execute(
+                    "SELECT id, content FROM evidence_content WHERE content IS NOT NULL"
+                ).fetchall()
+                for row in rows:
+                    self._conn.execute(
+                        "UPDATE evidence SET content_hash = ? WHERE id = ?",
+                        (self._store_blob(row['content']), row['id']),
+                    )
+                self._conn.execute("DROP TABLE evidence_content")
+                self._conn.execute("DROP TABLE evidence_fts")
+                self._conn.execute(self.FTS_SCHEMA)
+                self._conn.execute("DELETE FROM storage_meta WHERE key = 'fts_built'")
+                moved_content = True
+
+            # Lengths used to be counted in characters; bodies record their size in bytes
+            if not self._meta('content_length_bytes'):
+                self._conn.execute(
+                    "UPDATE evidence SET content_length = COALESCE("
+                    "(SELECT size FROM evidence_blobs b WHERE b.hash = evidence.content_hash), 0)"
+                )
+                self._set_meta('content_length_bytes')
+
+            # Databases created before full-text search existed get their index built once
+            if not self._meta('fts_built'):
+                self._conn.execute("INSERT INTO evidence_fts (evidence_fts) VALUES ('rebuild')")
+                self._set_meta('fts_built')
+        if moved_content:
+            # Give the pages of the dropped tables back to the file system
+            with self._lock:
+                self._conn.execute("VACUUM")
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Run a write transaction that takes the database write lock up front, so concurrent
+        writers queue on SQLite's busy timeout instead of failing on lock upgrades.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _store_blob(self, content: str) -> str:
+        """Take a reference to the blob holding ``content``, storing it if it is new."""
+        digest = content_hash(content)
+        updated = self._conn.execute(
+            "UPDATE evidence_blobs SET refcount = refcount + 1 WHERE hash = ?", (digest,)
+        )
+        if updated.rowcount == 0:
+            self._conn.execute(
+                "INSERT INTO evidence_blobs (hash, data, size, refcount) VALUES (?, ?, ?, 1)",
+                (digest, encode_blob(content, self.compression), len(content.encode('utf-8'))),
+            )
+        return digest
+
+    def _release_blob(self, digest: str) -> None:
+        """Drop a reference to a blob, deleting the blob when nothing uses it any more."""
+        self._conn.execute(
+            "UPDATE evidence_blobs SET refcount = refcount - 1 WHERE hash = ?", (digest,)
+        )
+        self._conn.execute(
+            "DELETE FROM evidence_blobs WHERE hash = ? AND refcount <= 0", (digest,)
+        )
+
+    def _existing(self, decision_id: str) -> Optional[sqlite3.Row]:
+        return self._conn.execute(
+            "SELECT e.rowid, e.source, e.content_hash, b.data FROM evidence e "
+            "LEFT JOIN evidence_blobs b ON b.hash = e.content_hash WHERE e.id = ?",
+            (decision_id,),
+        ).fetchone()
+
+    def _unindex(self, row: sqlite3.Row) -> None:
+        """Remove an evidence row's full-text entry and its reference to its body."""
+        # Rows of an external-content index are deleted by repeating what was indexed
+        old_content = decode_blob(row['data']) if row['data'] is not None else None
+        self._conn.execute(
+            "INSERT INTO evidence_fts (evidence_fts, rowid, source, content) "
+            "VALUES ('delete', ?, ?, ?)",
+            (row['rowid'], row['source'], old_content),
+        )
+        if row['content_hash']:
+            self._release_blob(row['content_hash'])
+
+    def _insert(self, decision_id: str, record: Dict[str, Any]) -> None:
+        content = record.get('content')
+        # The FTS row shares the evidence rowid, which changes when a decision is replaced
+        previous = self._existing(decision_id)
+        # Reference the new body before releasing the old one, which may be the same blob
+        digest = self._store_blob(content) if content is not None else None
+        if previous:
+            self._unindex(previous)
+        cursor = self._conn.execute(
+            "INSERT OR REPLACE INTO evidence "
+            "(id, type, source, agent, confidence, timestamp, content_length, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (decision_id, record.get('type'), record.get('source'), record.get('agent'),
+             record.get('confidence'), record.get('timestamp'),
+             len(content.encode('utf-8')) if content is not None else 0, digest),
+        )
+        self._conn.execute(
+            "INSERT INTO evidence_fts (rowid, source, content) VALUES (?, ?, ?)",
+            (cursor.lastrowid, record.get('source'), content),
+        )
+
+    def apply(self, ops: List[Operation]) -> None:
+        """Apply ``ops`` in a single transaction."""
+        with self._lock, self._transaction():
+            for op in ops:
+                if op[0] == 'add':
+                    self._insert(op[1], op[2])
+                elif op[0] == 'delete':
+                    previous = self._existing(op[1])
+                    if previous:
+                        self._unindex(previous)
+                        self._conn.execute("DELETE FROM evidence WHERE id = ?", (op[1],))
+                elif op[0] == 'clear':
+                    self._conn.execute("DELETE FROM evidence")
+                    self._conn.execute("DELETE FROM evidence_blobs")
+                    self._conn.execute("INSERT INTO evidence_fts (evidence_fts) VALUES ('delete-all')")
+
+    def _rows(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _record(row: sqlite3.Row, include_content: bool = True) -> Dict[str, Any]:
+        record = {field: row[field] for field in METADATA_FIELDS}
+        if include_content:
+            record['content'] = decode_blob(row['data']) if row['data'] is not None else None
+        return record
+
+    def get(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._rows(
+            "SELECT e.*, b.data FROM evidence e LEFT JOIN evidence_blobs b ON b.hash = e.content_hash "
+            "WHERE e.id = ?",
+            (decision_id,),
+        )
+        return self._record(rows[0]) if rows else None
+
+    def get_content(self, decision_id: str) -> Optional[str]:
+        rows = self._rows(
+            "SELECT b.data FROM evidence e JOIN evidence_blobs b ON b.hash = e.content_hash "
+            "WHERE e.id = ?",
+            (decision_id,),
+        )
+        return decode_blob(rows[0]['data']) if rows else None
+
+    def get_footprint(self) -> List[Tuple[str, Optional[str], Optional[str], int]]:
+        """(id, type, timestamp, content bytes) of every item, oldest first."""
+        rows = self._rows(
+            "SELECT e.id, e.type, e.timestamp, COALESCE(b.size, 0) AS size FROM evidence e "
+            "LEFT JOIN evidence_blobs b ON b.hash = e.content_hash ORDER BY e.timestamp"
+        )
+        return [(row['id'], row['type'], row['timestamp'], row['size']) for row in rows]
+
+    def get_totals(self, excluded_types: Iterable[str] = ()) -> Tuple[int, int]:
+        """(items, content bytes) of the evidence whose type is not in ``excluded_types``."""
+        excluded = tuple(excluded_types)
+        clause = f" WHERE type IS NULL OR type NOT IN ({', '.join('?' * len(excluded))})" if excluded else ""
+        row = self._rows(f"SELECT COUNT(*), COALESCE(SUM(content_length), 0) FROM evidence{clause}", excluded)[0]
+        return row[0], row[1]
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """Deduplication and compression ratios of the stored content (see blob_stats)."""
+        rows = self._rows(
+            "SELECT e.content_hash, b.size, length(b.data) AS stored FROM evidence e "
+            "JOIN evidence_blobs b ON b.hash = e.content_hash"
+        )
+        return blob_stats((row['content_hash'], row['size'], row['stored']) for row in rows)
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._rows(
+            "SELECT e.*, b.data FROM evidence e LEFT JOIN evidence_blobs b ON b.hash = e.content_hash "
+            "ORDER BY e.rowid"
+        )
+        return {row['id']: self._record(row) for row in rows}
+
+    def get_by_type(self, evidence_type: Optional[str],
+                    include_content: bool = True) -> List[Dict[str, Any]]:
+        """Evidence of one type, or of every type if ``evidence_type`` is None."""
+        where, params = ("WHERE e.type = ? ", (evidence_type,)) if evidence_type is not None else ("", ())
+        if include_content:
+            rows = self._rows(
+                "SELECT e.*, b.data FROM evidence e LEFT JOIN evidence_blobs b ON b.hash = e.content_hash "
+                f"{where}ORDER BY e.timestamp",
+                params,
+            )
+        else:
+            rows = self._rows(f"SELECT * FROM evidence e {where}ORDER BY e.timestamp", params)
+        return [{'id': row['id'], **self._record(row, include_content)} for row in rows]
+
+    @staticmethod
+    def _filter_clauses(filters: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+        """WHERE conditions (on alias ``e``) and parameters for search filters."""
+        where: List[str] = []
+        params: List[Any] = []
+        for field in FILTER_FIELDS:
+            if filters and filters.get(field) is not None:
+                where.append(f"e.{field} = ?")
+                params.append(filters[field])
+        if filters and filters.get('min_confidence') is not None:
+            where.append("e.confidence >= ?")
+            params.append(filters['min_confidence'])
+        return where, params
+
+    def query(self, filters: Optional[Dict[str, Any]] = None, sort_by: str = 'timestamp',
+              descending: bool = True, offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """One page of evidence metadata matching ``filters``, sorted by ``sort_by``."""
+        check_sort_field(sort_by)
+        where, params = self._filter_clauses(filters)
+        clause = f"WHERE {' AND '.join(where)} " if where else ""
+        direction = "DESC" if descending else "ASC"
+        rows = self._rows(
+            f"SELECT * FROM evidence e {clause}"
+            f"ORDER BY e.{sort_by} {direction}, e.id {direction} LIMIT ? OFFSET ?",
+            tuple(params + [limit, offset]),
+        )
+        return [{'id': row['id'], **self._record(row, include_content=False)} for row in rows]
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        where, params = self._filter_clauses(filters)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        return self._rows(f"SELECT COUNT(*) FROM evidence e{clause}", tuple(params))[0][0]
+
+    def facets(self, field: str) -> Dict[Any, int]:
+        """Number of items per distinct value of ``field``."""
+        check_sort_field(field)
+        rows = self._rows(f"SELECT {field}, COUNT(*) FROM evidence GROUP BY {field}")
+        return {row[0]: row[1] for row in rows}
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank evidence matching every term of ``query`` with FTS5's BM25."""
+        terms = words(query)
+        if not terms:
+            return []
+        # Quote each word so user input is never parsed as FTS5 query syntax; FTS5 stems it
+        # with the same porter rules as tokenize()
+        match = ' '.join(f'"{term}"' for term in terms)
+
+        where, params = self._filter_clauses(filters)
+        where.insert(0, "evidence_fts MATCH ?")
+        params.insert(0, match)
+        params.append(limit)
+
+        rows = self._rows(
+            "SELECT e.*, bm25(evidence_fts) AS rank, "
+            "snippet(evidence_fts, 1, '**', '**', '…', 24) AS snippet "
+            "FROM evidence_fts JOIN evidence e ON e.rowid = evidence_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY rank LIMIT ?",
+            tuple(params),
+        )
+        results = []
+        for row in rows:
+            item = {'id': row['id'], **self._record(row, include_content=False)}
+            # bm25() is lower-is-better; flip it so higher scores mean better matches
+            item['score'] = -row['rank']
+            item['snippet'] = row['snippet'].replace('\n', ' ')
+            results.append(item)
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+STORAGE_MODES = {
+    'json': JsonEvidenceStorage,
+    'journal': JournalEvidenceStorage,
+    'sqlite': SQLiteEvidenceStorage,
+}
+
+
+def open_storage(storage_mode: str, storage_path: Optional[str], lazy: bool = False, **options):
+    """
+    Create the storage backend for ``storage_mode`` (in memory when there is no path).
+
+    ``lazy`` only changes the journal: SQLite always reads content on demand, and the
+    JSON and in-memory stores hold everything in memory by design. Likewise the
+    ``compression`` option applies to SQLite and the lazy journal; JSON keeps plain text.
+    """
+    if not storage_path:
+        return MemoryEvidenceStorage()
+    if storage_mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown evidence storage mode: {storage_mode}")
+    if storage_mode == 'journal':
+        options['lazy'] = lazy
+    if storage_mode == 'json':
+        options.pop('compression', None)
+    return STORAGE_MODES[storage_mode](storage_path, **options)
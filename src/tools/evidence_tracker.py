@@ -1,39 +1,141 @@
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-import json
 import os
+import weakref
 import streamlit as st
 
+from tools.evidence_retention import RetentionPolicy, shared_retention
+from tools.evidence_storage import open_storage
+from tools.evidence_writer import coalesce_operations
+
 class EvidenceTracker:
-    def __init__(self, storage_path: Optional[str] = None):
+    def __init__(
+        self,
+        storage_path: Optional[str] = None,
+        storage_mode: str = 'json',
+        vector_db_path: Optional[str] = None,
+        async_writes: bool = False,
+        max_pending_writes: int = 1000,
+        lazy_content: bool = False,
+        retention: Optional[RetentionPolicy] = None,
+        **storage_options
+    ):
         """
         Initialize the evidence tracker.
         
         Args:
             storage_path: Optional path to store evidence data. If None, stores in memory only.
+            storage_mode: How evidence is persisted: 'json' rewrites a single JSON file on every
+                change, 'journal' appends each change to a log that is compacted in the background,
+                'sqlite' keeps evidence in an indexed SQLite database instead of in memory.
+            vector_db_path: Optional Chroma directory; when set, evidence is chunked, embedded
+                locally and indexed there for similar(). Trackers in one process share the
+                index of a directory (see shared_vector_index).
+            async_writes: Persist changes on a background thread that coalesces bursts of
+                writes, so add_evidence never waits on disk. Call flush() for a durability point.
+            max_pending_writes: Bound on queued, unwritten changes when async_writes is on.
+            lazy_content: Keep only metadata in memory and read content bodies from disk when
+                they are asked for ('journal' mode; 'sqlite' always does, 'json' never can).
+            retention: Optional limits (item count, content bytes, per-type TTL) enforced
+                after every write by evicting the least recently used or oldest evidence.
+            storage_options: Extra options for the storage backend (e.g. compact_threshold for 'journal',
+                compression='zlib'|'lzma'|'none' for content bodies in 'sqlite' and lazy 'journal').
         """
-        self.evidence_store: Dict[str, Dict[str, Any]] = {}
         self.storage_path = storage_path
+        self.storage_mode = storage_mode
         
         # Create storage directory if it doesn't exist
         if self.storage_path:
             os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-            if os.path.exists(self.storage_path):
-                self._load_evidence()
+        self._storage = open_storage(storage_mode, self.storage_path, lazy=lazy_content, **storage_options)
+        self._load_evidence()
+
+        self._retention = None
+        if retention:
+            # Trackers of one store share the mirror, and with it the LRU order
+            self._retention = shared_retention(storage_mode, self.storage_path, retention)
+            self._retention.load(self._storage.get_footprint())
+
+        self._vectors = None
+        if vector_db_path:
+            from tools.evidence_vectors import shared_vector_index
+            self._vectors = shared_vector_index(vector_db_path)
+            self._vectors.backfill(self._storage.get_all)
+
+        self._writer = None
+        if async_writes:
+            from tools.evidence_writer import EvidenceWriter
+            self._writer = EvidenceWriter(self._apply_operations, max_pending=max_pending_writes)
+            # The writer holds the tracker only while writes are queued; stop its thread once
+            # a dropped tracker is collected
+            weakref.finalize(self, self._writer.close)
+
+    @property
+    def evidence_store(self) -> Dict[str, Dict[str, Any]]:
+        """All evidence keyed by decision ID (built on demand for the SQLite backend)."""
+        self._sync()
+        return self._storage.get_all()
                 
     def _load_evidence(self) -> None:
-        """Load evidence from storage file."""
-        try:
-            with open(self.storage_path, 'r') as f:
-                self.evidence_store = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            self.evidence_store = {}
-
-    def _save_evidence(self) -> None:
-        """Save evidence to storage file."""
-        if self.storage_path:
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.evidence_store, f, indent=2)
+        """Load evidence from storage."""
+        self._storage.load()
+
+    def _save_evidence(self, ops: List[tuple]) -> None:
+        """Persist operations, on the background writer if there is one."""
+        if self._writer:
+            self._writer.submit(ops)
+        else:
+            self._apply_operations(ops)
+
+    def _apply_operations(self, ops: List[tuple]) -> None:
+        """Apply operations, plus any evictions they trigger, to the store and the similarity index."""
+        self._write(ops)
+        if self._retention is not None:
+            evictions = self._enforce_retention(ops)
+            if evictions:
+                self._write(evictions)
+
+    def _write(self, ops: List[tuple]) -> None:
+        self._storage.apply(ops)
+        if self._vectors:
+            final = coalesce_operations(ops)
+            if final and final[0][0] == 'clear':
+                self._vectors.clear()
+            self._vectors.remove_many([op[1] for op in final if op[0] == 'delete'])
+            adds = {op[1]: op[2] for op in final if op[0] == 'add'}
+            if adds:
+                self._vectors.index_many(adds)
+
+    def _enforce_retention(self, ops: List[tuple]) -> List[tuple]:
+        """
+        Account for the applied ``ops`` in the retention state and return the deletes it calls
+        for. The limits hold for the store, not for this tracker's writes: when the store's
+        totals differ from the state, other trackers (sessions or processes) have written to
+        it, and the state is loaded again from the store first.
+        """
+        for op in ops:
+            if op[0] == 'add':
+                record = op[2]
+                size = len((record.get('content') or '').encode('utf-8'))
+                self._retention.record_add(op[1], record.get('type'), record.get('timestamp'), size)
+            elif op[0] == 'delete':
+                self._retention.record_delete(op[1])
+            elif op[0] == 'clear':
+                self._retention.record_clear()
+        totals = self._storage.get_totals(self._retention.policy.protected_types)
+        if totals != (len(self._retention), self._retention.total_bytes):
+            self._retention.load(self._storage.get_footprint())
+        return [('delete', decision_id) for decision_id in self._retention.collect()]
+
+    def _sync(self) -> None:
+        """Make queued writes visible before reading."""
+        if self._writer and self._writer.pending:
+            self._writer.flush()
+
+    def flush(self) -> None:
+        """Block until every change made so far has been written to storage."""
+        if self._writer:
+            self._writer.flush()
 
     def add_evidence(
         self,
@@ -55,7 +157,7 @@ class EvidenceTracker:
             agent_name: Name of the agent that provided the evidence
             confidence: Confidence level (1-5) in the evidence
         """
-        self.evidence_store[decision_id] = {
+        record = {
             'type': evidence_type,
             'source': source,
             'content': content,
@@ -64,49 +166,220 @@ class EvidenceTracker:
             'timestamp': datetime.now().isoformat()
         }
         
-        self._save_evidence()
+        self._save_evidence([('add', decision_id, record)])
 
     def get_evidence(self, decision_id: str) -> Dict[str, Any]:
         """Retrieve evidence for a specific decision."""
-        return self.evidence_store.get(decision_id, None)
+        self._sync()
+        if self._retention is not None:
+            self._retention.touch(decision_id)
+        return self._storage.get(decision_id)
+
+    def get_content(self, decision_id: str) -> Optional[str]:
+        """Retrieve only the content body of a piece of evidence."""
+        self._sync()
+        if self._retention is not None:
+            self._retention.touch(decision_id)
+        return self._storage.get_content(decision_id)
 
     def get_all_evidence(self) -> Dict[str, Dict[str, Any]]:
         """Retrieve all evidence."""
-        return self.evidence_store
+        self._sync()
+        return self._storage.get_all()
+
+    def get_evidence_by_type(self, evidence_type: Optional[str], include_content: bool = True) -> List[Dict[str, Any]]:
+        """Retrieve all evidence of a specific type, or of every type if None (metadata only if include_content is False)."""
+        self._sync()
+        return self._storage.get_by_type(evidence_type, include_content)
+
+    def query_evidence(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_by: str = 'timestamp',
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve one page of evidence metadata (no content).
+        
+        Args:
+            filters: Optional filters: 'type', 'agent', 'source' (exact) and 'min_confidence'
+            sort_by: 'timestamp', 'confidence', 'type', 'source' or 'agent'
+            descending: Sort order
+            offset: Number of matching items to skip
+            limit: Page size
+        """
+        self._sync()
+        return self._storage.query(filters, sort_by, descending, offset, limit)
 
-    def get_evidence_by_type(self, evidence_type: str) -> List[Dict[str, Any]]:
-        """Retrieve all evidence of a specific type."""
-        return [
-            {"id": decision_id, **evidence}
-            for decision_id, evidence in self.evidence_store.items()
-            if evidence.get("type") == evidence_type
-        ]
+    def count_evidence(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Count the evidence matching ``filters`` (see query_evidence)."""
+        self._sync()
+        return self._storage.count(filters)
+
+    def evidence_facets(self, field: str = 'type') -> Dict[Any, int]:
+        """Count evidence per distinct value of a field ('type', 'agent', ...)."""
+        self._sync()
+        return self._storage.facets(field)
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over evidence sources and content.
+        
+        Args:
+            query: Free text; every term must appear in the evidence
+            filters: Optional filters: 'type', 'agent', 'source' (exact) and 'min_confidence'
+            limit: Maximum number of results
+            
+        Returns:
+            Evidence metadata ranked best first, each with a 'score' and a highlighted 'snippet'
+        """
+        self._sync()
+        return self._storage.search(query, filters, limit)
+
+    def similar(self, text: str, k: int = 5, evidence_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the evidence most semantically similar to a piece of text.
+        
+        Args:
+            text: Query text (an assumption, idea description, search query...)
+            k: Maximum number of evidence items to return
+            evidence_type: Optional type to restrict results to
+            
+        Returns:
+            Evidence metadata ranked best first, each with a similarity 'score' and the matching
+            chunk as 'snippet'. Empty if the tracker was created without a vector_db_path.
+        """
+        if not self._vectors:
+            return []
+        self._sync()
+        return self._vectors.similar(text, k, evidence_type)
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """
+        How much storing each distinct body once, compressed, saves.
+        
+        Returns:
+            Counts of items and unique bodies, byte totals before dedup, after dedup and
+            after compression, and 'dedup_ratio', 'compression_ratio' and 'overall_ratio'
+        """
+        self._sync()
+        return self._storage.storage_stats()
+
+    def delete_evidence(self, decision_id: str) -> None:
+        """Remove one piece of evidence from the store."""
+        self._save_evidence([('delete', decision_id)])
 
     def clear_evidence(self) -> None:
         """Clear all evidence from the store."""
-        self.evidence_store.clear()
-        self._save_evidence()
+        self._save_evidence([('clear',)])
+
+    def compact(self) -> None:
+        """Fold the journal into a snapshot now instead of waiting for the background compaction."""
+        if hasattr(self._storage, 'compact'):
+            self._storage.compact()
+
+    def close(self) -> None:
+        """Flush pending writes and release the storage backend (waits for a running compaction)."""
+        if self._writer:
+            self._writer.close()
+        self._storage.close()
+
+# Sort options of the evidence viewer: label -> (field, descending)
+EVIDENCE_SORT_ORDERS = {
+    "Newest first": ('timestamp', True),
+    "Oldest first": ('timestamp', False),
+    "Highest confidence": ('confidence', True),
+    "Source": ('source', False),
+}
 
-def display_evidence(evidence_tracker, filter_type=None):
-    """Display evidence in a Streamlit interface."""
+def display_evidence(evidence_tracker, filter_type=None, page_size=20):
+    """Display evidence in a Streamlit interface, one page at a time."""
+    key = filter_type or 'all'
+    query = st.text_input("🔎 Search evidence", key=f"evidence_search_{key}")
+    if query:
+        results = evidence_tracker.search(query, filters={'type': filter_type} if filter_type else None, limit=20)
+        st.write(f"### Search results for \"{query}\"")
+        if not results:
+            st.write("No matching evidence.")
+        for item in results:
+            with st.expander(f"{item.get('source')} ({item.get('type')})"):
+                st.write(f"**Decision ID:** {item.get('id')}")
+                st.write(f"**Agent:** {item.get('agent')}")
+                st.write(f"**Timestamp:** {item.get('timestamp')}")
+                st.markdown(item.get('snippet'))
+        return
+    
     if filter_type:
-        evidence = evidence_tracker.get_evidence_by_type(filter_type)
         st.write(f"### Evidence ({filter_type})")
     else:
-        evidence = [{"id": k, **v} for k, v in evidence_tracker.get_all_evidence().items()]
         st.write("### All Evidence")
-    
-    if not evidence:
+
+    type_counts = evidence_tracker.evidence_facets('type')
+    if not type_counts:
         st.write("No evidence available.")
         return
-    
+
+    # Filtering, sorting and paging happen in the store; only the visible page is fetched
+    filters = {'type': filter_type} if filter_type else {}
+    columns = st.columns(4)
+    if not filter_type:
+        types = sorted(t for t in type_counts if t)
+        chosen_type = columns[0].selectbox(
+            "Type", ["All types"] + types, key=f"evidence_type_{key}",
+            format_func=lambda t: t if t == "All types" else f"{t} ({type_counts[t]})"
+        )
+        if chosen_type != "All types":
+            filters['type'] = chosen_type
+    agents = sorted(a for a in evidence_tracker.evidence_facets('agent') if a)
+    chosen_agent = columns[1].selectbox("Agent", ["All agents"] + agents, key=f"evidence_agent_{key}")
+    if chosen_agent != "All agents":
+        filters['agent'] = chosen_agent
+    min_confidence = columns[2].slider("Min confidence", 1, 5, 1, key=f"evidence_confidence_{key}")
+    if min_confidence > 1:
+        filters['min_confidence'] = min_confidence
+    sort_label = columns[3].selectbox("Sort by", list(EVIDENCE_SORT_ORDERS), key=f"evidence_sort_{key}")
+    sort_by, descending = EVIDENCE_SORT_ORDERS[sort_label]
+
+    total = evidence_tracker.count_evidence(filters)
+    pages = max(1, -(-total // page_size))
+    page_key = f"evidence_page_{key}"
+    page = min(st.session_state.get(page_key, 0), pages - 1)
+    previous_col, info_col, next_col = st.columns([1, 4, 1])
+    if previous_col.button("◀ Previous", key=f"evidence_previous_{key}", disabled=page == 0):
+        page -= 1
+    if next_col.button("Next ▶", key=f"evidence_next_{key}", disabled=page >= pages - 1):
+        page += 1
+    st.session_state[page_key] = page
+
+    evidence = evidence_tracker.query_evidence(filters, sort_by, descending, page * page_size, page_size)
+    stats = evidence_tracker.storage_stats()
+    info_col.caption(
+        f"{page * page_size + 1 if evidence else 0}–{page * page_size + len(evidence)} of {total} "
+        f"· page {page + 1}/{pages} · dedup {stats['dedup_ratio']:.1f}× "
+        f"· compression {stats['compression_ratio']:.1f}×"
+    )
+    if not evidence:
+        st.write("No evidence matches these filters.")
+
     for item in evidence:
-        with st.expander(f"{item.get('source')} ({item.get('type')})"):
-            st.write(f"**Decision ID:** {item.get('id')}")
-            st.write(f"**Source:** {item.get('source')}")
-            st.write(f"**Type:** {item.get('type')}")
-            st.write(f"**Agent:** {item.get('agent')}")
-            st.write(f"**Confidence:** {'⭐' * item.get('confidence', 0)}")
-            st.write(f"**Timestamp:** {item.get('timestamp')}")
-            st.write("**Content:**")
-            st.write(item.get('content'))
\ No newline at end of file
+        with st.expander(f"{item.get('source')} ({item.get('type')}) {'⭐' * (item.get('confidence') or 0)}"):
+            st.markdown(
+                f"**Decision ID:** {item.get('id')}  \n"
+                f"**Agent:** {item.get('agent')}  \n"
+                f"**Timestamp:** {item.get('timestamp')}"
+            )
+            # Streamlit renders collapsed expanders too, so content waits for this toggle
+            if st.toggle("Show content", key=f"evidence_content_{key}_{item.get('id')}"):
+                st.write(evidence_tracker.get_content(item.get('id')))
+
+def display_related_evidence(evidence_tracker, text, k=3, title="Related evidence"):
+    """Show the prior evidence most similar to ``text``, if there is any."""
+    related = evidence_tracker.similar(text, k=k)
+    if not related:
+        return
+    st.write(f"**{title}:**")
+    for item in related:
+        st.caption(f"{item.get('source')} ({item.get('type')}) · similarity {item.get('score', 0):.2f}")
+        st.write(item.get('snippet'))
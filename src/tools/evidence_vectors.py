@@ -0,0 +1,281 @@
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+
+from tools.evidence_search import words
+
+logger = logging.getLogger(__name__)
+
+# Whether default_embedder() has warned about falling back to hashing
+_fallback_logged = False
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 150) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring paragraph boundaries.
+
+    Args:
+        text: Text to split
+        chunk_size: Target maximum chunk length in characters
+        overlap: Characters carried over from the end of the previous chunk
+    """
+    text = (text or '').strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        # Oversized paragraphs are cut at word boundaries
+        while len(paragraph) > chunk_size:
+            cut = paragraph.rfind(' ', 0, chunk_size)
+            cut = cut if cut > chunk_size // 2 else chunk_size
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            pieces.append(paragraph)
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > chunk_size:
+            chunks.append(current)
+            current = current[-overlap:].lstrip() if overlap else ''
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline text embedder (the "hashing trick").
+
+    Word unigrams and bigrams are hashed into a fixed number of signed buckets and the
+    vector is L2-normalized, so cosine similarity reflects shared vocabulary. It needs
+    no model download, which makes it the fallback whenever no local model is available.
+    """
+
+    # Cosine similarity from which two short texts count as the same request. Rewordings
+    # share only a few words ("ADHD learning game for kids" / "educational game for
+    # children with ADHD" score 0.40), so this is far lower than for a language model.
+    match_threshold = 0.35
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _bucket(self, feature: str):
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        return value % self.dimensions, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            tokens = words(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            vector = [0.0] * self.dimensions
+            for feature in features:
+                index, sign = self._bucket(feature)
+                vector[index] += sign
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model, loaded from the local cache only (never downloaded)."""
+
+    match_threshold = 0.75
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, local_files_only=True)
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(texts, normalize_embeddings=True).tolist()
+
+
+class OpenAIEmbedder:
+    """
+    OpenAI embeddings (OPENAI_API_KEY), the model crewai_tools' WebsiteSearchTool uses. The
+    client is created on first use, so building tools does not require the key.
+    """
+
+    batch_size = 256
+
+    def __init__(self, model_name: str = 'text-embedding-3-small'):
+        self.model_name = model_name
+        self.name = f"openai-{model_name}"
+        self._client = None
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI()
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self._client.embeddings.create(
+                model=self.model_name, input=texts[start:start + self.batch_size]
+            )
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return vectors
+
+
+def default_embedder():
+    """
+    Use a locally cached sentence-transformers model if there is one, else hashing. The
+    hashing embedder only matches shared words, so falling back to it logs a warning
+    (once per process).
+    """
+    global _fallback_logged
+    try:
+        return SentenceTransformerEmbedder()
+    except Exception as error:
+        if not _fallback_logged:
+            _fallback_logged = True
+            logger.warning(
+                "No local sentence-transformers model (%s: %s); evidence similarity uses the "
+                "hashing embedder, which only matches shared words",
+                type(error).__name__, error,
+            )
+        return HashingEmbedder()
+
+
+class EvidenceVectorIndex:
+    """
+    Persistent Chroma collection of embedded evidence chunks.
+
+    Each evidence item is split into chunks stored under ``<decision_id>::<n>`` with the
+    decision ID, type and source as metadata. The collection name includes the embedder
+    name so vectors from different embedders are never mixed.
+    """
+
+    def __init__(self, db_path: str = 'db', embedder=None, collection_prefix: str = 'evidence'):
+        import chromadb
+
+        self.embedder = embedder or default_embedder()
+        self._lock = threading.Lock()
+        self._backfilled = False
+        self._client = chromadb.PersistentClient(path=db_path)
+        self._collection = self._client.get_or_create_collection(
+            name=f"{collection_prefix}-{self.embedder.name}",
+            embedding_function=None,
+            metadata={'hnsw:space': 'cosine'},
+        )
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def backfill(self, records: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Index ``records()`` (evidence recorded before the index was enabled) if the
+        collection is empty. Only the first call per index checks, however many trackers
+        share it.
+        """
+        with self._lock:
+            if self._backfilled:
+                return
+            self._backfilled = True
+            empty = self._collection.count() == 0
+        if empty:
+            existing = records()
+            if existing:
+                self.index_many(existing)
+
+    def index(self, decision_id: str, record: Dict[str, Any]) -> None:
+        """Embed and store one evidence item, replacing its previous chunks."""
+        self.index_many({decision_id: record})
+
+    def index_many(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Embed and store several evidence items in one batch."""
+        ids, documents, metadatas = [], [], []
+        for decision_id, record in records.items():
+            for n, chunk in enumerate(chunk_text(record.get('content'))):
+                ids.append(f"{decision_id}::{n}")
+                documents.append(chunk)
+                metadatas.append({
+                    'decision_id': decision_id,
+                    'type': record.get('type') or '',
+                    'source': record.get('source') or '',
+                    'chunk': n,
+                })
+        with self._lock:
+            for decision_id in records:
+                self._collection.delete(where={'decision_id': decision_id})
+            if ids:
+                self._collection.upsert(
+                    ids=ids,
+                    embeddings=self.embedder.embed(documents),
+                    documents=documents,
+                    metadatas=metadatas,
+                )
+
+    def remove_many(self, decision_ids: List[str]) -> None:
+        """Remove the chunks of several evidence items."""
+        if not decision_ids:
+            return
+        with self._lock:
+            self._collection.delete(where={'decision_id': {'$in': list(decision_ids)}})
+
+    def clear(self) -> None:
+        """Remove every evidence chunk from the collection."""
+        with self._lock:
+            existing = self._collection.get(include=[])['ids']
+            if existing:
+                self._collection.delete(ids=existing)
+
+    def similar(self, text: str, k: int = 5,
+                evidence_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the evidence items most similar to ``text``.
+
+        Returns:
+            Up to ``k`` items (best first) with 'id', 'type', 'source', a cosine
+            similarity 'score' and the best matching chunk as 'snippet'
+        """
+        if not text or not text.strip():
+            return []
+        with self._lock:
+            if self._collection.count() == 0:
+                return []
+            # Several chunks of one item can match, so over-fetch and keep each item's best chunk
+            result = self._collection.query(
+                query_embeddings=self.embedder.embed([text]),
+                n_results=k * 4,
+                where={'type': evidence_type} if evidence_type else None,
+                include=['documents', 'metadatas', 'distances'],
+            )
+
+        best: Dict[str, Dict[str, Any]] = {}
+        for document, metadata, distance in zip(
+            result['documents'][0], result['metadatas'][0], result['distances'][0]
+        ):
+            decision_id = metadata['decision_id']
+            score = 1.0 - distance
+            if decision_id not in best or score > best[decision_id]['score']:
+                best[decision_id] = {
+                    'id': decision_id,
+                    'type': metadata.get('type'),
+                    'source': metadata.get('source'),
+                    'score': score,
+                    'snippet': document,
+                }
+        return sorted(best.values(), key=lambda item: item['score'], reverse=True)[:k]
+
+
+@lru_cache(maxsize=None)
+def _shared_vector_index(db_path: str) -> EvidenceVectorIndex:
+    return EvidenceVectorIndex(db_path)
+
+
+def shared_vector_index(db_path: str) -> EvidenceVectorIndex:
+    """The process-wide index of a Chroma directory, so trackers of one store share one index and embedder."""
+    return _shared_vector_index(os.path.abspath(db_path))
@@ -0,0 +1,119 @@
+from typing import Callable, List, Optional, Tuple
+import atexit
+import queue
+import threading
+import weakref
+
+from tools.evidence_storage import Operation
+
+
+def coalesce_operations(ops: List[Operation]) -> List[Operation]:
+    """
+    Collapse a burst of operations into the smallest equivalent list: a clear discards
+    everything queued before it, and only the last add or delete for each decision ID is kept.
+    """
+    cleared = False
+    latest = {}
+    for op in ops:
+        if op[0] == 'clear':
+            cleared = True
+            latest.clear()
+        elif op[0] in ('add', 'delete'):
+            latest.pop(op[1], None)
+            latest[op[1]] = op
+        else:
+            raise ValueError(f"Unknown evidence operation: {op[0]}")
+    return ([('clear',)] if cleared else []) + list(latest.values())
+
+
+class EvidenceWriter:
+    """
+    Background thread that persists evidence operations off the caller's thread.
+
+    Operations are queued (the queue is bounded, so a stalled disk eventually applies
+    back-pressure instead of growing memory) and the writer drains whatever has
+    accumulated into one coalesced batch per flush. ``flush()`` blocks until everything
+    queued so far is durable; pending work is also flushed when the interpreter exits.
+
+    When ``apply_batch`` is a bound method, the writer only holds its object (e.g. the
+    tracker) while operations for it are queued, so an idle writer does not keep it
+    alive; its owner stops the writer when it is collected (see EvidenceTracker).
+    """
+
+    def __init__(self, apply_batch: Callable[[List[Operation]], None], max_pending: int = 1000):
+        try:
+            self._apply_batch = weakref.WeakMethod(apply_batch)
+        except TypeError:  # a plain function
+            self._apply_batch = lambda: apply_batch
+        self._queue: "queue.Queue[Optional[Tuple[List[Operation], Callable]]]" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="evidence-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, ops: List[Operation]) -> None:
+        """Queue ``ops`` for writing; blocks only if ``max_pending`` batches are already waiting."""
+        if self._closed:
+            raise RuntimeError("Evidence writer is closed")
+        self._raise_pending_error()
+        # Queued with a strong reference to the target, which keeps it alive until they are written
+        self._queue.put((list(ops), self._apply_batch()))
+
+    def _run(self) -> None:
+        while self._write_next():
+            pass
+
+    def _write_next(self) -> bool:
+        """
+        Write everything queued as one coalesced batch (waiting for the first item); False
+        once the writer is stopped. Runs in its own frame so nothing queued stays
+        referenced while the writer waits.
+        """
+        items = [self._queue.get()]
+        # Coalesce everything that piled up while the previous batch was being written
+        while items[-1] is not None:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        batches = [item for item in items if item is not None]
+        try:
+            if batches:
+                batches[-1][1](coalesce_operations([op for ops, _ in batches for op in ops]))
+        except BaseException as e:  # surfaced to the caller on the next submit/flush
+            self._error = e
+        finally:
+            for _ in items:
+                self._queue.task_done()
+            stopped = items[-1] is None
+            # A kept error's traceback holds this frame, which must not hold the target
+            del items, batches
+        return not stopped
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    @property
+    def pending(self) -> bool:
+        """Whether queued operations have not been written yet."""
+        return self._queue.unfinished_tasks > 0
+
+    def flush(self) -> None:
+        """Block until every queued operation has been written."""
+        self._queue.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        """Flush pending operations and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(None)
+        # The writer's owner can be collected on the writer thread, once its last batch is written
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+        self._raise_pending_error()
@@ -0,0 +1,86 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional
+import hashlib
+import json
+
+from crewai_tools import SerperDevTool
+
+from config.settings import SEARCH_CACHE_PATH, SEARCH_CACHE_TTL_HOURS, SEARCH_CACHE_MAX_ENTRIES
+from utils.disk_cache import DiskCache
+from utils.single_flight import SingleFlight
+
+# Tool settings that change what Serper returns for a query
+SEARCH_SETTINGS = ('search_type', 'n_results', 'country', 'location', 'locale')
+
+# Shared by every tool in the process, so identical queries from concurrent sessions search once
+SEARCH_IN_FLIGHT = SingleFlight()
+
+
+def search_key(arguments: Dict[str, Any], settings: Dict[str, Any]) -> str:
+    """Hash of a search: its arguments with the query case- and whitespace-normalized, and the tool settings."""
+    normalized = {
+        name: ' '.join(value.lower().split()) if isinstance(value, str) else value
+        for name, value in arguments.items()
+    }
+    encoded = json.dumps({'arguments': normalized, 'settings': settings}, sort_keys=True, default=str)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=20).hexdigest()
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool that answers repeated searches from a persistent cache.
+
+    Results are stored under search_key for ``ttl`` seconds, so overlapping queries across
+    tasks, runs and sessions cost one search. Concurrent identical searches are coalesced
+    through ``in_flight``; only one of them reaches Serper. Empty results are not cached.
+    """
+
+    result_cache: Any = None
+    ttl: Optional[float] = None
+    in_flight: Any = None
+
+    def _settings(self) -> Dict[str, Any]:
+        return {name: getattr(self, name, None) for name in SEARCH_SETTINGS}
+
+    def _run(self, **kwargs: Any) -> Any:
+        key = search_key(kwargs, self._settings())
+        if self.in_flight is None:
+            return self._cached_search(key, kwargs)
+        return self.in_flight.do(key, lambda: self._cached_search(key, kwargs))
+
+    def _cached_search(self, key: str, kwargs: Dict[str, Any]) -> Any:
+        stored = self.result_cache.get(key)
+        if stored is not None:
+            return json.loads(stored)
+        result = super()._run(**kwargs)
+        if result:
+            self.result_cache.set(key, json.dumps(result), ttl=self.ttl)
+        return result
+
+
+@lru_cache(maxsize=None)
+def shared_search_cache() -> Optional[DiskCache]:
+    """The process-wide search result cache, or None if SEARCH_CACHE_PATH is empty."""
+    if not SEARCH_CACHE_PATH:
+        return None
+    return DiskCache(SEARCH_CACHE_PATH, max_entries=SEARCH_CACHE_MAX_ENTRIES)
+
+
+def search_tool() -> SerperDevTool:
+    """A web search tool for the agents, cached unless SEARCH_CACHE_PATH is empty."""
+    cache = shared_search_cache()
+    if cache is None:
+        return SerperDevTool()
+    return CachedSerperDevTool(
+        result_cache=cache,
+        ttl=SEARCH_CACHE_TTL_HOURS * 3600 if SEARCH_CACHE_TTL_HOURS else None,
+        in_flight=SEARCH_IN_FLIGHT,
+    )
+
+
+def search_cache_stats() -> Optional[Dict[str, Any]]:
+    """Hits, misses and hit rate of the shared search cache, plus searches coalesced in flight."""
+    cache = shared_search_cache()
+    if cache is None:
+        return None
+    return {**cache.stats(), 'coalesced': SEARCH_IN_FLIGHT.shared}
@@ -0,0 +1,226 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Type
+import json
+import os
+import re
+
+from crewai.tools import BaseTool
+from crewai_tools import ScrapeWebsiteTool, WebsiteSearchTool
+from pydantic import BaseModel, Field
+
+from config.settings import (
+    WEB_CACHE_DIR, WEB_PAGE_TTL_HOURS, WEB_PAGE_CACHE_MAX_BYTES, WEB_EMBEDDING_CACHE_MAX_BYTES,
+    WEB_FIXTURES_DIR, WEB_SEARCH_EMBEDDER
+)
+from tools.evidence_blobs import content_hash
+from tools.evidence_vectors import OpenAIEmbedder, chunk_text, default_embedder
+from utils.disk_cache import DiskCache
+from utils.single_flight import SingleFlight
+
+
+def normalize_url(url: str) -> str:
+    """Drop surrounding whitespace, the fragment and trailing slashes; lowercase scheme and host."""
+    url = (url or '').strip().split('#', 1)[0]
+    match = re.match(r'^([a-zA-Z][a-zA-Z0-9+.-]*://)([^/?]*)(.*)$', url)
+    if not match:
+        return url.rstrip('/')
+    return match.group(1).lower() + match.group(2).lower() + match.group(3).rstrip('/')
+
+
+def fixture_name(url: str) -> str:
+    """
+    File name of a page in a fixture directory: the URL without its scheme, with every run
+    of other characters than letters and digits turned into "_", e.g.
+    https://www.example.com/about -> www_example_com_about.txt
+    """
+    without_scheme = re.sub(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', '', normalize_url(url))
+    return re.sub(r'[^a-z0-9]+', '_', without_scheme.lower()).strip('_') + '.txt'
+
+
+class PageCache:
+    """
+    Scraped page text, stored per URL so each page is fetched once per ``ttl``.
+
+    Entries keep the hash of the page text next to it; unchanged pages hash the same when
+    they are fetched again, so their chunk embeddings are reused (see EmbeddingCache).
+    Concurrent requests for one URL fetch it once. With ``fixtures_dir`` set, pages are
+    read from the files named by fixture_name instead of the network and nothing is cached.
+
+    Args:
+        cache: Store of page entries (None to keep nothing)
+        fetch: Returns the text of a URL
+        ttl: Seconds before a page is fetched again (None: the cache's default)
+        fixtures_dir: Directory of page fixtures that replaces the network
+    """
+
+    def __init__(self, cache: Optional[DiskCache], fetch: Callable[[str], str],
+                 ttl: Optional[float] = None, fixtures_dir: Optional[str] = None):
+        self.cache = cache
+        self.fetch = fetch
+        self.ttl = ttl
+        self.fixtures_dir = fixtures_dir
+        self.fetches = 0
+        self._in_flight = SingleFlight()
+
+    def get(self, url: str) -> Dict[str, str]:
+        """The 'url', 'text' and content 'hash' of a page."""
+        url = normalize_url(url)
+        if self.fixtures_dir:
+            return self._fixture(url)
+        return self._in_flight.do(url, lambda: self._cached(url))
+
+    def text(self, url: str) -> str:
+        return self.get(url)['text']
+
+    def _fixture(self, url: str) -> Dict[str, str]:
+        path = os.path.join(self.fixtures_dir, fixture_name(url))
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No fixture for {url} (expected {path})") from None
+        return {'url': url, 'text': text, 'hash': content_hash(text)}
+
+    def _cached(self, url: str) -> Dict[str, str]:
+        stored = self.cache.get(url) if self.cache is not None else None
+        if stored is not None:
+            return json.loads(stored)
+        text = self.fetch(url) or ''
+        self.fetches += 1
+        page = {'url': url, 'text': text, 'hash': content_hash(text)}
+        if self.cache is not None and text:
+            self.cache.set(url, json.dumps(page), ttl=self.ttl)
+        return page
+
+
+class EmbeddingCache:
+    """
+    Embeddings stored by the hash of the embedded text and the embedder's name, so a
+    chunk is embedded once however many pages or runs it appears in. Misses are embedded
+    together in one batch; ``embedded`` counts the texts that were.
+    """
+
+    def __init__(self, embedder, cache: Optional[DiskCache]):
+        self.embedder = embedder
+        self.cache = cache
+        self.embedded = 0
+
+    def _key(self, text: str) -> str:
+        return f"{self.embedder.name}:{content_hash(text)}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            stored = self.cache.get(self._key(text)) if self.cache is not None else None
+            if stored is not None:
+                vectors[i] = json.loads(stored)
+            else:
+                missing.setdefault(text, []).append(i)
+        if missing:
+            new_texts = list(missing)
+            for text, vector in zip(new_texts, self.embedder.embed(new_texts)):
+                vector = [float(v) for v in vector]
+                if self.cache is not None:
+                    self.cache.set(self._key(text), json.dumps(vector))
+                for i in missing[text]:
+                    vectors[i] = vector
+            self.embedded += len(new_texts)
+        return vectors
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that reads pages through a PageCache."""
+
+    page_cache: Any = None
+
+    def _run(self, **kwargs: Any) -> Any:
+        url = kwargs.get('website_url') or getattr(self, 'website_url', None)
+        return self.page_cache.text(url)
+
+
+class WebsiteSearchInput(BaseModel):
+    search_query: str = Field(..., description="What to look for on the website")
+    website_url: str = Field(..., description="URL of the website to search")
+
+
+class CachedWebsiteSearchTool(BaseTool):
+    """
+    Semantic search within one web page, on the cached page text and chunk embeddings.
+
+    It replaces WebsiteSearchTool, which fetched, chunked and embedded the page again on
+    every call; here the page comes from a PageCache and only chunks that were never
+    embedded before reach the embedder (see shared_embedding_cache for which one).
+    """
+
+    name: str = "Search in a specific website"
+    description: str = (
+        "A tool that can be used to semantic search a query from a specific URL content. "
+        "Returns the passages of the page that best match the query."
+    )
+    args_schema: Type[BaseModel] = WebsiteSearchInput
+    page_cache: Any = None
+    embeddings: Any = None
+    k: int = 5
+
+    def _run(self, search_query: str, website_url: str) -> str:
+        chunks = chunk_text(self.page_cache.text(website_url))
+        if not chunks:
+            return f"No content found at {website_url}."
+        query_vector = self.embeddings.embedder.embed([search_query])[0]
+        scored = sorted(
+            (
+                (sum(a * b for a, b in zip(query_vector, vector)), chunk)
+                for chunk, vector in zip(chunks, self.embeddings.embed(chunks))
+            ),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        return "\n\n".join(chunk for _, chunk in scored[:self.k])
+
+
+def _scrape(url: str) -> str:
+    return ScrapeWebsiteTool()._run(website_url=url)
+
+
+@lru_cache(maxsize=None)
+def shared_page_cache() -> PageCache:
+    """The process-wide page cache (fixture-backed when WEB_FIXTURES_DIR is set)."""
+    cache = None
+    if WEB_CACHE_DIR and not WEB_FIXTURES_DIR:
+        cache = DiskCache(os.path.join(WEB_CACHE_DIR, 'pages.sqlite3'), max_bytes=WEB_PAGE_CACHE_MAX_BYTES)
+    return PageCache(
+        cache, _scrape,
+        ttl=WEB_PAGE_TTL_HOURS * 3600 if WEB_PAGE_TTL_HOURS else None,
+        fixtures_dir=WEB_FIXTURES_DIR or None
+    )
+
+
+@lru_cache(maxsize=None)
+def shared_embedding_cache() -> EmbeddingCache:
+    """
+    The process-wide chunk embedding cache, in front of the OpenAI embeddings
+    WebsiteSearchTool uses, or of the evidence index's local embedder (see
+    default_embedder) when WEB_SEARCH_EMBEDDER is "local".
+    """
+    if WEB_SEARCH_EMBEDDER not in ('openai', 'local'):
+        raise ValueError(f"Unknown WEB_SEARCH_EMBEDDER: {WEB_SEARCH_EMBEDDER}")
+    cache = None
+    if WEB_CACHE_DIR:
+        cache = DiskCache(os.path.join(WEB_CACHE_DIR, 'embeddings.sqlite3'), max_bytes=WEB_EMBEDDING_CACHE_MAX_BYTES)
+    embedder = default_embedder() if WEB_SEARCH_EMBEDDER == 'local' else OpenAIEmbedder()
+    return EmbeddingCache(embedder, cache)
+
+
+def web_tools() -> List[BaseTool]:
+    """
+    The website search and scrape tools for the researcher: cached unless WEB_CACHE_DIR is
+    empty and no WEB_FIXTURES_DIR is set, in which case the crewai_tools originals are used.
+    """
+    if not WEB_CACHE_DIR and not WEB_FIXTURES_DIR:
+        return [WebsiteSearchTool(), ScrapeWebsiteTool()]
+    pages = shared_page_cache()
+    return [
+        CachedWebsiteSearchTool(page_cache=pages, embeddings=shared_embedding_cache()),
+        CachedScrapeWebsiteTool(page_cache=pages),
+    ]
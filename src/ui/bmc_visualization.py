@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-import json
+
+from utils.json_extract import extract_json
 
 def bmc_colors():
     """Define colors for BMC sections"""
@@ -100,11 +101,9 @@ def display_bmc(bmc_elements):
         
 def extract_bmc_from_json(json_str):
     """Extract BMC elements from JSON string"""
-    try:
-        data = json.loads(json_str)
-        return data.get("bmc_elements", {})
-    except:
-        return {}
+    data = extract_json(json_str, required_key="bmc_elements")
+    bmc_elements = data.get("bmc_elements") if data else None
+    return bmc_elements if isinstance(bmc_elements, dict) else {}
         
 def interactive_bmc_editor(initial_bmc=None):
     """Interactive Business Model Canvas editor"""
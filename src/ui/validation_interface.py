@@ -3,8 +3,8 @@ from datetime import datetime
 import json
 import re
 
-def display_validation_plan(validations):
-    """Display validations with guidance for user testing"""
+def display_validation_plan(validations, evidence_tracker=None):
+    """Display validations with guidance for user testing, plus related prior evidence if a tracker is given"""
     st.write("## Customer Validation Plan")
     st.write("These are the key assumptions that need validation through customer interviews or testing.")
     
@@ -24,6 +24,10 @@ def display_validation_plan(validations):
             suggested_questions = generate_suggested_questions(validation_item)
             for q in suggested_questions:
                 st.write(f"- {q}")
+            
+            if evidence_tracker is not None:
+                from tools.evidence_tracker import display_related_evidence
+                display_related_evidence(evidence_tracker, validation_item, title="Related prior evidence")
                 
 def generate_suggested_questions(validation_item):
     """Generate suggested interview questions based on the validation item"""
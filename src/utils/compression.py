@@ -0,0 +1,30 @@
+import lzma
+import zlib
+
+# Each stored blob starts with a one-byte tag naming the codec of the bytes that follow
+CODECS = {
+    'none': (b'r', lambda data: data, lambda data: data),
+    'zlib': (b'z', lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': (b'x', lzma.compress, lzma.decompress),
+}
+_DECODERS = {tag: decode for tag, _, decode in CODECS.values()}
+
+
+def encode_blob(text: str, codec: str = 'zlib') -> bytes:
+    """
+    Compress ``text`` into a tagged blob. Bodies that do not shrink (short ones, mostly)
+    are stored uncompressed.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression: {codec}")
+    data = text.encode('utf-8')
+    tag, encode, _ = CODECS[codec]
+    compressed = encode(data)
+    if len(compressed) >= len(data):
+        return CODECS['none'][0] + data
+    return tag + compressed
+
+
+def decode_blob(blob: bytes) -> str:
+    """Inverse of encode_blob."""
+    return _DECODERS[bytes(blob[:1])](bytes(blob[1:])).decode('utf-8')
@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import os
+import sqlite3
+import threading
+import time
+
+from utils.compression import decode_blob, encode_blob
+
+
+class DiskCache:
+    """
+    A persistent string cache in a SQLite database, shared by every process that opens it.
+
+    Entries expire after their TTL and are evicted least recently used first once the
+    cache holds more than ``max_entries`` entries or ``max_bytes`` bytes of stored (possibly
+    compressed) values. Reading an entry refreshes its recency. Hit and miss counts are
+    kept per instance.
+
+    Args:
+        path: Database file; its directory is created if needed
+        max_entries: Most entries to keep (None for no limit)
+        max_bytes: Most stored bytes to keep (None for no limit)
+        default_ttl: Lifetime in seconds of entries set without a TTL (None: never expire)
+        compression: Codec for stored values (see utils.compression)
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY,
+            value BLOB,
+            size INTEGER,
+            created REAL,
+            accessed REAL,
+            expires REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed);
+        CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache(expires);
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = None, compression: str = 'zlib'):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.compression = compression
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Shared across Streamlit's script threads and serialized with the lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[str]:
+        """The value stored under ``key``, or None if there is none or it expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return decode_blob(row[0])
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds (default_ttl if not given)."""
+        ttl = self.default_ttl if ttl is None else ttl
+        blob = encode_blob(value, self.compression)
+        now = time.time()
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created, accessed, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now, now + ttl if ttl is not None else None),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                evicted = []
+                for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and stored bytes, plus this instance's hits, misses and hit rate."""
+        with self._lock:
+            entries, stored = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': stored,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
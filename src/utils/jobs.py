@@ -0,0 +1,272 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# Progress callback handed to a job: reports a short status message
+Progress = Callable[[str], None]
+
+# What a job returns: its result text, or the text and a JSON-serializable structured form of it
+JobResult = Union[str, Tuple[str, Any]]
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this ID runs on this host (always assumed where it cannot be checked)."""
+    if os.name != 'posix':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRunner:
+    """
+    Runs long calls, such as crew kickoffs, on a bounded pool of worker threads instead of
+    the Streamlit script thread, and keeps every job's status, progress and result in SQLite.
+
+    A job is a function that takes a progress callback and returns its result as text, or
+    as (text, structured) to keep a JSON-serializable structured form of it as well. The
+    pool size caps how many run at once across all sessions; later jobs wait as "queued".
+    Sessions keep only job IDs, so they can poll a job, reconnect to it after a reload and
+    read its persisted result once it is "done" (or its error once "failed").
+
+    Several server processes can share the database. Each runner records itself as the
+    owner of its jobs and keeps a heartbeat in the ``runners`` table. Jobs still queued or
+    running whose owner is gone are marked failed, when a runner starts and on every
+    heartbeat. An owner is gone when its heartbeat is older than three intervals, or at
+    once when it ran on this host and its process has exited. Jobs of live runners are
+    left alone.
+
+    Jobs submitted with a ``key`` are coalesced: while a job with that key is queued or
+    running, submitting the same key again returns its ID instead of starting another run,
+    so concurrent identical requests (other users, other tabs) share one run. The key is
+    stored with the job and claimed in the same transaction that queues it, so this holds
+    across server processes sharing the database and across restarts; a failed orphan
+    frees its key. ``coalesced`` counts the requests this runner coalesced.
+
+    Args:
+        path: Database file; its directory is created if needed
+        max_workers: Most jobs running at once
+        keep_days: Finished jobs older than this are deleted on start (None: kept)
+        heartbeat: Seconds between this runner's heartbeats
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT,
+            status TEXT,
+            progress TEXT,
+            params TEXT,
+            result TEXT,
+            error TEXT,
+            created REAL,
+            started REAL,
+            finished REAL,
+            owner TEXT,
+            key TEXT,
+            structured TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created);
+        CREATE TABLE IF NOT EXISTS runners (
+            owner TEXT PRIMARY KEY,
+            host TEXT,
+            pid INTEGER,
+            heartbeat REAL
+        );
+    """
+
+    COLUMNS = ('id', 'kind', 'status', 'progress', 'params', 'result', 'error', 'created', 'started', 'finished',
+               'owner', 'key', 'structured')
+
+    def __init__(self, path: str, max_workers: int = 4, keep_days: Optional[float] = 7, heartbeat: float = 10):
+        self.path = path
+        self.max_workers = max_workers
+        self.heartbeat = heartbeat
+        # Process ID plus a per-start ID, so a later process that reuses the PID is another owner
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._host = socket.gethostname()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Shared by the script threads and the workers, serialized with the lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if 'owner' not in columns:
+            # Databases from before owners; their unfinished jobs have none and count as orphaned
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        for column in ('key', 'structured'):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(key, status)")
+        now = time.time()
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runners (owner, host, pid, heartbeat) VALUES (?, ?, ?, ?)",
+                (self.owner, self._host, os.getpid(), now),
+            )
+            self._fail_orphans(now)
+            if keep_days is not None:
+                self._conn.execute("DELETE FROM jobs WHERE finished < ?", (now - keep_days * 86400,))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.coalesced = 0
+        self._stopped = threading.Event()
+        self._heartbeat_thread = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _fail_orphans(self, now: float) -> None:
+        """Fail the unfinished jobs of runners that are gone, and forget those runners (in a transaction)."""
+        runners = self._conn.execute("SELECT owner, host, pid, heartbeat FROM runners").fetchall()
+        gone = [
+            owner for owner, host, pid, heartbeat in runners
+            if owner != self.owner
+            and (heartbeat < now - 3 * self.heartbeat or (host == self._host and not _pid_alive(pid)))
+        ]
+        if gone:
+            marks = ', '.join('?' * len(gone))
+            self._conn.execute(f"DELETE FROM runners WHERE owner IN ({marks})", gone)
+        # Their worker threads died with the server process that ran them
+        self._conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted by a server restart', finished = ? "
+            "WHERE status IN ('queued', 'running') AND (owner IS NULL OR owner NOT IN (SELECT owner FROM runners))",
+            (now,),
+        )
+
+    def _beat(self) -> None:
+        while not self._stopped.wait(self.heartbeat):
+            now = time.time()
+            with self._lock, self._transaction():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO runners (owner, host, pid, heartbeat) VALUES (?, ?, ?, ?)",
+                    (self.owner, self._host, os.getpid(), now),
+                )
+                self._fail_orphans(now)
+
+    def submit(self, kind: str, fn: Callable[[Progress], JobResult], params: Optional[Dict[str, Any]] = None,
+               key: Optional[str] = None, on_coalesced: Optional[Callable[[], None]] = None) -> str:
+        """
+        Queue ``fn`` and return its job ID, or the ID of the unfinished job with the same ``key``.
+
+        Args:
+            kind: What the job does, e.g. "analysis"
+            fn: Called on a worker with a progress callback; returns the result text, or (text, structured)
+            params: JSON-serializable inputs, kept with the job for whoever applies its result
+            key: Identifies runs that would return the same result (None: never coalesced)
+            on_coalesced: Called instead of queueing ``fn`` when the job joins an unfinished one
+        """
+        job_id = uuid.uuid4().hex[:16]
+        existing = None
+        with self._lock, self._transaction():
+            # Queued only if no unfinished job, from any runner on this database, holds the key
+            claimed = self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, progress, params, created, owner, key) "
+                "SELECT ?, ?, 'queued', ?, ?, ?, ?, ? WHERE ? IS NULL OR NOT EXISTS "
+                "(SELECT 1 FROM jobs WHERE key = ? AND status IN ('queued', 'running'))",
+                (job_id, kind, 'Waiting for a free worker', json.dumps(params or {}), time.time(), self.owner,
+                 key, key, key),
+            ).rowcount
+            if not claimed:
+                existing = self._conn.execute(
+                    "SELECT id FROM jobs WHERE key = ? AND status IN ('queued', 'running') ORDER BY created LIMIT 1",
+                    (key,),
+                ).fetchone()[0]
+                self.coalesced += 1
+        if existing is not None:
+            if on_coalesced:
+                on_coalesced()
+            return existing
+        self._pool.submit(self._run, job_id, fn)
+        return job_id
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _run(self, job_id: str, fn: Callable[[Progress], JobResult]) -> None:
+        self._update(job_id, status='running', progress='Started', started=time.time())
+        try:
+            result = fn(lambda message: self._update(job_id, progress=message))
+        except BaseException as error:
+            self._update(job_id, status='failed', error=f"{type(error).__name__}: {error}", finished=time.time())
+            # KeyboardInterrupt, SystemExit and the like still stop the worker once the job is failed
+            if not isinstance(error, Exception):
+                raise
+        else:
+            text, structured = result if isinstance(result, tuple) else (result, None)
+            self._update(job_id, status='done', progress='Finished', result=text,
+                         structured=None if structured is None else json.dumps(structured), finished=time.time())
+
+    def _row(self, row) -> Dict[str, Any]:
+        job = dict(zip(self.COLUMNS, row))
+        job['params'] = json.loads(job['params'] or '{}')
+        job['structured'] = json.loads(job['structured']) if job['structured'] else None
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's fields ('status', 'progress', 'params', 'result', 'structured', 'error', times), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The most recent jobs, newest first, without their results."""
+        columns = ', '.join('NULL' if name in ('result', 'structured') else name for name in self.COLUMNS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def active(self) -> int:
+        """Number of jobs queued or running."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.05) -> Optional[Dict[str, Any]]:
+        """Block until the job has finished (or ``timeout`` seconds passed) and return it."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.time() >= deadline:
+                return job
+            time.sleep(interval)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self._stopped.set()
+        self._heartbeat_thread.join()
+        with self._lock:
+            self._conn.execute("DELETE FROM runners WHERE owner = ?", (self.owner,))
+            self._conn.close()
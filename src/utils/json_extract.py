@@ -0,0 +1,210 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import re
+
+# A JSON string (possibly cut off by the end of the text), a string the model wrapped in
+# typographic quotes, or a bracket. Everything between these tokens is copied through, so
+# the scanner only stops at the characters that change nesting or quoting. Once the opening
+# quote matches, a string can only end at a closing quote or the end of the text, so the
+# patterns never backtrack (and need no possessive quantifiers, which Python 3.10 lacks).
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z)'
+_SMART_STRING = '[“”][^“”"\\\\]*(?:\\\\.[^“”"\\\\]*)*(?:[“”"]|\\\\?\\Z)'
+_SCAN = re.compile(f'{_STRING}|{_SMART_STRING}|[{{}}\\[\\]]', re.DOTALL)
+_REPAIR = re.compile(f'{_STRING}|{_SMART_STRING}|[{{}}\\[\\],]', re.DOTALL)
+
+_CLOSERS = {'{': '}', '[': ']'}
+_SMART_QUOTES = '“”'
+
+# Candidate objects tried, and cut points tried per truncated object, before giving up
+MAX_CANDIDATES = 16
+MAX_CUTS = 8
+# Objects nested deeper than this are not treated as JSON (summaries are a few levels deep)
+MAX_DEPTH = 128
+
+
+def _object_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) of every object in ``text``, nested ones included. An object still open
+    at the end of the text (a truncated tail) ends at ``len(text)``; one nesting deeper
+    than MAX_DEPTH is dropped and scanning resumes after the point where it got too deep.
+    """
+    spans = []
+    pos = 0
+    while True:
+        start = text.find('{', pos)
+        if start == -1:
+            return spans
+        stack = [('{', start)]
+        open_count = {'{': 1, '[': 0}
+        pos = start + 1
+        while stack:
+            match = _SCAN.search(text, pos)
+            if match is None:
+                spans.append((start, len(text)))
+                return spans
+            token = match.group()
+            pos = match.end()
+            if token in '{[':
+                if len(stack) == MAX_DEPTH:
+                    break
+                stack.append((token, match.start()))
+                open_count[token] += 1
+            elif token in '}]':
+                opener = '{' if token == '}' else '['
+                if not open_count[opener]:
+                    continue  # stray closer
+                while True:
+                    char, opened = stack.pop()
+                    open_count[char] -= 1
+                    if char == '{':
+                        spans.append((opened, pos))
+                    if char == opener:
+                        break
+
+
+def _string_end_escaped(token: str) -> bool:
+    """Whether the last character of a string token is escaped, i.e. the string never closed."""
+    backslashes = len(token) - 1 - len(token[:-1].rstrip('\\'))
+    return backslashes % 2 == 1
+
+
+def _repairs(fragment: str) -> Iterator[str]:
+    """
+    Repaired versions of ``fragment`` (which starts with "{"), most complete first.
+
+    Typographic quotes around strings become plain quotes, commas before a closing
+    bracket are dropped, mismatched brackets are closed in the right order, and the
+    containers still open at the end are closed. A value the text was cut off in (an
+    unterminated string, a bare number or literal) may be incomplete, so it is dropped:
+    the text is cut back to the last complete member. Items of a list are kept whole or
+    not at all, so a truncated summary never yields an empty or partial item.
+    """
+    out: List[str] = []
+    size = 0
+    stack: List[str] = []
+    open_count = {'{': 0, '[': 0}
+    # (output size, depth) where the output can be cut and closed cleanly; depths never
+    # decrease towards the end of the list
+    cuts: List[Tuple[int, int]] = []
+    trailing_comma = None  # index in ``out`` of a comma followed by nothing but whitespace
+    cut_off = False  # whether the text ends inside a string
+    pos = 0
+
+    def emit(piece: str) -> None:
+        nonlocal size
+        out.append(piece)
+        size += len(piece)
+
+    def in_item() -> bool:
+        # A container below a list is one of its items
+        return open_count['['] > (stack[-1:] == ['['])
+
+    def cut_here() -> None:
+        while cuts and cuts[-1][1] > len(stack):
+            cuts.pop()
+        if not in_item():
+            cuts.append((size, len(stack)))
+
+    for match in _REPAIR.finditer(fragment):
+        gap = fragment[pos:match.start()]
+        if gap:
+            if not gap.isspace():
+                trailing_comma = None
+            emit(gap)
+        pos = match.end()
+        token = match.group()
+        head = token[0]
+
+        if head == '"':
+            if len(token) == 1 or token[-1] != '"' or (pos == len(fragment) and _string_end_escaped(token)):
+                token = token.rstrip('\\') + '"'  # cut off inside the string
+                cut_off = True
+            emit(token)
+            trailing_comma = None
+        elif head in _SMART_QUOTES:
+            closed = len(token) > 1 and token[-1] in _SMART_QUOTES + '"'
+            cut_off = not closed
+            emit('"' + (token[1:-1] if closed else token[1:]).rstrip('\\') + '"')
+            trailing_comma = None
+        elif head == ',':
+            cut_here()
+            trailing_comma = len(out)
+            emit(',')
+        elif head in '{[':
+            stack.append(head)
+            open_count[head] += 1
+            emit(head)
+            if len(stack) == 1:
+                cut_here()  # an empty container is only a useful result at the top
+            trailing_comma = None
+        else:
+            opener = '{' if head == '}' else '['
+            if not open_count[opener]:
+                continue
+            if trailing_comma is not None:
+                size -= 1
+                out[trailing_comma] = ''
+                trailing_comma = None
+            while True:
+                char = stack.pop()
+                open_count[char] -= 1
+                emit(_CLOSERS[char])
+                if char == opener:
+                    break
+            cut_here()
+            if not stack:
+                yield ''.join(out)
+                return
+
+    # Cut off after a complete value: close what is open, unless that would close an item
+    tail = fragment[pos:]
+    if not cut_off and (not tail or tail.isspace()) and not in_item():
+        if trailing_comma is not None:
+            out[trailing_comma] = ''
+        yield ''.join(out).rstrip() + ''.join(_CLOSERS[char] for char in reversed(stack))
+
+    text = ''.join(out)
+    for size, depth in reversed(cuts[-MAX_CUTS:]):
+        yield text[:size].rstrip().rstrip(',') + ''.join(_CLOSERS[char] for char in reversed(stack[:depth]))
+
+
+def _load(fragment: str) -> Optional[Any]:
+    try:
+        return json.loads(fragment, strict=False)
+    except (ValueError, RecursionError):
+        pass
+    for repaired in _repairs(fragment):
+        try:
+            return json.loads(repaired, strict=False)
+        except (ValueError, RecursionError):
+            continue
+    return None
+
+
+def extract_json(text: str, required_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find the last JSON object in ``text`` (typically an LLM answer ending in a JSON summary).
+
+    Objects are located with a string-aware bracket scan, so braces inside strings, prose
+    around the object and text after it do not confuse it. Common model mistakes are
+    repaired: trailing commas, typographic quotes, mismatched brackets and a truncated
+    end, for which the complete part of the object is returned (see _repairs).
+
+    Args:
+        text: Text containing the object
+        required_key: Only return an object that has this top-level key
+
+    Returns:
+        The parsed object, or None if no (repairable) object was found
+    """
+    if not text:
+        return None
+    spans = sorted(_object_spans(text), key=lambda span: (-span[1], span[0]))
+    for start, end in spans[:MAX_CANDIDATES]:
+        fragment = text[start:end]
+        if required_key and required_key not in fragment:
+            continue
+        data = _load(fragment)
+        if isinstance(data, dict) and (required_key is None or required_key in data):
+            return data
+    return None
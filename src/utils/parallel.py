@@ -0,0 +1,151 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+import threading
+
+from config.settings import JOB_WORKERS
+
+T = TypeVar('T')
+
+
+@lru_cache(maxsize=None)
+def crew_slots() -> threading.BoundedSemaphore:
+    """
+    The process-wide limit on crews running at once (JOB_WORKERS). Jobs, pipeline steps and
+    competitor profiles each run on their own thread pools, one inside another, so only a
+    slot held by every crew kickoff caps them all together.
+    """
+    return threading.BoundedSemaphore(JOB_WORKERS)
+
+
+def with_crew_slot(run_crew: Callable[[Any], T]) -> Callable[[Any], T]:
+    """``run_crew`` waiting for one of the crew_slots() and holding it while the crew runs."""
+    def run(crew: Any) -> T:
+        with crew_slots():
+            return run_crew(crew)
+    return run
+
+
+def run_concurrently(calls: Dict[str, Callable[[], Any]],
+                     max_workers: Optional[int] = None) -> Iterator[Tuple[str, Any, Optional[BaseException]]]:
+    """
+    Run independent calls on a thread pool and yield ``(name, result, error)`` for each in
+    the order they finish, so the caller can store every result as soon as it is ready.
+    A failed call yields its exception as ``error`` (and None as result) without stopping
+    the others.
+
+    Args:
+        calls: Calls by name
+        max_workers: Most calls running at once (default: all of them)
+    """
+    if not calls:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers or len(calls), thread_name_prefix="crew") as pool:
+        futures = {pool.submit(call): name for name, call in calls.items()}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], None if error else future.result(), error
+
+
+class TaskGraphError(Exception):
+    """Steps of a TaskGraph failed; ``results`` holds the outputs of those that did not."""
+
+    def __init__(self, errors: Dict[str, BaseException], results: Dict[str, Any]):
+        self.errors = errors
+        self.results = results
+        super().__init__("; ".join(f"{name}: {error}" for name, error in errors.items()))
+
+
+class TaskGraph:
+    """
+    Pipeline steps with their input dependencies, each started as soon as its inputs are ready.
+
+    A step is a function of the outputs of the steps it depends on, and only those, so
+    independent steps run at the same time (up to ``max_workers``) and the pipeline takes
+    about as long as its critical path instead of the sum of its steps. When a step fails
+    the steps downstream of it are skipped; the others still run.
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], depends_on: Iterable[str] = ()) -> None:
+        """Add step ``name``, called with ``{dependency: output}`` for each of ``depends_on``."""
+        if name in self._steps:
+            raise ValueError(f"Duplicate step: {name}")
+        self._steps[name] = (fn, tuple(depends_on))
+
+    def dependencies(self, name: str) -> Tuple[str, ...]:
+        return self._steps[name][1]
+
+    def order(self) -> List[str]:
+        """The steps in an order that respects every dependency; fails on unknown steps and cycles."""
+        for name, (_, depends_on) in self._steps.items():
+            unknown = [dependency for dependency in depends_on if dependency not in self._steps]
+            if unknown:
+                raise ValueError(f"Step {name} depends on unknown steps: {', '.join(unknown)}")
+        ordered, placed = [], set()
+        while len(ordered) < len(self._steps):
+            ready = [
+                name for name, (_, depends_on) in self._steps.items()
+                if name not in placed and all(dependency in placed for dependency in depends_on)
+            ]
+            if not ready:
+                raise ValueError(f"Dependency cycle among: {', '.join(n for n in self._steps if n not in placed)}")
+            ordered.extend(ready)
+            placed.update(ready)
+        return ordered
+
+    def run(self, max_workers: Optional[int] = None,
+            on_done: Optional[Callable[[str, Any, Optional[BaseException]], None]] = None) -> Dict[str, Any]:
+        """
+        Run every step and return their outputs by name.
+
+        Args:
+            max_workers: Most steps running at once (default: no limit)
+            on_done: Called with ``(name, output, error)`` as each step finishes or is skipped
+
+        Raises:
+            TaskGraphError: if any step failed or was skipped
+        """
+        self.order()
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        pending = dict(self._steps)
+        running: Dict[Future, str] = {}
+
+        def finish(name, output, error):
+            if error is None:
+                results[name] = output
+            else:
+                errors[name] = error
+            if on_done:
+                on_done(name, output, error)
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(self._steps) or 1,
+                                thread_name_prefix="step") as pool:
+            while pending or running:
+                # Skipping a step can skip the steps after it, so repeat until nothing changes
+                changed = True
+                while changed:
+                    changed = False
+                    for name, (fn, depends_on) in list(pending.items()):
+                        failed = [dependency for dependency in depends_on if dependency in errors]
+                        if failed:
+                            del pending[name]
+                            finish(name, None, RuntimeError(f"Skipped: {', '.join(failed)} failed"))
+                            changed = True
+                        elif all(dependency in results for dependency in depends_on):
+                            del pending[name]
+                            inputs = {dependency: results[dependency] for dependency in depends_on}
+                            running[pool.submit(fn, inputs)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    finish(name, None if error else future.result(), error)
+        if errors:
+            raise TaskGraphError(errors, results)
+        return results
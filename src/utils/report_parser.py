@@ -0,0 +1,330 @@
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import hashlib
+import re
+
+from utils.json_extract import extract_json
+
+# Headers whose text runs to the first blank line after them
+SECTIONS = (
+    'INITIAL THOUGHTS', 'NEXT STEPS',
+    'MARKET SIZE AND TRENDS', 'CUSTOMER INSIGHTS', 'PRICING MODELS', 'REGULATORY FACTORS',
+    'ASSUMPTION VALIDATION', 'RECOMMENDATIONS',
+    'SEGMENT PROFILE', 'CUSTOMER CHANNELS', 'EXISTING SOLUTIONS', 'BUYING BEHAVIOR',
+    'TARGETING RECOMMENDATIONS',
+    'COMPETITOR LANDSCAPE', 'MARKET POSITIONING', 'COMPETITIVE STRATEGY',
+)
+
+# Labelled fields inside a section
+SUBFIELDS = (
+    'DEMOGRAPHICS', 'PSYCHOGRAPHICS', 'MARKET SIZE', 'GROWTH TRENDS',
+    'ONLINE CHANNELS', 'OFFLINE CHANNELS', 'INFLUENTIAL VOICES',
+    'PRICE SENSITIVITY', 'DECISION FACTORS', 'PURCHASING PROCESS',
+    'DIRECT COMPETITORS', 'INDIRECT COMPETITORS', 'POTENTIAL FUTURE COMPETITORS',
+    'MARKET LEADERS', 'MARKET GAPS', 'DIFFERENTIATION FACTORS',
+)
+
+# Repeated records: the first marker starts a record, the rest are its fields in order
+RECORDS = {
+    'assumption': ('ASSUMPTION', 'REASONING'),
+    'risk': ('RISK', 'POTENTIAL IMPACT'),
+    'validation': ('VALIDATION NEEDED', 'METHOD'),
+    'competitor': ('COMPETITOR', 'DESCRIPTION', 'STRENGTHS', 'WEAKNESSES', 'BUSINESS MODEL',
+                   'MARKET SHARE', 'TARGET AUDIENCE', 'SOURCE'),
+    'insight': ('PAIN POINT', 'EVIDENCE', 'CUSTOMER QUOTE', 'SOURCE'),
+    'pricing_model': ('MODEL TYPE', 'PRICE RANGE', 'VALUE METRICS', 'COMPETITOR EXAMPLES', 'SOURCE'),
+    'trend': ('TREND', 'EVIDENCE', 'IMPACT ON BUSINESS', 'SOURCE'),
+    'assumption_validation': ('ASSUMPTION', 'EVIDENCE', 'CONCLUSION', 'CONFIDENCE', 'SOURCES'),
+    'pain_point': ('PAIN POINT', 'DIRECT QUOTES', 'FREQUENCY', 'SOURCE'),
+    'solution': ('SOLUTION', 'USAGE', 'SATISFACTION', 'GAPS', 'SOURCE'),
+    'competitor_profile': ('NAME', 'COMPANY SIZE', 'FOUNDING DATE', 'BUSINESS MODEL',
+                           'TARGET CUSTOMERS', 'UNIQUE VALUE PROPOSITION', 'KEY FEATURES',
+                           'PRICING STRATEGY', 'GO-TO-MARKET STRATEGY', 'STRENGTHS',
+                           'WEAKNESSES', 'SOURCE'),
+    'feedback': ('COMPETITOR', 'POSITIVE FEEDBACK', 'NEGATIVE FEEDBACK', 'SOURCE'),
+}
+
+# Record fields a report may leave out; every other field must be present
+OPTIONAL_FIELDS = frozenset(('SOURCE', 'SOURCES'))
+
+BMC_MARKER = 'BMC ELEMENT'
+
+_MARKERS = frozenset(SECTIONS) | frozenset(SUBFIELDS) | frozenset(
+    marker for fields in RECORDS.values() for marker in fields
+)
+_MAX_MARKER_WORDS = max(len(marker.split(' ')) for marker in _MARKERS)
+# Marker candidates are found from their colon: the engine searches for the literal ':' and
+# only colons right after a capital letter are looked at further. The run of capitals,
+# spaces and hyphens before the colon is read from a window one character longer than the
+# longest marker, and the marker is the longest known suffix of that run ("NOTE
+# ASSUMPTION:" -> "ASSUMPTION"), so each candidate costs a bounded amount of work.
+_CANDIDATE = re.compile(r':(?<=[A-Z]:)')
+_RUN_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ- '
+_WINDOW = max(len(marker) for marker in _MARKERS) + 1
+_BMC_PREFIX = BMC_MARKER + ' - '
+_NUMBERED = re.compile(r'\d+\.\s*')
+
+
+class Field(NamedTuple):
+    """One marker and the text after it, up to the next marker."""
+    marker: str
+    label: Optional[str]
+    start: int
+    value_start: int
+    value_end: int
+
+
+class Section(NamedTuple):
+    """A header's text up to the first blank line, with any labelled subfields in it."""
+    marker: str
+    text: str
+    fields: Dict[str, str]
+
+    def get(self, marker: str, default: Optional[str] = None) -> Optional[str]:
+        return self.fields.get(marker, default)
+
+
+class Record(NamedTuple):
+    """One repeated entry (an assumption, a competitor, a pain point, ...)."""
+    kind: str
+    fields: Dict[str, str]
+
+    def __getitem__(self, marker: str) -> str:
+        return self.fields[marker]
+
+    def get(self, marker: str, default: Optional[str] = None) -> Optional[str]:
+        return self.fields.get(marker, default)
+
+
+def _marker(run: str) -> Optional[str]:
+    words = run.split(' ')
+    for i in range(max(0, len(words) - _MAX_MARKER_WORDS), len(words)):
+        candidate = ' '.join(words[i:])
+        if candidate in _MARKERS:
+            return candidate
+    return None
+
+
+def _bmc_tokens(text: str) -> List[Tuple[int, str, str, int]]:
+    """
+    Every "BMC ELEMENT - <name>:" with a name of no colons or newlines. The next colon and
+    newline are found once and reused until the scan passes them, so a long line repeating
+    the prefix without a colon is read once instead of once per prefix.
+    """
+    tokens = []
+    end = len(text)
+    colon = newline = -1
+    pos = text.find(_BMC_PREFIX)
+    while pos != -1:
+        name_start = pos + len(_BMC_PREFIX)
+        if colon < name_start:
+            colon = text.find(':', name_start)
+            colon = end if colon == -1 else colon
+        if newline < name_start:
+            newline = text.find('\n', name_start)
+            newline = end if newline == -1 else newline
+        if colon < newline:
+            tokens.append((pos, BMC_MARKER, text[name_start:colon], colon + 1))
+            pos = text.find(_BMC_PREFIX, colon + 1)
+        else:
+            pos = text.find(_BMC_PREFIX, name_start)
+    return tokens
+
+
+def tokenize(text: str) -> List[Field]:
+    """Find every marker in ``text`` in a single left-to-right scan."""
+    found = []
+    for match in _CANDIDATE.finditer(text):
+        colon = match.start()
+        window = text[max(0, colon - _WINDOW):colon]
+        run = window[len(window.rstrip(_RUN_CHARS)):]
+        marker = run if run in _MARKERS else _marker(run)
+        if marker is not None:
+            found.append((colon - len(marker), marker, None, colon + 1))
+    bmc = _bmc_tokens(text)
+    if bmc:
+        # An upper-case element name ("BMC ELEMENT - KEY PARTNERS:") is not a marker of its own
+        element_colons = {value_start - 1 for _, _, _, value_start in bmc}
+        found = sorted([token for token in found if token[3] - 1 not in element_colons] + bmc)
+    ends = [start for start, _, _, _ in found[1:]] + [len(text)]
+    return [Field(marker, label, start, value_start, end)
+            for (start, marker, label, value_start), end in zip(found, ends)]
+
+
+def numbered_items(text: str) -> List[str]:
+    """Split "1. foo 2. bar" into ["foo", "bar"]; text before the first number is dropped."""
+    return [item.strip() for item in _NUMBERED.split(text)[1:]]
+
+
+class ReportDocument:
+    """
+    Parsed agent output in the marker format used by the analysis and research tasks.
+
+    The text is scanned once into a flat list of fields; sections, records and BMC
+    elements are views over that list, built on first use. A field's value runs to the
+    next known marker, and a record ends at the next marker that is not one of its
+    remaining fields.
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ''
+        self.fields = tokenize(self.text)
+        self._sections: Optional[Dict[str, Section]] = None
+        self._records: Dict[str, List[Record]] = {}
+        self._json: Dict[Optional[str], Optional[dict]] = {}
+        self._bmc: Optional[List[Tuple[str, str]]] = None
+        self._structured = False
+
+    @classmethod
+    def prebuilt(cls, text: str, sections: Dict[str, Section], records: Dict[str, List[Record]],
+                 bmc_elements: List[Tuple[str, str]], summary: Optional[dict] = None) -> 'ReportDocument':
+        """
+        A document for ``text`` whose views are already known, so nothing is parsed.
+
+        Used for structured task output: the model is rendered to marker text for storage,
+        and its sections and records are handed over as they are. Kinds missing from
+        ``records`` have no records.
+        """
+        document = cls.__new__(cls)
+        document.text = text
+        document.fields = []
+        document._sections = dict(sections)
+        document._records = {kind: list(records.get(kind, ())) for kind in RECORDS}
+        document._json = {None: summary}
+        if summary is not None:
+            document._json.update((key, summary) for key in summary)
+        document._bmc = list(bmc_elements)
+        document._structured = True
+        return document
+
+    def value(self, field: Field) -> str:
+        return self.text[field.value_start:field.value_end].strip()
+
+    def section(self, marker: str) -> Optional[str]:
+        """Text of the first ``marker:`` header, or None if the report has none."""
+        found = self.sections.get(marker)
+        return found.text if found else None
+
+    @property
+    def sections(self) -> Dict[str, Section]:
+        if self._sections is None:
+            self._sections = self._build_sections()
+        return self._sections
+
+    def _build_sections(self) -> Dict[str, Section]:
+        headers = set(SECTIONS)
+        sections = {}
+        for i, field in enumerate(self.fields):
+            if field.marker not in headers or field.marker in sections:
+                continue
+            end = self.text.find('\n\n', field.value_start)
+            end = len(self.text) if end == -1 else end
+            subfields = {}
+            for sub in self._fields_between(i + 1, end):
+                subfields.setdefault(sub.marker, self.text[sub.value_start:min(sub.value_end, end)].strip())
+            sections[field.marker] = Section(field.marker, self.text[field.value_start:end].strip(), subfields)
+        return sections
+
+    def _fields_between(self, index: int, end: int) -> Iterator[Field]:
+        while index < len(self.fields) and self.fields[index].start < end:
+            yield self.fields[index]
+            index += 1
+
+    def records(self, kind: str) -> List[Record]:
+        """All complete records of ``kind`` (a key of RECORDS), in document order."""
+        if kind not in self._records:
+            self._records[kind] = self._build_records(kind)
+        return self._records[kind]
+
+    def _build_records(self, kind: str) -> List[Record]:
+        lead, *rest = RECORDS[kind]
+        members = set(rest)
+        required = members - OPTIONAL_FIELDS
+        records = []
+        current: Optional[Dict[str, str]] = None
+
+        def close():
+            if current is not None and required.issubset(current):
+                records.append(Record(kind, current))
+
+        for field in self.fields:
+            if field.marker == lead:
+                close()
+                current = {lead: self.value(field)}
+            elif current is not None and field.marker in members and field.marker not in current:
+                current[field.marker] = self.value(field)
+            elif current is not None:
+                close()
+                current = None
+        close()
+        return records
+
+    def json_summary(self, required_key: Optional[str] = None) -> Optional[dict]:
+        """The last JSON object in the report (see utils.json_extract.extract_json)."""
+        if required_key not in self._json:
+            if self._structured:
+                return None  # prebuilt: the summary it was given does not have the key
+            self._json[required_key] = extract_json(self.text, required_key)
+        return self._json[required_key]
+
+    def bmc_elements(self) -> List[Tuple[str, str]]:
+        """(element name, description) for each "BMC ELEMENT - name:" line, stopping at a JSON block."""
+        if self._bmc is None:
+            self._bmc = []
+            for field in self.fields:
+                if field.marker == BMC_MARKER:
+                    description = self.text[field.value_start:field.value_end]
+                    self._bmc.append((field.label.strip(), description.split('{', 1)[0].strip()))
+        return self._bmc
+
+
+def parse_report(text: str) -> ReportDocument:
+    return ReportDocument(text)
+
+
+class ReportCache:
+    """
+    Parsed reports keyed by a hash of their text, least recently used evicted first.
+
+    Streamlit reruns the whole script on every widget interaction; keeping one of these
+    per session means a rerun only hashes the report text, and the sections and records
+    the display functions already built on the cached document are reused as well.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._documents: 'OrderedDict[str, ReportDocument]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.blake2b((text or '').encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, text: str) -> ReportDocument:
+        key = self._key(text)
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return document
+        self.misses += 1
+        document = self._documents[key] = parse_report(text)
+        self._evict()
+        return document
+
+    def put(self, text: str, document: ReportDocument) -> None:
+        """Cache an already built ``document`` for ``text``, unless one is cached already."""
+        key = self._key(text)
+        if key in self._documents:
+            self._documents.move_to_end(key)
+            return
+        self._documents[key] = document
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
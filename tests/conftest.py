@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+
+# The app imports its packages relative to src/ (streamlit run src/main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Shared caches and stores the agents open on their own go to a scratch directory, not data/
+_SCRATCH = tempfile.mkdtemp(prefix="lean-startup-tests-")
+for _name, _path in (("CREW_CACHE_PATH", "crew_cache.sqlite3"), ("SEARCH_CACHE_PATH", "search_cache.sqlite3"),
+                     ("WEB_CACHE_DIR", "web_cache"), ("JOBS_PATH", "jobs.sqlite3")):
+    os.environ[_name] = os.path.join(_SCRATCH, _path)
+
+
+def _recorded(terminalreporter, property_name):
+    return [
+        value
+        for report in terminalreporter.stats.get('passed', []) + terminalreporter.stats.get('failed', [])
+        if report.when == 'call'
+        for name, value in report.user_properties
+        if name == property_name
+    ]
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    List the timings recorded by test_parser_benchmark as a throughput table, and the
+    measurements of the evidence storage tests.
+    """
+    storage = _recorded(terminalreporter, 'storage_benchmark')
+    if storage:
+        terminalreporter.section("storage benchmark")
+        for workload, result in storage:
+            terminalreporter.write_line(f"{workload:<52} {result}")
+    rows = _recorded(terminalreporter, 'benchmark')
+    if not rows:
+        return
+    terminalreporter.section("parser benchmark")
+    terminalreporter.write_line(f"{'entry point':<38} {'input':<20} {'size':>8} {'ms':>9} {'MB/s':>8}")
+    for entry_point, input_name, size, seconds in rows:
+        throughput = size / (1024 * 1024) / seconds if seconds else float('inf')
+        terminalreporter.write_line(
+            f"{entry_point:<38} {input_name:<20} {size // 1024:>6}KB {seconds * 1000:>9.2f} {throughput:>8.1f}"
+        )
+    worst = {}
+    for entry_point, input_name, size, seconds in rows:
+        if seconds > worst.get(size, (0,))[0]:
+            worst[size] = (seconds, entry_point, input_name)
+    for size, (seconds, entry_point, input_name) in sorted(worst.items()):
+        terminalreporter.write_line(
+            f"worst case at {size // 1024} KB: {seconds * 1000:.2f} ms ({entry_point} on {input_name})"
+        )
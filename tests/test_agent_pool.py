@@ -0,0 +1,90 @@
+"""
+The agent pool: instances built once per configuration, leased to one request at a time
+and reset when returned, with plain stand-ins for the crewai agents.
+"""
+import threading
+
+from agents.agent_pool import AgentPool
+from tools.evidence_lookup_tool import EvidenceLookupTool
+
+
+class FakeAgent:
+    def __init__(self):
+        self.tools = ["search"]
+        self.step_callback = None
+        self.crew = None
+
+
+class FakeResearcher:
+    instances = 0
+
+    def __init__(self, structured_output=False):
+        FakeResearcher.instances += 1
+        self.structured_output = structured_output
+        self.agent = FakeAgent()
+        self.tools = self.agent.tools
+        self.evidence_tracker = None
+
+
+class FakeCrew:
+    def __init__(self, *agents):
+        self.agents = list(agents)
+
+
+def test_returned_instances_are_reused_per_configuration():
+    pool = AgentPool()
+    first = pool.acquire(FakeResearcher, structured_output=True)
+    pool.release(first)
+    assert pool.acquire(FakeResearcher, structured_output=True) is first
+    assert pool.acquire(FakeResearcher, structured_output=False) is not first
+    assert pool.stats() == {'built': 2, 'reused': 1, 'idle': 0, 'leased': 2}
+
+
+def test_concurrent_requests_get_their_own_instances():
+    pool = AgentPool()
+    leased = []
+    barrier = threading.Barrier(4)
+
+    def request():
+        with pool.lease(FakeResearcher) as researcher:
+            leased.append(researcher)
+            barrier.wait(5)
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(researcher) for researcher in leased}) == 4
+    assert pool.stats()['idle'] == 4
+
+    # Later requests reuse them instead of building more
+    for _ in range(10):
+        with pool.lease(FakeResearcher):
+            pass
+    assert pool.stats()['built'] == 4
+
+
+def test_evidence_is_bound_for_the_lease_and_state_is_reset():
+    pool = AgentPool()
+    tracker = object()
+    researcher = pool.acquire(FakeResearcher, tracker)
+    lookup = researcher.agent.tools[0]
+    assert isinstance(lookup, EvidenceLookupTool) and lookup.evidence_tracker is tracker
+    assert researcher.evidence_tracker is tracker and researcher.agent.tools[1:] == ["search"]
+    researcher.agent.step_callback = print
+    researcher.agent.crew = "a crew"
+
+    pool.release_crew(FakeCrew(researcher.agent))
+    assert researcher.agent.tools == ["search"] and researcher.evidence_tracker is None
+    assert researcher.agent.step_callback is None and researcher.agent.crew is None
+    # Returning it twice does not put it in the pool twice
+    pool.release(researcher)
+    assert pool.stats()['idle'] == 1
+
+
+def test_idle_instances_are_capped():
+    pool = AgentPool(max_idle=2)
+    leased = [pool.acquire(FakeResearcher) for _ in range(5)]
+    pool.release(*leased)
+    assert pool.stats() == {'built': 5, 'reused': 0, 'idle': 2, 'leased': 0}
@@ -0,0 +1,147 @@
+"""
+Map-reduce competitor analysis: one crew per competitor, run concurrently, then a summary crew,
+with a fake crew runner that answers from the task descriptions instead of calling a model.
+"""
+import re
+import threading
+import time
+
+import pytest
+
+from agents.researcher import ResearcherAgent
+from agents.schemas import CompetitorDeepDive, CompetitorProfile, CustomerFeedback
+from config.settings import JOB_WORKERS
+from utils.parallel import run_concurrently, with_crew_slot
+from utils.report_parser import parse_report
+
+OVERVIEW = """COMPETITOR LANDSCAPE:
+DIRECT COMPETITORS: {names}
+INDIRECT COMPETITORS: Paper planners
+POTENTIAL FUTURE COMPETITORS: School platforms
+
+MARKET POSITIONING:
+MARKET LEADERS: The largest app
+MARKET GAPS: Games for teenagers
+DIFFERENTIATION FACTORS: Clinical evidence
+
+COMPETITIVE STRATEGY:
+1. Partner with clinicians
+2. Price below the leaders
+"""
+
+
+def _profile(name):
+    return CompetitorDeepDive(
+        competitor_profile=CompetitorProfile(
+            name=name, company_size="50", founding_date="2015", business_model="Subscription",
+            target_customers="Parents", unique_value_proposition="Focus games", key_features="Games",
+            pricing_strategy="9 dollars a month", go_to_market_strategy="App stores",
+            strengths=["Brand"], weaknesses=["Price"], source="https://example.com",
+        ),
+        customer_feedback=CustomerFeedback(
+            competitor=name, positive_feedback=["Fun"], negative_feedback=["Ads"]
+        ),
+    ).to_report()
+
+
+class FakeCrews:
+    """Answers each one-task crew from its description, recording overlap and calls."""
+
+    def __init__(self, delay=0.0, fail=(), identified=(), together=None):
+        self.delay = delay
+        # Profiles that must all be running at the same time for any of them to finish
+        self.together = threading.Barrier(together) if together else None
+        self.fail = set(fail)
+        self.identified = list(identified)
+        self.summarized = None
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, crew):
+        description = crew.tasks[0].description
+        if description.startswith("Identify"):
+            return 'Found them.\n{"competitors": %s}' % str(self.identified).replace("'", '"')
+        if description.startswith("Summarize"):
+            self.summarized = description
+            names = re.findall(r"^\s*NAME: (.+)$", description, re.MULTILINE)
+            return OVERVIEW.format(names=", ".join(names))
+        name = re.search(r"Competitor: (.+)", description).group(1).strip()
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            if self.together:
+                self.together.wait(10)
+            if name in self.fail:
+                raise RuntimeError(f"search failed for {name}")
+            return _profile(name)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _names(count):
+    return [f"Competitor {i}" for i in range(count)]
+
+
+def test_competitors_are_profiled_concurrently_and_summarized():
+    crews = FakeCrews(together=10)
+    text = ResearcherAgent(structured_output=True).run_competitor_analysis(
+        _names(10), "ADHD apps", crews, max_workers=10
+    )
+    # All ten were profiled at once, so they take about as long as one
+    assert crews.peak == 10
+
+    report = parse_report(text)
+    assert [record["NAME"] for record in report.records("competitor_profile")] == _names(10)
+    assert len(report.records("feedback")) == 10
+    assert report.sections["COMPETITOR LANDSCAPE"].get("DIRECT COMPETITORS").startswith("Competitor 0")
+    assert report.section("COMPETITIVE STRATEGY")
+
+
+def test_max_workers_bounds_the_profiles_running_at_once():
+    crews = FakeCrews(delay=0.05)
+    ResearcherAgent(structured_output=True).run_competitor_analysis(
+        _names(6), "ADHD apps", crews, max_workers=2
+    )
+    assert crews.peak == 2
+
+
+def test_failed_profiles_are_left_out_of_the_summary():
+    crews = FakeCrews(fail={"Competitor 1"})
+    progress = []
+    text = ResearcherAgent(structured_output=True).run_competitor_analysis(
+        _names(3), "ADHD apps", crews, progress=progress.append
+    )
+    assert [record["NAME"] for record in parse_report(text).records("competitor_profile")] == \
+        ["Competitor 0", "Competitor 2"]
+    assert "Competitor 1" not in crews.summarized
+    assert "3 of 3 competitors profiled" in progress
+
+    with pytest.raises(RuntimeError, match="search failed"):
+        ResearcherAgent(structured_output=True).run_competitor_analysis(
+            ["Competitor 1"], "ADHD apps", FakeCrews(fail={"Competitor 1"})
+        )
+
+
+def test_competitors_are_identified_when_only_an_industry_is_given():
+    crews = FakeCrews(identified=["Acme", "Focus Kids", "Acme"])
+    text = ResearcherAgent(structured_output=True).run_competitor_analysis(None, "ADHD apps", crews)
+    assert [record["NAME"] for record in parse_report(text).records("competitor_profile")] == \
+        ["Acme", "Focus Kids"]
+
+
+def test_concurrent_fanouts_share_the_process_wide_crew_slots():
+    crews = FakeCrews(delay=0.05)
+    run_crew = with_crew_slot(crews)
+    # Three jobs at once, each profiling four competitors at once
+    jobs = {
+        f"job {i}": lambda: ResearcherAgent(structured_output=True).run_competitor_analysis(
+            _names(4), "ADHD apps", run_crew, max_workers=4
+        )
+        for i in range(3)
+    }
+    assert all(error is None for _, _, error in run_concurrently(jobs))
+    assert crews.peak == JOB_WORKERS
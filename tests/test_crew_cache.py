@@ -0,0 +1,92 @@
+"""
+The disk cache behind crew results: expiry, LRU and size eviction, and the crew key.
+"""
+import os
+import time
+
+import pytest
+from crewai import LLM, Agent, Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from agents.crew_cache import CrewResultCache, crew_key
+from agents.schemas import AnalysisReport
+from utils.disk_cache import DiskCache
+
+
+@pytest.fixture(autouse=True)
+def _api_key(monkeypatch):
+    # Agents check for a key when built; nothing here calls the model
+    monkeypatch.setenv("OPENAI_API_KEY", os.environ.get("OPENAI_API_KEY", "sk-test"))
+
+
+def test_entries_expire(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", "1", ttl=0.05)
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.get("b") == "2"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_byte_limit_evicts_oldest(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=250, compression='none')
+    for key in "abc":
+        cache.set(key, key * 100)
+        time.sleep(0.01)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= 250
+    assert len(cache) == 2
+
+
+def test_cache_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path).set("a", "ü" * 1000)
+    assert DiskCache(path).get("a") == "ü" * 1000
+
+
+def _crew(description="Analyze   this idea:\n  labs", temperature=None):
+    llm = LLM(model="gpt-4o-mini", temperature=temperature)
+    agent = Agent(role="Analyst", goal="Analyze", backstory="An analyst", llm=llm)
+    task = Task(description=description, expected_output="An analysis", agent=agent,
+                output_pydantic=AnalysisReport)
+    return Crew(agents=[agent], tasks=[task], process=Process.sequential)
+
+
+def test_crew_key_ignores_whitespace_but_not_prompts_or_settings():
+    assert crew_key(_crew()) == crew_key(_crew("Analyze this idea: labs"))
+    assert crew_key(_crew()) != crew_key(_crew("Analyze this idea: bakeries"))
+    assert crew_key(_crew()) != crew_key(_crew(temperature=0.9))
+
+
+def test_crew_results_round_trip(tmp_path):
+    results = CrewResultCache(DiskCache(str(tmp_path / "crew.sqlite3")))
+    report = AnalysisReport(initial_thoughts="Promising", next_steps=["Interview labs"])
+    output = CrewOutput(
+        raw=report.model_dump_json(),
+        pydantic=report,
+        tasks_output=[TaskOutput(description="Analyze", raw=report.model_dump_json(), agent="Analyst")],
+    )
+    assert results.get(_crew()) is None
+    results.put(_crew(), output)
+
+    cached = results.kickoff(_crew())
+    assert cached.pydantic == report
+    assert cached.raw == output.raw
+    assert cached.tasks_output[0].agent == "Analyst"
+    assert results.stats()["hits"] == 1
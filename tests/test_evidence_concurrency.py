@@ -0,0 +1,80 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from tools.evidence_tracker import EvidenceTracker
+
+WRITERS = 8
+ITEMS_PER_WRITER = 40
+
+
+def _writer(storage_path, storage_mode, writer_id, start_event):
+    tracker = EvidenceTracker(storage_path=storage_path, storage_mode=storage_mode, **_options(storage_mode))
+    start_event.wait()
+    for i in range(ITEMS_PER_WRITER):
+        tracker.add_evidence(
+            decision_id=f"writer{writer_id}_item{i}",
+            evidence_type="market_research",
+            source=f"writer {writer_id}",
+            content=f"Report {i} from writer {writer_id}. " * 20,
+            agent_name="Market Research Specialist",
+            confidence=1 + i % 5,
+        )
+    tracker.close()
+
+
+def _options(storage_mode):
+    # A tiny threshold makes writers compact the journal while others are appending
+    return {'compact_threshold': 25} if storage_mode == 'journal' else {}
+
+
+@pytest.mark.parametrize("storage_mode", ["json", "journal", "sqlite"])
+def test_concurrent_writer_processes_lose_no_evidence(tmp_path, storage_mode):
+    storage_path = str(tmp_path / "evidence.json")
+    # Pre-existing evidence must survive too (and is migrated for journal/sqlite)
+    with open(storage_path, 'w') as f:
+        json.dump({"seed": {"type": "web", "source": "seed", "content": "seed", "agent": "a",
+                            "confidence": 3, "timestamp": "2025-01-01T00:00:00"}}, f)
+
+    ctx = multiprocessing.get_context("spawn")
+    start_event = ctx.Event()
+    processes = [
+        ctx.Process(target=_writer, args=(storage_path, storage_mode, writer_id, start_event))
+        for writer_id in range(WRITERS)
+    ]
+    for process in processes:
+        process.start()
+    start_event.set()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    tracker = EvidenceTracker(storage_path=storage_path, storage_mode=storage_mode)
+    evidence = tracker.get_all_evidence()
+    expected = {f"writer{w}_item{i}" for w in range(WRITERS) for i in range(ITEMS_PER_WRITER)}
+    assert expected | {"seed"} == set(evidence)
+    assert evidence["writer3_item7"]["source"] == "writer 3"
+    tracker.close()
+
+    if storage_mode == "json":
+        # The file must always be complete, valid JSON with no leftover temp files
+        with open(storage_path) as f:
+            assert len(json.load(f)) == len(expected) + 1
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_sessions_see_each_others_writes(tmp_path):
+    storage_path = str(tmp_path / "evidence.json")
+    for storage_mode in ("json", "journal"):
+        first = EvidenceTracker(storage_path=storage_path, storage_mode=storage_mode)
+        second = EvidenceTracker(storage_path=storage_path, storage_mode=storage_mode)
+        first.add_evidence(f"{storage_mode}_a", "web", "s", "from first", "agent")
+        second.add_evidence(f"{storage_mode}_b", "web", "s", "from second", "agent")
+
+        # Neither write overwrote the other, and both sessions see both items
+        assert {f"{storage_mode}_a", f"{storage_mode}_b"} <= set(first.get_all_evidence())
+        assert second.get_evidence(f"{storage_mode}_a")["content"] == "from first"
+        first.close()
+        second.close()
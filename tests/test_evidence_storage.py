@@ -0,0 +1,544 @@
+"""
+Behaviour of the evidence stores: what is kept on disk, and how it is read back.
+"""
+from datetime import datetime, timedelta
+import gc
+import json
+import sqlite3
+import threading
+import time
+import tracemalloc
+import weakref
+
+import pytest
+
+from tools.evidence_retention import EvidenceRetention, RetentionPolicy
+from tools.evidence_search import tokenize
+from tools.evidence_storage import JournalEvidenceStorage
+from tools.evidence_tracker import EvidenceTracker
+from tools.evidence_writer import EvidenceWriter
+
+
+def _add(tracker, decision_id, content, evidence_type="market_research", source="AI Research", confidence=3):
+    tracker.add_evidence(decision_id=decision_id, evidence_type=evidence_type, source=source,
+                         content=content, agent_name="Researcher", confidence=confidence)
+
+
+def test_sqlite_content_length_counts_utf8_bytes(tmp_path):
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite")
+    _add(tracker, "quote", "Ça coûte 20 € — trop cher")
+    tracker.close()
+
+    conn = sqlite3.connect(str(tmp_path / "evidence.sqlite3"))
+    (length,) = conn.execute("SELECT content_length FROM evidence WHERE id = 'quote'").fetchone()
+    assert length == len("Ça coûte 20 € — trop cher".encode("utf-8"))
+    # Databases written with character counts are corrected once on open
+    with conn:
+        conn.execute("UPDATE evidence SET content_length = 25")
+        conn.execute("DELETE FROM storage_meta WHERE key = 'content_length_bytes'")
+    conn.close()
+    EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite").close()
+    conn = sqlite3.connect(str(tmp_path / "evidence.sqlite3"))
+    assert conn.execute("SELECT content_length FROM evidence").fetchone()[0] == length
+    conn.close()
+
+
+@pytest.mark.parametrize("storage_mode", ["json", "journal", "sqlite"])
+def test_retention_limits_hold_for_the_store_shared_by_sessions(tmp_path, storage_mode):
+    path = str(tmp_path / "evidence.json")
+    policy = RetentionPolicy(max_items=3)
+    sessions = [EvidenceTracker(storage_path=path, storage_mode=storage_mode, retention=policy) for _ in range(2)]
+    for i in range(4):
+        for n, session in enumerate(sessions):
+            _add(session, f"session{n}_item{i}", f"Report {i}")
+    assert sessions[0].count_evidence() == 3
+    # The oldest go first, whichever session wrote them
+    assert set(sessions[1].get_all_evidence()) == {"session1_item2", "session0_item3", "session1_item3"}
+    for session in sessions:
+        session.close()
+
+
+def _journal(path, **options):
+    return EvidenceTracker(storage_path=path, storage_mode="journal", **options)
+
+
+def _segment(tmp_path):
+    (segment,) = tmp_path.glob("evidence.journal.*.jsonl")
+    return segment
+
+
+def test_journal_replays_complete_lines_after_a_crash_mid_append(tmp_path):
+    path = str(tmp_path / "evidence.json")
+    tracker = _journal(path)
+    _add(tracker, "kept", "Written before the crash")
+    _add(tracker, "replaced", "First version")
+    _add(tracker, "replaced", "Second version")
+    _add(tracker, "deleted", "Gone")
+    tracker.delete_evidence("deleted")
+    tracker.close()
+    # The process died part-way through appending a line
+    with open(_segment(tmp_path), "ab") as f:
+        f.write(b'{"op": "add", "id": "torn", "record": {"type": "web", "con')
+
+    restarted = _journal(path)
+    assert set(restarted.get_all_evidence()) == {"kept", "replaced"}
+    assert restarted.get_content("replaced") == "Second version"
+    # The next append replaces the torn tail instead of being glued to it
+    _add(restarted, "after", "Written after the restart")
+    restarted.close()
+    assert set(_journal(path).get_all_evidence()) == {"kept", "replaced", "after"}
+
+
+def test_journal_compaction_folds_segments_into_a_snapshot(tmp_path):
+    path = str(tmp_path / "evidence.json")
+    tracker = _journal(path)
+    for i in range(5):
+        _add(tracker, f"item{i}", f"Report {i}")
+    tracker.delete_evidence("item0")
+    tracker.close()
+    with open(_segment(tmp_path), "ab") as f:
+        f.write(b'{"op": "delete", "id": "it')
+
+    restarted = _journal(path)
+    restarted.compact()
+    # Only the fresh, empty segment is left next to the snapshot
+    assert _segment(tmp_path).stat().st_size == 0
+    assert (tmp_path / "evidence.snapshot.jsonl").exists()
+    _add(restarted, "item5", "Report 5")
+    restarted.close()
+
+    reopened = _journal(path)
+    assert set(reopened.get_all_evidence()) == {"item1", "item2", "item3", "item4", "item5"}
+    assert reopened.get_content("item3") == "Report 3"
+
+
+LEGACY = {
+    "market_research_1": {"type": "market_research", "source": "AI Research", "agent": "Researcher",
+                          "confidence": 4, "timestamp": "2025-01-02T00:00:00",
+                          "content": "Labs spend $2B a year on new equipment"},
+    "interview_1": {"type": "customer_interview", "source": "Interview with a lab manager", "agent": "Founder",
+                    "confidence": 5, "timestamp": "2025-01-03T00:00:00",
+                    "content": "We would buy refurbished centrifuges with a warranty"},
+}
+
+
+def test_legacy_json_evidence_is_migrated_to_sqlite_once(tmp_path):
+    path = tmp_path / "evidence.json"
+    path.write_text(json.dumps(LEGACY))
+    tracker = EvidenceTracker(storage_path=str(path), storage_mode="sqlite")
+    assert tracker.get_all_evidence() == LEGACY
+    tracker.delete_evidence("interview_1")
+    tracker.close()
+
+    # The JSON file is left in place but not imported again
+    reopened = EvidenceTracker(storage_path=str(path), storage_mode="sqlite")
+    assert set(reopened.get_all_evidence()) == {"market_research_1"}
+    assert reopened.get_evidence("market_research_1")["timestamp"] == "2025-01-02T00:00:00"
+    reopened.close()
+
+
+@pytest.mark.parametrize("storage_mode", ["journal", "sqlite"])
+def test_search_ranks_matches_and_follows_changes(tmp_path, storage_mode):
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode=storage_mode)
+    _add(tracker, "pricing", "Labs compare centrifuge prices. Centrifuge warranty terms decide the sale.")
+    _add(tracker, "mention", "One lab owns a centrifuge, but budgets are the main topic of this long report "
+                             "about grants, hiring, procurement rules and travel.")
+    _add(tracker, "interview", "I would buy a used centrifuge", evidence_type="customer_interview",
+         source="Interview with Dana")
+    _add(tracker, "other", "Pipettes and gloves")
+
+    results = tracker.search("centrifuge")
+    assert [result["id"] for result in results][:2] == ["pricing", "interview"]
+    assert {result["id"] for result in results} == {"pricing", "mention", "interview"}
+    assert "**centrifuge**" in results[0]["snippet"].lower()
+    assert results[0]["score"] > results[-1]["score"]
+    # Every term must match; sources are searched too; filters narrow the results
+    assert [result["id"] for result in tracker.search("centrifuge warranty")] == ["pricing"]
+    assert [result["id"] for result in tracker.search("dana")] == ["interview"]
+    assert [result["id"] for result in tracker.search("centrifuge", {"type": "customer_interview"})] == ["interview"]
+    assert tracker.search("") == []
+
+    # Replaced content is found by its new text only, deleted evidence not at all
+    _add(tracker, "pricing", "Pipettes are cheap")
+    tracker.delete_evidence("interview")
+    assert [result["id"] for result in tracker.search("centrifuge")] == ["mention"]
+    assert {result["id"] for result in tracker.search("pipettes")} == {"pricing", "other"}
+    tracker.close()
+
+
+# (mode, lazy_content) of every backend; None is the in-memory store
+BACKENDS = [(None, False), ("json", False), ("journal", False), ("journal", True), ("sqlite", False)]
+
+
+def test_every_backend_answers_a_query_with_the_same_evidence(tmp_path):
+    evidence = {
+        "interviews": ("Interviews with lab managers: they compared warranties", "Interview notes"),
+        "interview": ("One interview, one managing director, no warranty", "Interview notes"),
+        "pricing": ("Pricing of refurbished centrifuges", "Café Research"),
+        "hiring": ("Hiring plans for managed_services", "AI Research"),
+    }
+    queries = ["interviews", "interviewing", "managers warranty", "centrifuge", "cafe", "managed", "services",
+               "manage", "INTERVIEW"]
+    answers = {}
+    for mode, lazy in BACKENDS:
+        path = str(tmp_path / f"{mode}-{lazy}" / "evidence.json") if mode else None
+        tracker = EvidenceTracker(storage_path=path, storage_mode=mode or "json", lazy_content=lazy)
+        for decision_id, (content, source) in evidence.items():
+            _add(tracker, decision_id, content, source=source)
+        answers[(mode, lazy)] = {query: {result["id"] for result in tracker.search(query)} for query in queries}
+        tracker.close()
+    assert all(answer == answers[("sqlite", False)] for answer in answers.values()), answers
+    found = answers[("sqlite", False)]
+    assert found["interviews"] == found["interviewing"] == {"interviews", "interview"}
+    assert found["managers warranty"] == {"interviews", "interview"}
+    assert found["cafe"] == {"pricing"} and found["centrifuge"] == {"pricing"}
+    # Underscores separate words, and stems are shared: "managed", "managers", "managing" -> "manag"
+    assert found["services"] == {"hiring"}
+    assert found["managed"] == found["manage"] == {"interviews", "interview", "hiring"}
+
+
+def test_tokens_match_the_sqlite_porter_tokenizer():
+    text = ("Connected connecting connections generalization generously relational conditional hopping "
+            "hoped falling filing agreed feed skies sky happily studies cries ponies caresses "
+            "adjustable irritant replacement adoption rate_limit Straße École naïve İstanbul σοφία "
+            "electricity hopefulness goodness formality sensitivity rolling controllable")
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize = 'porter unicode61')")
+    conn.execute("CREATE VIRTUAL TABLE v USING fts5vocab(t, 'instance')")
+    conn.execute("INSERT INTO t (x) VALUES (?)", (text,))
+    assert tokenize(text) == [row[0] for row in conn.execute("SELECT term FROM v ORDER BY offset")]
+    conn.close()
+
+
+def test_writer_coalesces_what_piles_up_behind_a_slow_write():
+    batches, started, release = [], threading.Event(), threading.Event()
+
+    def apply_batch(ops):
+        batches.append(ops)
+        started.set()
+        release.wait(5)
+
+    writer = EvidenceWriter(apply_batch)
+    writer.submit([("add", "first", {"content": "1"})])
+    started.wait(5)
+    # Queued while the first batch is being written
+    writer.submit([("add", "a", {"content": "old"})])
+    writer.submit([("add", "b", {"content": "b"})])
+    writer.submit([("add", "a", {"content": "new"}), ("delete", "b")])
+    assert writer.pending
+    release.set()
+    writer.flush()
+    assert not writer.pending
+    assert batches == [
+        [("add", "first", {"content": "1"})],
+        [("add", "a", {"content": "new"}), ("delete", "b")],
+    ]
+
+    writer.submit([("add", "c", {}), ("clear",), ("add", "d", {})])
+    writer.close()
+    assert batches[-1] == [("clear",), ("add", "d", {})]
+    with pytest.raises(RuntimeError, match="closed"):
+        writer.submit([("add", "e", {})])
+
+
+def test_writer_errors_surface_on_flush():
+    def apply_batch(ops):
+        raise OSError("disk full")
+
+    writer = EvidenceWriter(apply_batch)
+    writer.submit([("add", "a", {})])
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush()
+    writer.flush()
+    writer.close()
+
+
+def test_async_tracker_reads_its_own_writes(tmp_path):
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite", async_writes=True)
+    for i in range(50):
+        _add(tracker, f"item{i}", f"Report {i}")
+    assert tracker.count_evidence() == 50
+    tracker.delete_evidence("item0")
+    assert tracker.get_evidence("item0") is None
+    tracker.close()
+    assert EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite").count_evidence() == 49
+
+
+def _writer_threads():
+    return sum(thread.name == "evidence-writer" for thread in threading.enumerate())
+
+
+def test_dropped_trackers_are_collected_with_their_writers(tmp_path):
+    before = _writer_threads()
+    dropped = []
+    for i in range(20):
+        tracker = EvidenceTracker(storage_path=str(tmp_path / f"{i}" / "evidence.json"), storage_mode="sqlite",
+                                  async_writes=True)
+        _add(tracker, "item", f"Report {i}")
+        dropped.append(weakref.ref(tracker))
+    # The last write of each tracker is queued when it is dropped, and still lands
+    del tracker
+    deadline = time.time() + 10
+    while (_writer_threads() > before or any(ref() is not None for ref in dropped)) and time.time() < deadline:
+        gc.collect()
+        time.sleep(0.01)
+    assert all(ref() is None for ref in dropped)
+    assert _writer_threads() == before
+    for i in range(20):
+        reopened = EvidenceTracker(storage_path=str(tmp_path / f"{i}" / "evidence.json"), storage_mode="sqlite")
+        assert reopened.get_content("item") == f"Report {i}"
+        reopened.close()
+
+
+def test_lazy_reads_follow_a_compaction_by_another_session(tmp_path):
+    path = str(tmp_path / "evidence.json")
+    reader = _journal(path, lazy_content=True)
+    writer = _journal(path, lazy_content=True)
+    for i in range(10):
+        _add(writer, f"item{i}", f"Report {i}: " + "market sizing notes " * 200)
+    assert reader.get_content("item1").startswith("Report 1: ")  # maps the content file
+    for i in range(2, 10):
+        writer.delete_evidence(f"item{i}")
+    # Most blobs are garbage now, so the live ones move to a new content file
+    writer.compact()
+    assert not (tmp_path / "evidence.content.bin").exists()
+
+    assert reader.get_content("item0").startswith("Report 0: ")
+    assert reader.get_content("item1").startswith("Report 1: ")
+    assert set(reader.get_all_evidence()) == {"item0", "item1"}
+    _add(reader, "item10", "Written after the compaction")
+    assert writer.get_content("item10") == "Written after the compaction"
+    reader.close()
+    writer.close()
+    assert _journal(path, lazy_content=True).get_content("item1").startswith("Report 1: ")
+
+
+LAZY_ITEMS = 2000
+LAZY_BODY_BYTES = 20 * 1024
+
+
+def test_lazy_journal_reload_reads_metadata_only(tmp_path, record_property):
+    path = str(tmp_path / "evidence.json")
+    storage = JournalEvidenceStorage(path, lazy=True, compact_threshold=10 ** 9)
+    storage.load()
+    words = " ".join(f"word{i % 997}" for i in range(LAZY_BODY_BYTES // 5))
+    storage.apply([
+        ("add", f"item{i}", {"type": "market_research", "source": "AI Research", "agent": "Researcher",
+                             "confidence": 3, "timestamp": f"2025-01-01T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+                             "content": f"Report {i}: {words}"[:LAZY_BODY_BYTES]})
+        for i in range(LAZY_ITEMS)
+    ])
+    storage.close()
+
+    gc.collect()
+    started = time.perf_counter()
+    reloaded = JournalEvidenceStorage(path, lazy=True)
+    reloaded.load()
+    seconds = time.perf_counter() - started
+    # Again for the memory, which tracing would have slowed down
+    tracemalloc.start()
+    JournalEvidenceStorage(path, lazy=True).load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    record_property("storage_benchmark", (
+        f"lazy journal reload, {LAZY_ITEMS} x {LAZY_BODY_BYTES // 1024} KB",
+        f"{seconds * 1000:.0f} ms, peak {peak / 2 ** 20:.1f} MB",
+    ))
+
+    assert reloaded.count() == LAZY_ITEMS
+    assert reloaded.get_content("item1999").startswith("Report 1999: word0")
+    # The bodies add up to 40 MB; none of them is read to load the store
+    assert peak < 10 * 2 ** 20
+    assert seconds < 2
+    reloaded.close()
+
+
+def _blobs(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "evidence.sqlite3"))
+    rows = conn.execute("SELECT refcount FROM evidence_blobs ORDER BY refcount").fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def test_shared_bodies_are_stored_once_and_released_with_their_last_item(tmp_path):
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite")
+    report = "Market research report. " * 500
+    _add(tracker, "run1", report)
+    _add(tracker, "run2", report)
+    _add(tracker, "other", "A different report")
+    assert _blobs(tmp_path) == [1, 2]
+    stats = tracker.storage_stats()
+    assert (stats["items"], stats["unique_bodies"], stats["shared_bodies"]) == (3, 2, 1)
+    assert stats["dedup_ratio"] > 1.9 and stats["compression_ratio"] > 10
+
+    tracker.delete_evidence("run1")
+    assert _blobs(tmp_path) == [1, 1]
+    assert tracker.get_content("run2") == report
+    # Replacing the last user of a body releases it too
+    _add(tracker, "run2", "A different report")
+    assert _blobs(tmp_path) == [2]
+    tracker.delete_evidence("run2")
+    tracker.delete_evidence("other")
+    assert _blobs(tmp_path) == []
+    tracker.close()
+
+
+def test_lazy_journal_shares_bodies_between_items(tmp_path):
+    path = str(tmp_path / "evidence.json")
+    tracker = _journal(path, lazy_content=True)
+    report = "Competitor analysis. " * 500
+    for i in range(4):
+        _add(tracker, f"run{i}", report)
+    stats = tracker.storage_stats()
+    assert (stats["items"], stats["unique_bodies"]) == (4, 1)
+    assert (tmp_path / "evidence.content.bin").stat().st_size == stats["stored_bytes"]
+    tracker.delete_evidence("run0")
+    tracker.close()
+    assert _journal(path, lazy_content=True).get_content("run3") == report
+
+
+# The SQLite layout from before content addressing: plain bodies, and a second copy in the index
+UNADDRESSED_SCHEMA = """
+    CREATE TABLE evidence (id TEXT PRIMARY KEY, type TEXT, source TEXT, agent TEXT, confidence INTEGER,
+                           timestamp TEXT, content_length INTEGER);
+    CREATE TABLE evidence_content (id TEXT PRIMARY KEY REFERENCES evidence(id) ON DELETE CASCADE, content TEXT);
+    CREATE TABLE storage_meta (key TEXT PRIMARY KEY, value TEXT);
+    CREATE VIRTUAL TABLE evidence_fts USING fts5(source, content, tokenize = 'porter unicode61');
+"""
+
+
+def test_unaddressed_databases_shrink_when_migrated(tmp_path, record_property):
+    # 50 reports of ~20 KB, each saved four times (re-runs and slices of the same text)
+    vocabulary = [f"{word}{i}" for i in range(400) for word in ("market", "lab", "price")]
+    reports = [" ".join(vocabulary[(i * 7 + j * j) % len(vocabulary)] for j in range(2500)) for i in range(50)]
+    db_path = tmp_path / "evidence.sqlite3"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(UNADDRESSED_SCHEMA)
+    with conn:
+        conn.execute("INSERT INTO storage_meta VALUES ('json_migrated', '1')")
+        for i in range(200):
+            content = reports[i % 50]
+            conn.execute("INSERT INTO evidence VALUES (?, 'market_research', 'AI Research', 'Researcher', 3, ?, ?)",
+                         (f"item{i}", f"2025-01-01T00:00:{i % 60:02d}", len(content)))
+            conn.execute("INSERT INTO evidence_content VALUES (?, ?)", (f"item{i}", content))
+            conn.execute("INSERT INTO evidence_fts (rowid, source, content) VALUES (?, 'AI Research', ?)",
+                         (i + 1, content))
+    conn.execute("VACUUM")
+    conn.close()
+    before = db_path.stat().st_size
+
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite")
+    tracker.flush()
+    assert tracker.get_content("item123") == reports[23]
+    assert {result["id"] for result in tracker.search(reports[7].split()[100], limit=200)} >= {"item7", "item57"}
+    tracker.close()
+    after = db_path.stat().st_size
+    record_property("storage_benchmark", (
+        "SQLite migration, 200 items / 50 distinct bodies",
+        f"{before / 2 ** 20:.1f} MB -> {after / 2 ** 20:.1f} MB",
+    ))
+    assert after * 5 < before
+
+
+@pytest.mark.parametrize("eviction, evicted", [("lru", "item1"), ("oldest", "item0")])
+def test_eviction_order(tmp_path, eviction, evicted):
+    policy = RetentionPolicy(max_items=3, eviction=eviction)
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite", retention=policy)
+    for i in range(3):
+        _add(tracker, f"item{i}", f"Report {i}")
+    tracker.get_content("item0")
+    _add(tracker, "item3", "Report 3")
+    assert set(tracker.get_all_evidence()) == {"item0", "item1", "item2", "item3"} - {evicted}
+    tracker.close()
+
+
+def test_lru_order_is_shared_by_the_trackers_of_a_store(tmp_path):
+    path = str(tmp_path / "evidence.json")
+    writer, reader = (
+        EvidenceTracker(storage_path=path, storage_mode="sqlite", retention=RetentionPolicy(max_items=3))
+        for _ in range(2)
+    )
+    for i in range(3):
+        _add(writer, f"item{i}", f"Report {i}")
+    # Read through one tracker, written through the other: item0 was used last
+    reader.get_content("item0")
+    _add(writer, "item3", "Report 3")
+    assert set(reader.get_all_evidence()) == {"item0", "item2", "item3"}
+    writer.close()
+    reader.close()
+
+
+def test_reloading_retention_keeps_recent_reads():
+    retention = EvidenceRetention(RetentionPolicy(max_items=3, ttl={"web": timedelta(days=1)}))
+    footprint = [(f"item{i}", "web", f"2024-01-0{i + 1}T00:00:00", 10) for i in range(3)]
+    retention.load(footprint)
+    retention.touch("item0")
+    # Another process added item3 and removed item2
+    retention.load(footprint[:2] + [("item3", "web", "2024-01-04T00:00:00", 10)])
+    assert len(retention) == 3 and retention.total_bytes == 30
+    retention.record_add("item4", "web", "2024-01-05T00:00:00", 10)
+    assert retention.collect(now=datetime(2024, 1, 1)) == ["item1"]
+    # Expiry still goes by timestamp, not by use
+    assert retention.collect(now=datetime(2024, 1, 2, 12)) == ["item0"]
+
+
+def test_byte_limit_and_protected_interviews(tmp_path):
+    policy = RetentionPolicy(max_bytes=2500, eviction="oldest")
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode="sqlite", retention=policy)
+    _add(tracker, "interview", "é" * 5000, evidence_type="customer_interview")
+    for i in range(3):
+        _add(tracker, f"item{i}", "x" * 1000)
+    # Interviews neither count toward the limit nor make room
+    assert set(tracker.get_all_evidence()) == {"interview", "item1", "item2"}
+    _add(tracker, "big", "€" * 1000)  # 3000 bytes in UTF-8
+    assert set(tracker.get_all_evidence()) == {"interview"}
+    tracker.close()
+
+
+def test_types_expire_after_their_ttl(tmp_path):
+    now = datetime.now()
+    legacy = {
+        f"{evidence_type}_{days}": {"type": evidence_type, "source": "AI Research", "agent": "Researcher",
+                                    "confidence": 3, "timestamp": (now - timedelta(days=days)).isoformat(),
+                                    "content": "Report"}
+        for evidence_type in ("market_research", "competitor_analysis", "customer_interview")
+        for days in (10, 45, 90)
+    }
+    path = tmp_path / "evidence.json"
+    path.write_text(json.dumps(legacy))
+    policy = RetentionPolicy(ttl={"market_research": timedelta(days=30), "competitor_analysis": timedelta(days=60),
+                                  "customer_interview": timedelta(days=1)})
+    tracker = EvidenceTracker(storage_path=str(path), storage_mode="sqlite", retention=policy)
+    # Expired items go with the next write
+    _add(tracker, "new", "Report")
+    assert set(tracker.get_all_evidence()) == {
+        "new", "market_research_10", "competitor_analysis_10", "competitor_analysis_45",
+        "customer_interview_10", "customer_interview_45", "customer_interview_90",
+    }
+    tracker.close()
+
+
+@pytest.mark.parametrize("storage_mode", ["json", "journal", "sqlite"])
+def test_query_pages_through_sorted_filtered_evidence(tmp_path, storage_mode):
+    tracker = EvidenceTracker(storage_path=str(tmp_path / "evidence.json"), storage_mode=storage_mode)
+    for i in range(25):
+        _add(tracker, f"item{i:02d}", f"Report {i}", evidence_type="web" if i % 5 == 0 else "market_research",
+             confidence=1 + i % 5)
+
+    pages = [tracker.query_evidence(offset=offset, limit=10) for offset in (0, 10, 20, 30)]
+    assert [len(page) for page in pages] == [10, 10, 5, 0]
+    listed = [item["id"] for page in pages for item in page]
+    assert sorted(listed, reverse=True) == listed == [f"item{i:02d}" for i in reversed(range(25))]
+    assert "content" not in pages[0][0]
+
+    web = tracker.query_evidence({"type": "web"}, sort_by="timestamp", descending=False, limit=3)
+    assert [item["id"] for item in web] == ["item00", "item05", "item10"]
+    assert tracker.count_evidence() == 25
+    assert tracker.count_evidence({"type": "web"}) == 5
+    assert tracker.count_evidence({"type": "market_research", "min_confidence": 4}) == 10
+    confident = tracker.query_evidence({"min_confidence": 5}, sort_by="confidence", limit=100)
+    assert {item["id"] for item in confident} == {f"item{i:02d}" for i in range(4, 25, 5)}
+    assert tracker.evidence_facets("type") == {"web": 5, "market_research": 20}
+    with pytest.raises(ValueError, match="Cannot sort"):
+        tracker.query_evidence(sort_by="content")
+    tracker.close()
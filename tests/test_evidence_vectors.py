@@ -0,0 +1,99 @@
+"""
+The evidence similarity index, on a fake embedder whose vectors count a few topic words.
+"""
+import math
+
+from tools import evidence_vectors
+from tools.evidence_tracker import EvidenceTracker
+from tools.evidence_vectors import EvidenceVectorIndex, shared_vector_index
+
+TOPICS = ("centrifuge", "pipette", "grant", "warranty")
+
+
+class TopicEmbedder:
+    name = "topics-test"
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        vectors = []
+        for text in texts:
+            words = text.lower().split()
+            # A small constant dimension keeps texts without any topic off the zero vector
+            vector = [float(sum(word.startswith(topic) for word in words)) for topic in TOPICS] + [0.1]
+            norm = math.sqrt(sum(v * v for v in vector))
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+def _record(content, evidence_type="market_research", source="AI Research"):
+    return {"content": content, "type": evidence_type, "source": source}
+
+
+def _ids(results):
+    return [result["id"] for result in results]
+
+
+def test_similar_ranks_items_by_their_best_chunk(tmp_path):
+    index = EvidenceVectorIndex(str(tmp_path / "db"), embedder=TopicEmbedder())
+    index.index("warranty", _record("Centrifuge warranty terms for centrifuges"))
+    index.index("grants", _record("Centrifuge grant budgets"))
+    index.index("gloves", _record("Pipette tips and gloves", evidence_type="web"))
+    # Several chunks; only the best one counts, and the item is listed once
+    index.index("long", _record("\n\n".join(["Grant rules " * 60, "Pipette pricing " * 60, "Grant travel " * 60])))
+    assert index.count() > 4
+
+    results = index.similar("centrifuge", k=2)
+    assert _ids(results) == ["warranty", "grants"]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["snippet"] == "Centrifuge warranty terms for centrifuges"
+    assert results[0]["type"] == "market_research" and results[0]["source"] == "AI Research"
+    assert _ids(index.similar("pipette", k=5))[:2] in (["gloves", "long"], ["long", "gloves"])
+    assert _ids(index.similar("pipette", k=5)).count("long") == 1
+    assert _ids(index.similar("pipette", evidence_type="web")) == ["gloves"]
+    assert index.similar("   ") == []
+
+
+def test_replace_remove_and_clear(tmp_path):
+    index = EvidenceVectorIndex(str(tmp_path / "db"), embedder=TopicEmbedder())
+    index.index_many({"a": _record("Centrifuge warranty"), "b": _record("Centrifuge grant")})
+    index.index("a", _record("Pipette gloves"))
+    assert index.count() == 2
+    assert _ids(index.similar("centrifuge", k=1)) == ["b"]
+    assert index.similar("pipette", k=1)[0]["snippet"] == "Pipette gloves"
+
+    index.remove_many(["b"])
+    assert "b" not in _ids(index.similar("centrifuge"))
+    index.remove_many([])
+    index.clear()
+    assert index.count() == 0
+    assert index.similar("pipette") == []
+
+
+def test_trackers_of_a_store_share_one_index_built_once(tmp_path, monkeypatch):
+    embedder = TopicEmbedder()
+    monkeypatch.setattr(evidence_vectors, "default_embedder", lambda: embedder)
+    path = str(tmp_path / "evidence.json")
+    # Evidence recorded before the index was enabled
+    plain = EvidenceTracker(storage_path=path, storage_mode="sqlite")
+    plain.add_evidence("warranty", "market_research", "AI Research", "Centrifuge warranty", "Researcher")
+    plain.add_evidence("gloves", "web", "AI Research", "Pipette gloves", "Researcher")
+    plain.close()
+
+    vectors = str(tmp_path / "db")
+    first = EvidenceTracker(storage_path=path, storage_mode="sqlite", vector_db_path=vectors)
+    assert embedder.embedded == 2
+    second = EvidenceTracker(storage_path=path, storage_mode="sqlite", vector_db_path=vectors)
+    assert embedder.embedded == 2
+    assert first._vectors is second._vectors is shared_vector_index(vectors)
+
+    assert _ids(second.similar("centrifuge", k=1)) == ["warranty"]
+    first.add_evidence("grants", "market_research", "AI Research", "Centrifuge grant centrifuge", "Researcher")
+    first.delete_evidence("warranty")
+    assert _ids(second.similar("centrifuge"))[0] == "grants"
+    assert "warranty" not in _ids(second.similar("centrifuge"))
+    assert EvidenceTracker(storage_path=path, storage_mode="sqlite").similar("centrifuge") == []
+    first.close()
+    second.close()
@@ -0,0 +1,201 @@
+"""
+Background crew jobs: bounded workers, progress, persisted results and restart recovery.
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+from utils.jobs import JobRunner
+
+
+def test_job_result_and_progress_are_persisted(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    release = threading.Event()
+
+    def job(progress):
+        progress("Searching")
+        release.wait(5)
+        return "REPORT"
+
+    job_id = runner.submit("market_research", job, {"idea_description": "ADHD game", "assumptions": ["a"]})
+    deadline = time.time() + 5
+    while runner.get(job_id)["progress"] != "Searching" and time.time() < deadline:
+        time.sleep(0.01)
+    assert runner.get(job_id)["status"] == "running"
+    release.set()
+
+    job = runner.wait(job_id, timeout=5)
+    assert (job["status"], job["result"]) == ("done", "REPORT")
+    assert job["params"] == {"idea_description": "ADHD game", "assumptions": ["a"]}
+    runner.close()
+
+    # Another server process (or a reconnecting session) reads the same result
+    reopened = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    assert reopened.get(job_id)["result"] == "REPORT"
+    assert reopened.jobs()[0]["result"] is None
+
+
+def test_failures_are_recorded(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"))
+
+    def job(progress):
+        raise ConnectionError("API unreachable")
+
+    job = runner.wait(runner.submit("analysis", job), timeout=5)
+    assert job["status"] == "failed"
+    assert job["error"] == "ConnectionError: API unreachable"
+
+
+def test_jobs_stopped_by_base_exceptions_are_recorded(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"))
+
+    def job(progress):
+        raise SystemExit("crew aborted")
+
+    job = runner.wait(runner.submit("analysis", job), timeout=5)
+    assert job["status"] == "failed"
+    assert job["error"] == "SystemExit: crew aborted"
+    # The worker survives for the next job
+    assert runner.wait(runner.submit("analysis", lambda progress: "ok"), timeout=5)["result"] == "ok"
+    runner.close()
+
+
+def test_workers_cap_concurrent_jobs(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"), max_workers=2)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def job(progress):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return "ok"
+
+    job_ids = [runner.submit("analysis", job) for _ in range(5)]
+    assert runner.active() >= 3
+    assert all(runner.wait(job_id, timeout=5)["status"] == "done" for job_id in job_ids)
+    assert peak[0] == 2
+    assert runner.active() == 0
+
+
+# A server process that queues two jobs and dies while the first is running
+CRASHING_SERVER = """
+import os, sys, time
+sys.path.insert(0, sys.argv[2])
+from utils.jobs import JobRunner
+runner = JobRunner(sys.argv[1], max_workers=1)
+running = runner.submit("analysis", lambda progress: time.sleep(60))
+queued = runner.submit("analysis", lambda progress: "never")
+while runner.get(running)["status"] != "running":
+    time.sleep(0.01)
+print(running, queued, flush=True)
+os._exit(1)
+"""
+
+
+def test_jobs_of_a_crashed_server_fail_on_the_next_start(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    crashed = subprocess.run([sys.executable, "-c", CRASHING_SERVER, path, src],
+                             capture_output=True, text=True, timeout=60)
+    job_ids = crashed.stdout.split()
+    assert len(job_ids) == 2, crashed.stderr
+
+    restarted = JobRunner(path)
+    for interrupted in job_ids:
+        assert restarted.get(interrupted)["status"] == "failed"
+        assert restarted.get(interrupted)["error"] == "Interrupted by a server restart"
+
+
+def test_another_server_leaves_live_jobs_alone(tmp_path):
+    first = JobRunner(str(tmp_path / "jobs.sqlite3"), max_workers=1)
+    release = threading.Event()
+    job_id = first.submit("analysis", lambda progress: release.wait(5) and "REPORT")
+
+    # A second server process (or worker) starting on the same database
+    second = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    assert second.get(job_id)["status"] in ("queued", "running")
+    release.set()
+    assert second.wait(job_id, timeout=5)["result"] == "REPORT"
+
+
+def test_jobs_of_a_silent_server_fail_once_its_heartbeat_is_stale(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"), heartbeat=0.2)
+    # A server elsewhere that stopped beating without exiting cleanly
+    conn = sqlite3.connect(str(tmp_path / "jobs.sqlite3"))
+    with conn:
+        conn.execute("INSERT INTO runners VALUES ('1:lost', 'another-host', 1, ?)", (time.time(),))
+        conn.execute("INSERT INTO jobs (id, kind, status, owner) VALUES ('lost', 'analysis', 'running', '1:lost')")
+    conn.close()
+    assert runner.get("lost")["status"] == "running"
+    job = runner.wait("lost", timeout=5)
+    assert job["status"] == "failed"
+    runner.close()
+
+
+def test_identical_requests_share_one_run(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    release = threading.Event()
+    runs = []
+
+    def job(progress):
+        runs.append(1)
+        release.wait(5)
+        return "REPORT"
+
+    joined = []
+    first = runner.submit("analysis", job, key="analysis:abc", on_coalesced=lambda: joined.append("first"))
+    assert runner.submit("analysis", job, key="analysis:abc", on_coalesced=lambda: joined.append("second")) == first
+    # Only the request that joined a run hears about it, e.g. to return the agents it built
+    assert joined == ["second"]
+    other = runner.submit("analysis", job, key="analysis:xyz")
+    assert other != first
+    assert runner.coalesced == 1
+    release.set()
+    assert runner.wait(first, timeout=5)["result"] == "REPORT"
+    runner.wait(other, timeout=5)
+    assert len(runs) == 2
+
+    # Once finished, the same request runs again (the crew result cache answers repeats)
+    deadline = time.time() + 5
+    while runner.submit("analysis", lambda progress: "again", key="analysis:abc") == first:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_servers_sharing_a_database_share_one_run(tmp_path):
+    first = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    second = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    release = threading.Event()
+    runs = []
+
+    def job(progress):
+        runs.append(1)
+        release.wait(5)
+        return "REPORT"
+
+    job_id = first.submit("analysis", job, key="analysis:abc")
+    # The key is claimed in the database, not in the process that queued it
+    assert second.submit("analysis", job, key="analysis:abc") == job_id
+    assert second.coalesced == 1
+    release.set()
+    assert second.wait(job_id, timeout=5)["result"] == "REPORT"
+    assert len(runs) == 1
+    assert second.submit("analysis", lambda progress: "again", key="analysis:abc") != job_id
+    first.close()
+    second.close()
+
+
+def test_structured_results_are_kept_with_the_text(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"))
+    job_id = runner.submit("analysis", lambda progress: ("REPORT", {"schema": "AnalysisReport", "report": {}}))
+    job = runner.wait(job_id, timeout=5)
+    assert (job["result"], job["structured"]) == ("REPORT", {"schema": "AnalysisReport", "report": {}})
+    assert runner.wait(runner.submit("analysis", lambda progress: "TEXT"), timeout=5)["structured"] is None
+    assert runner.jobs()[0]["structured"] is None
+    runner.close()
@@ -0,0 +1,101 @@
+"""
+Repairs of the JSON summaries agents end their answers with.
+"""
+import json
+
+from utils.json_extract import extract_json
+
+SUMMARY = """{
+    "key_assumptions": [
+        {"assumption": "Parents pay for focus training", "reasoning": "They already pay for tutoring"},
+        {"assumption": "Kids play ten minutes a day", "reasoning": "Pilot with 12 families"}
+    ],
+    "next_steps": ["Interview 10 parents", "Build a clickable prototype"],
+    "bmc_elements": {"customer_segments": "Parents of kids with ADHD", "channels": "Schools"},
+    "confidence": 3
+}"""
+
+EXPECTED = json.loads(SUMMARY)
+
+
+def _strings(value):
+    """Every key and string value in a parsed JSON value."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, str):
+        yield value
+
+
+def _lists(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _lists(item)
+    elif isinstance(value, list):
+        yield value
+        for item in value:
+            yield from _lists(item)
+
+
+def test_summary_is_found_after_prose_with_braces():
+    text = 'The {core} idea holds.\n' + SUMMARY + '\nLet me know if {anything} is unclear.'
+    assert extract_json(text, required_key="key_assumptions") == EXPECTED
+    assert extract_json('{"note": "a } in a string", "key_assumptions": []}') == {
+        "note": "a } in a string", "key_assumptions": []
+    }
+
+
+def test_trailing_commas_are_dropped():
+    assert extract_json('{"next_steps": ["a", "b",], "risk": "c",\n}') == {"next_steps": ["a", "b"], "risk": "c"}
+
+
+def test_smart_quotes_become_plain_quotes():
+    assert extract_json('{“assumption”: “Parents pay”, "reasoning": “Tutoring spend”}') == {
+        "assumption": "Parents pay", "reasoning": "Tutoring spend"
+    }
+
+
+def test_mismatched_brackets_are_closed_in_order():
+    assert extract_json('{"next_steps": ["a", "b"}') == {"next_steps": ["a", "b"]}
+    assert extract_json('{"key_assumptions": [{"assumption": "a"]}') == {"key_assumptions": [{"assumption": "a"}]}
+
+
+def test_required_key_skips_other_objects():
+    text = SUMMARY + '\n{"unrelated": true}'
+    assert extract_json(text) == {"unrelated": True}
+    assert extract_json(text, required_key="key_assumptions") == EXPECTED
+    assert extract_json(text, required_key="missing") is None
+
+
+def test_truncated_summaries_keep_only_complete_values_and_items():
+    complete_strings = set(_strings(EXPECTED))
+    complete_items = EXPECTED["key_assumptions"]
+    for end in range(len(SUMMARY) + 1):
+        data = extract_json("ANALYSIS: promising\n" + SUMMARY[:end])
+        assert data is None or isinstance(data, dict), end
+        if not data:
+            continue
+        # Nothing cut off mid-string, and no list item that was only partly written
+        assert set(_strings(data)) <= complete_strings, (end, data)
+        assert all(item not in ({}, [], None, "") for items in _lists(data) for item in items), (end, data)
+        for item in data.get("key_assumptions", []):
+            assert item in complete_items, (end, data)
+        if "confidence" in data:
+            assert data["confidence"] == 3, (end, data)
+    assert extract_json(SUMMARY) == EXPECTED
+
+
+def test_truncation_inside_an_item_keeps_the_items_before_it():
+    cut = SUMMARY[:SUMMARY.index("Kids play") + 4]
+    assert extract_json(cut, required_key="key_assumptions") == {"key_assumptions": EXPECTED["key_assumptions"][:1]}
+    cut = SUMMARY[:SUMMARY.index("clickable")]
+    assert extract_json(cut)["next_steps"] == ["Interview 10 parents"]
+    # Members of an object that is not a list item are kept up to the last complete one
+    cut = SUMMARY[:SUMMARY.index("Schools") + 3]
+    assert extract_json(cut)["bmc_elements"] == {"customer_segments": "Parents of kids with ADHD"}
+    # Cut inside the only item: there is no complete assumption to return
+    assert extract_json(SUMMARY[:SUMMARY.index("tutoring")], required_key="key_assumptions") is None
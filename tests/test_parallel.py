@@ -0,0 +1,109 @@
+"""
+Independent crews run concurrently: results arrive as each call finishes, failures stay isolated,
+and a task graph runs each step as soon as the steps it depends on are done.
+"""
+import time
+
+import pytest
+
+from utils.parallel import TaskGraph, TaskGraphError, run_concurrently
+
+
+def _sleep_then(seconds, value):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_calls_overlap_and_finish_in_completion_order():
+    calls = {"slow": _sleep_then(0.3, "s"), "fast": _sleep_then(0.05, "f"), "mid": _sleep_then(0.15, "m")}
+    started = time.perf_counter()
+    finished = [(name, result) for name, result, error in run_concurrently(calls)]
+    elapsed = time.perf_counter() - started
+    assert finished == [("fast", "f"), ("mid", "m"), ("slow", "s")]
+    # About the slowest call, not the sum of all three
+    assert elapsed < 0.45
+
+
+def test_a_failed_call_does_not_stop_the_others():
+    def fail():
+        raise RuntimeError("rate limited")
+
+    outcomes = {name: (result, error) for name, result, error in
+                run_concurrently({"bad": fail, "good": _sleep_then(0.05, "ok")})}
+    assert outcomes["good"] == ("ok", None)
+    assert outcomes["bad"][0] is None and isinstance(outcomes["bad"][1], RuntimeError)
+
+
+def test_max_workers_bounds_concurrency():
+    calls = {str(i): _sleep_then(0.1, i) for i in range(4)}
+    started = time.perf_counter()
+    assert len(list(run_concurrently(calls, max_workers=2))) == 4
+    assert time.perf_counter() - started >= 0.2
+
+
+def _step(seconds, name, seen, fail=None):
+    def step(inputs):
+        seen[name] = inputs
+        time.sleep(seconds)
+        if name == fail:
+            raise RuntimeError("model error")
+        return name.upper()
+    return step
+
+
+def _pipeline(seen, fail=None):
+    graph = TaskGraph()
+    graph.add("analysis", _step(0.1, "analysis", seen, fail))
+    graph.add("market", _step(0.2, "market", seen, fail), depends_on=["analysis"])
+    graph.add("segment", _step(0.2, "segment", seen, fail), depends_on=["analysis"])
+    graph.add("competitors", _step(0.3, "competitors", seen, fail))
+    graph.add("plan", _step(0.1, "plan", seen, fail), depends_on=["analysis", "market", "segment"])
+    graph.add("bmc", _step(0.1, "bmc", seen, fail), depends_on=["market", "competitors"])
+    return graph
+
+
+def test_steps_run_along_the_critical_path_with_only_their_inputs():
+    seen = {}
+    started = time.perf_counter()
+    results = _pipeline(seen).run()
+    elapsed = time.perf_counter() - started
+    assert results == {name: name.upper() for name in ("analysis", "market", "segment", "competitors", "plan", "bmc")}
+    assert seen["plan"] == {"analysis": "ANALYSIS", "market": "MARKET", "segment": "SEGMENT"}
+    assert seen["bmc"] == {"market": "MARKET", "competitors": "COMPETITORS"}
+    assert seen["analysis"] == {}
+    # Critical path analysis -> market -> plan/bmc is 0.4s; the steps add up to 1.0s
+    assert elapsed < 0.7
+
+
+def test_failures_skip_downstream_steps_only():
+    seen, finished = {}, []
+    with pytest.raises(TaskGraphError) as raised:
+        _pipeline(seen, fail="market").run(on_done=lambda name, output, error: finished.append(name))
+    assert set(raised.value.errors) == {"market", "plan", "bmc"}
+    assert set(raised.value.results) == {"analysis", "segment", "competitors"}
+    assert "plan" not in seen and "bmc" not in seen
+    assert sorted(finished) == sorted(["analysis", "market", "segment", "competitors", "plan", "bmc"])
+
+
+def test_max_workers_limits_parallel_steps():
+    seen = {}
+    started = time.perf_counter()
+    _pipeline(seen).run(max_workers=1)
+    assert time.perf_counter() - started >= 1.0
+
+
+def test_invalid_graphs_are_rejected():
+    graph = TaskGraph()
+    graph.add("a", lambda inputs: 1, depends_on=["b"])
+    graph.add("b", lambda inputs: 2, depends_on=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        graph.run()
+
+    graph = TaskGraph()
+    graph.add("a", lambda inputs: 1, depends_on=["missing"])
+    with pytest.raises(ValueError, match="unknown"):
+        graph.order()
+    with pytest.raises(ValueError, match="Duplicate"):
+        graph.add("a", lambda inputs: 1)
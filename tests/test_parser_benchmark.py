@@ -0,0 +1,304 @@
+"""
+Throughput and worst-case checks for every parser of agent output.
+
+Each entry point is fed synthetic reports in the task formats and adversarial inputs at
+1 KB, 100 KB and 1 MB. A test fails if one run exceeds its size's time budget, or if going
+from 100 KB to 1 MB costs far more than the 10x a linear parser needs, which is how
+catastrophic backtracking shows up. Timings are listed in the "parser benchmark" section
+of the pytest summary. The session cache of parsed reports is tested at the end.
+"""
+import gc
+import time
+
+import pytest
+import streamlit as st
+
+import main
+from agents.orchestrator import OrchestratorAgent
+from ui.bmc_visualization import extract_bmc_from_json
+from config.settings import REPORT_CACHE_SIZE
+from utils.report_parser import RECORDS, SECTIONS, ReportCache, numbered_items, parse_report
+
+KB = 1024
+SIZES = (KB, 100 * KB, 1024 * KB)
+# Wall-clock budget for one call at each size
+BUDGET_SECONDS = {KB: 0.05, 100 * KB: 0.5, 1024 * KB: 5.0}
+# A linear parser takes ~10x longer on 1 MB than on 100 KB; quadratic behaviour takes ~100x
+MAX_SCALING = 30
+# Times below this are mostly noise and are not used for the scaling check
+NOISE_FLOOR_SECONDS = 0.002
+
+ANALYSIS = """INITIAL THOUGHTS: A marketplace for refurbished lab equipment.
+University labs are under budget pressure and resell little of what they own.
+
+ASSUMPTION: Labs will buy used equipment if it comes with a warranty
+REASONING: Lab managers said reliability matters more than price.
+ASSUMPTION: Sellers will list idle equipment
+REASONING: Storage space is scarce and idle gear has no resale channel.
+
+RISK: Liability for equipment that fails in use
+POTENTIAL IMPACT: Refunds and reputational damage in a small community.
+
+NEXT STEPS:
+1. Interview 10 lab managers
+2. Build a landing page with three sample listings
+3. Test a 10% commission
+
+VALIDATION NEEDED: Willingness to pay for a warranty
+METHOD: Smoke test with two price points
+
+BMC ELEMENT - Customer Segments: University and biotech labs
+BMC ELEMENT - Value Propositions: Certified used equipment at half the price
+"""
+
+SUMMARY = """{
+    "key_assumptions": [
+        {"assumption": "Labs will buy used equipment", "reasoning": "Budget pressure"}
+    ],
+    "risks_and_challenges": [{"risk": "Liability", "impact": "Refunds"}],
+    "next_steps": ["Interview 10 lab managers"],
+    "validations_needed": [{"validation": "Warranty", "method": "Smoke test"}],
+    "bmc_elements": {"customer_segments": "Labs", "value_proposition": "Cheaper gear"}
+}
+"""
+
+MARKET_RESEARCH = """MARKET SIZE AND TRENDS: $2B worldwide, growing 5% a year.
+
+COMPETITOR: LabX
+DESCRIPTION: Marketplace for used lab equipment
+STRENGTHS: - brand - inventory
+WEAKNESSES: - high fees - no warranty
+BUSINESS MODEL: Commission
+MARKET SHARE: 20%
+TARGET AUDIENCE: Labs and resellers
+SOURCE: https://www.labx.com
+
+PAIN POINT: New equipment is too expensive
+EVIDENCE: Forum threads from lab managers
+CUSTOMER QUOTE: We could not afford a new centrifuge this year
+SOURCE: https://www.reddit.com/r/labrats
+
+MODEL TYPE: Commission
+PRICE RANGE: 5-15%
+VALUE METRICS: Per sale
+COMPETITOR EXAMPLES: LabX
+SOURCE: https://www.labx.com/fees
+
+TREND: Research budget cuts
+EVIDENCE: NIH funding data
+IMPACT ON BUSINESS: More demand for used equipment
+SOURCE: https://www.nih.gov
+
+ASSUMPTION: Labs want cheaper equipment
+EVIDENCE: Survey of 200 labs
+CONCLUSION: Validated
+CONFIDENCE: High
+SOURCES: https://example.org/survey
+
+RECOMMENDATIONS: 1. Focus on centrifuges 2. Offer warranties 3. Partner with universities
+"""
+
+COMPETITOR_ANALYSIS = """COMPETITOR LANDSCAPE: DIRECT COMPETITORS: LabX
+INDIRECT COMPETITORS: eBay
+POTENTIAL FUTURE COMPETITORS: Amazon Business
+
+NAME: LabX
+COMPANY SIZE: 50 employees
+FOUNDING DATE: 2010
+BUSINESS MODEL: Commission
+TARGET CUSTOMERS: Labs
+UNIQUE VALUE PROPOSITION: Specialist marketplace
+KEY FEATURES: Search, auctions
+PRICING STRATEGY: 10% fee
+GO-TO-MARKET STRATEGY: SEO and trade shows
+STRENGTHS: - brand
+WEAKNESSES: - fees - dated UX
+SOURCE: https://www.labx.com
+
+COMPETITOR: LabX
+POSITIVE FEEDBACK: - selection
+NEGATIVE FEEDBACK: - fees
+SOURCE: https://www.trustpilot.com
+
+COMPETITIVE STRATEGY: 1. Offer a warranty 2. Undercut fees
+"""
+
+PROSE = "Most labs still track equipment in spreadsheets (about 40%, see https://example.org/a). "
+
+INPUTS = {
+    # Well-formed reports, repeated to size; analysis reports end in their JSON summary
+    "analysis": (ANALYSIS, SUMMARY),
+    "market_research": (MARKET_RESEARCH, ""),
+    "competitor_analysis": (COMPETITOR_ANALYSIS, ""),
+    # Records that never reach their last field: the old lazy multi-group regexes
+    # backtracked over the rest of the text from every COMPETITOR:
+    "missing_markers": ("COMPETITOR: x\nDESCRIPTION: y\nSTRENGTHS: z\n" + PROSE, ""),
+    "repeated_markers": ("ASSUMPTION: RISK: ASSUMPTION VALIDATION: BMC ELEMENT - x: ", ""),
+    # BMC element prefixes whose names never end in a colon: a pattern that reads each name
+    # up to the next colon rescans the rest of the line from every prefix
+    "bmc_without_colon": ("BMC ELEMENT - ", ""),
+    "numbered_section": ("NEXT STEPS: " + "1. step 2.5% 3. " * 10, ""),
+    "capital_runs": ("ASSUMPTION VALIDATION RISK NAME " * 4 + "\n", ""),
+    "colon_soup": ("A: B:: RISK:NAME:{:}: ", ""),
+    "unclosed_json": ('{"assumption": "x", "reasoning": "y {z}"}, ', '{"key_assumptions": ['),
+    "deep_braces": ("{[", '{"key_assumptions": '),
+    "stray_closers": ("}]", ""),
+    "unterminated_string": ("{ \\\" “ ", '{"key_assumptions": ["'),
+}
+
+
+def _build(name, size):
+    unit, prefix = INPUTS[name]
+    if name == "analysis":
+        body = (unit * (size // len(unit) + 1))[:max(size - len(prefix), 0)]
+        return body + prefix
+    return (prefix + unit * (size // len(unit) + 1))[:size]
+
+
+def _display_views(text):
+    # Everything the display functions in main.py read from a report
+    document = parse_report(text)
+    for kind in RECORDS:
+        document.records(kind)
+    for marker in SECTIONS:
+        section = document.section(marker)
+        if section:
+            numbered_items(section)
+    document.bmc_elements()
+
+
+def _main_extract_section(text):
+    st.session_state.pop("report_cache", None)  # time the parse, not the session cache
+    main.extract_section(text, "NEXT STEPS")
+
+
+def _main_extract_json_summary(text):
+    st.session_state.pop("report_cache", None)
+    main.extract_json_summary(text)
+
+
+def _orchestrator_extract_assumptions(text):
+    # extract_assumptions only reads its argument; skip building the crewai agent
+    OrchestratorAgent.extract_assumptions(OrchestratorAgent.__new__(OrchestratorAgent), text)
+
+
+ENTRY_POINTS = {
+    "main.display_*": _display_views,
+    "main.extract_section": _main_extract_section,
+    "main.extract_json_summary": _main_extract_json_summary,
+    "OrchestratorAgent.extract_assumptions": _orchestrator_extract_assumptions,
+    "extract_bmc_from_json": extract_bmc_from_json,
+}
+
+
+def _time(func, text, repeat):
+    # Like timeit, keep the garbage collector out of the measurement: its full collections
+    # grow with everything else alive in the test process, not with the parser's input
+    best = None
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(text)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best
+
+
+@pytest.mark.parametrize("input_name", list(INPUTS))
+@pytest.mark.parametrize("entry_point", list(ENTRY_POINTS))
+def test_parser_scales_linearly(entry_point, input_name, record_property):
+    func = ENTRY_POINTS[entry_point]
+    timings = {}
+    for size in SIZES:
+        text = _build(input_name, size)
+        assert len(text) == size
+        timings[size] = _time(func, text, repeat=3 if size < SIZES[-1] else 1)
+        record_property("benchmark", (entry_point, input_name, size, timings[size]))
+
+    for size, elapsed in timings.items():
+        assert elapsed < BUDGET_SECONDS[size], (
+            f"{entry_point} took {elapsed * 1000:.1f} ms on {size // KB} KB of {input_name}"
+        )
+    ratio = timings[SIZES[-1]] / max(timings[SIZES[-2]], NOISE_FLOOR_SECONDS)
+    assert ratio < MAX_SCALING, (
+        f"{entry_point} on {input_name}: 1 MB took {ratio:.0f}x as long as 100 KB"
+    )
+
+
+def test_parsers_extract_the_recorded_reports():
+    """The benchmarked inputs are real parses, not early exits."""
+    analysis = ANALYSIS + SUMMARY
+    document = parse_report(analysis)
+    assert [r["ASSUMPTION"] for r in document.records("assumption")] == [
+        "Labs will buy used equipment if it comes with a warranty",
+        "Sellers will list idle equipment",
+    ]
+    assert numbered_items(document.section("NEXT STEPS"))[0] == "Interview 10 lab managers"
+    assert document.bmc_elements()[0] == ("Customer Segments", "University and biotech labs")
+    assert extract_bmc_from_json(analysis)["customer_segments"] == "Labs"
+    assert _assumptions(analysis) == ["Labs will buy used equipment"]
+    # Without a summary the assumptions come from the markers
+    assert len(_assumptions(ANALYSIS)) == 2
+    # A summary cut off inside its only assumption has no complete one, so the markers are used
+    assert len(_assumptions(ANALYSIS + SUMMARY[:SUMMARY.index("Budget") + 3])) == 2
+
+    research = parse_report(MARKET_RESEARCH)
+    competitor = research.records("competitor")[0]
+    assert competitor["COMPETITOR"] == "LabX"
+    assert competitor["SOURCE"] == "https://www.labx.com"
+    assert research.records("assumption_validation")[0]["CONCLUSION"] == "Validated"
+
+    profiles = parse_report(COMPETITOR_ANALYSIS)
+    assert profiles.records("competitor_profile")[0]["GO-TO-MARKET STRATEGY"] == "SEO and trade shows"
+    assert profiles.sections["COMPETITOR LANDSCAPE"].get("INDIRECT COMPETITORS") == "eBay"
+
+
+def _assumptions(text):
+    return OrchestratorAgent.extract_assumptions(OrchestratorAgent.__new__(OrchestratorAgent), text)
+
+
+def test_report_cache_hits_reuse_the_parsed_document():
+    cache = ReportCache()
+    document = cache.get(ANALYSIS)
+    document.records("assumption")
+    assert cache.get(ANALYSIS) is document
+    assert cache.get(ANALYSIS + "\n") is not document
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+
+def test_report_cache_evicts_the_least_recently_used_report():
+    reports = [f"INITIAL THOUGHTS: idea {n}" for n in range(REPORT_CACHE_SIZE + 1)]
+    st.session_state.pop("report_cache", None)
+    cache = main.get_report_cache()
+    assert cache.max_entries == REPORT_CACHE_SIZE
+    first = main.get_report(reports[0])
+    for text in reports[1:REPORT_CACHE_SIZE]:
+        main.get_report(text)
+    # Reading the oldest report again makes the second one the least recently used
+    assert main.get_report(reports[0]) is first
+    main.get_report(reports[REPORT_CACHE_SIZE])
+    assert len(cache) == REPORT_CACHE_SIZE
+    assert main.get_report(reports[0]) is first
+    misses = cache.misses
+    main.get_report(reports[1])
+    assert cache.misses == misses + 1
+    st.session_state.pop("report_cache", None)
+
+
+def test_report_cache_put_keeps_a_prebuilt_document():
+    cache = ReportCache(max_entries=2)
+    prebuilt = parse_report(ANALYSIS)
+    cache.put(ANALYSIS, prebuilt)
+    assert cache.get(ANALYSIS) is prebuilt
+    # A document that is already cached is not replaced, only marked as recently used
+    cache.put("INITIAL THOUGHTS: other", parse_report("INITIAL THOUGHTS: other"))
+    cache.put(ANALYSIS, parse_report(ANALYSIS))
+    assert cache.get(ANALYSIS) is prebuilt
+    cache.put("INITIAL THOUGHTS: third", parse_report("INITIAL THOUGHTS: third"))
+    assert len(cache) == 2
+    assert cache.get(ANALYSIS) is prebuilt
+    assert cache.hits == 3 and cache.misses == 0
@@ -0,0 +1,100 @@
+"""
+Cached web search: normalized keys, persistence, TTL and coalescing of concurrent searches.
+"""
+import threading
+import time
+
+from crewai_tools import SerperDevTool
+
+from tools.search_cache import CachedSerperDevTool, search_key
+from utils.disk_cache import DiskCache
+from utils.single_flight import SingleFlight
+
+
+def _tool(tmp_path, monkeypatch, delay=0.0, ttl=None):
+    searches = []
+
+    def search(self, **kwargs):
+        searches.append(kwargs)
+        time.sleep(delay)
+        return {"organic": [{"title": f"Result for {kwargs['search_query']}"}]}
+
+    monkeypatch.setattr(SerperDevTool, "_run", search)
+    tool = CachedSerperDevTool(
+        result_cache=DiskCache(str(tmp_path / "search.sqlite3")), ttl=ttl, in_flight=SingleFlight()
+    )
+    return tool, searches
+
+
+def test_search_key_normalizes_the_query_but_not_settings():
+    settings = {"n_results": 10, "country": None}
+    assert search_key({"search_query": "ADHD  market size"}, settings) == \
+        search_key({"search_query": "adhd market size "}, settings)
+    assert search_key({"search_query": "ADHD market size"}, settings) != \
+        search_key({"search_query": "ADHD market size"}, {"n_results": 20, "country": None})
+
+
+def test_repeated_queries_search_once(tmp_path, monkeypatch):
+    tool, searches = _tool(tmp_path, monkeypatch)
+    first = tool._run(search_query="ADHD market size 2024")
+    assert tool._run(search_query="adhd market size 2024") == first
+    assert len(searches) == 1
+    assert tool.result_cache.stats()["hits"] == 1
+
+    # A new tool on the same file (another session or process) reuses the result
+    other = CachedSerperDevTool(result_cache=DiskCache(str(tmp_path / "search.sqlite3")))
+    assert other._run(search_query="ADHD market size 2024") == first
+    assert len(searches) == 1
+
+
+def test_expired_results_are_searched_again(tmp_path, monkeypatch):
+    tool, searches = _tool(tmp_path, monkeypatch, ttl=0.05)
+    tool._run(search_query="educational games market size")
+    time.sleep(0.1)
+    tool._run(search_query="educational games market size")
+    assert len(searches) == 2
+
+
+def test_concurrent_identical_queries_are_coalesced(tmp_path, monkeypatch):
+    tool, searches = _tool(tmp_path, monkeypatch, delay=0.2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(tool._run(search_query="ADHD apps")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(searches) == 1
+    assert len(results) == 5 and all(result == results[0] for result in results)
+    assert tool.in_flight.shared == 4
+
+
+def test_single_flight_shares_errors_and_forgets_finished_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("quota exceeded")
+
+    def follower():
+        started.wait()
+        try:
+            flight.do("q", lambda: "never run")
+        except ValueError as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    try:
+        flight.do("q", fail)
+    except ValueError as error:
+        errors.append(error)
+    thread.join()
+    assert len(errors) == 2
+    assert flight.in_flight() == 0
+    assert flight.do("q", lambda: "fresh") == "fresh"
@@ -0,0 +1,76 @@
+"""
+Reports found again by the similarity of their request, with the offline hashing embedder
+at its default threshold.
+"""
+from agents.semantic_cache import DEFAULT_THRESHOLD, SemanticReportCache, request_text
+from tools.evidence_vectors import HashingEmbedder
+
+
+def _cache(tmp_path, **options):
+    return SemanticReportCache(str(tmp_path / "db"), embedder=HashingEmbedder(), **options)
+
+
+class _PlainEmbedder:
+    name = "plain-test"
+
+    def embed(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+def test_request_text_joins_idea_and_assumptions():
+    assert request_text(" A game ", ["Kids like it", "", None]) == "A game\nKids like it"
+
+
+def test_reworded_request_finds_the_report(tmp_path):
+    cache = _cache(tmp_path)
+    cache.add("analysis", "Educational game for kids with ADHD", "INITIAL THOUGHTS: promising")
+    cache.add("analysis", "Meal kit delivery for busy nurses", "INITIAL THOUGHTS: crowded")
+
+    match = cache.lookup("analysis", "An educational game for kids with ADHD and their parents")
+    assert match["report"] == "INITIAL THOUGHTS: promising"
+    assert match["idea"] == "Educational game for kids with ADHD"
+    assert 0.5 <= match["score"] <= 1.0
+    assert cache.lookup("analysis", "Accounting software for dentists") is None
+
+
+def test_paraphrased_request_matches_at_the_default_threshold(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.threshold == HashingEmbedder.match_threshold
+    cache.add("analysis", "ADHD learning game for kids", "INITIAL THOUGHTS: promising")
+
+    match = cache.lookup("analysis", "educational game for children with ADHD")
+    assert match["report"] == "INITIAL THOUGHTS: promising"
+    assert cache.lookup("analysis", "Mobile banking for seniors") is None
+    assert cache.lookup("analysis", "Meal kit delivery for busy nurses") is None
+    # An explicit threshold wins; embedders without their own use the module default
+    assert _cache(tmp_path, threshold=0.5).lookup("analysis", "educational game for children with ADHD") is None
+    assert SemanticReportCache(str(tmp_path / "db"), embedder=_PlainEmbedder()).threshold == DEFAULT_THRESHOLD
+
+
+
+def test_kinds_are_kept_apart(tmp_path):
+    cache = _cache(tmp_path)
+    cache.add("analysis", "Educational game for kids with ADHD", "analysis report")
+    assert cache.lookup("market_research", "Educational game for kids with ADHD") is None
+
+    cache.add("market_research", "Educational game for kids with ADHD", "research report",
+              assumptions=["Parents pay for focus training"])
+    match = cache.lookup("market_research", "Educational game for kids with ADHD",
+                         assumptions=["Parents pay for focus training"])
+    assert match["report"] == "research report"
+
+
+def test_same_request_replaces_its_report(tmp_path):
+    cache = _cache(tmp_path)
+    cache.add("analysis", "Educational game for kids with ADHD", "first")
+    cache.add("analysis", "educational  game for kids with ADHD", "second")
+    assert cache.count() == 1
+    assert cache.lookup("analysis", "Educational game for kids with ADHD")["report"] == "second"
+
+
+def test_reports_persist_and_clear(tmp_path):
+    _cache(tmp_path).add("analysis", "Educational game for kids with ADHD", "report")
+    cache = _cache(tmp_path)
+    assert cache.lookup("analysis", "Educational game for kids with ADHD")["report"] == "report"
+    cache.clear()
+    assert cache.lookup("analysis", "Educational game for kids with ADHD") is None
@@ -0,0 +1,136 @@
+"""
+Structured task output renders to the marker format, and the views it builds without
+parsing are the ones the marker parser gets from that rendered text.
+"""
+import json
+
+import pytest
+import streamlit as st
+
+import main
+from agents.orchestrator import OrchestratorAgent
+from agents.schemas import (
+    AnalysisReport, CompetitorProfileReport, MarketResearchReport, SegmentProfileReport,
+)
+from ui.bmc_visualization import extract_bmc_from_json
+from utils.report_parser import RECORDS, SECTIONS, parse_report
+
+ANALYSIS = AnalysisReport(
+    initial_thoughts="A marketplace for refurbished lab equipment.\n\nBudgets are tight.",
+    key_assumptions=[
+        {"assumption": "Labs will buy used equipment with a warranty", "reasoning": "Reliability matters"},
+        {"assumption": "Sellers will list idle equipment", "reasoning": "Storage is scarce"},
+    ],
+    risks_and_challenges=[{"risk": "Liability for failures", "impact": "Refunds"}],
+    next_steps=["Interview 10 lab managers", "Build a landing page"],
+    validations_needed=[{"validation": "Willingness to pay", "method": "Smoke test"}],
+    bmc_elements={"value_proposition": "Certified used equipment", "customer_segments": "University labs"},
+)
+
+MARKET_RESEARCH = MarketResearchReport(
+    market_size_and_trends="$2B worldwide, growing 5% a year",
+    competitors=[{
+        "name": "LabX", "description": "Marketplace", "strengths": ["brand", "inventory"],
+        "weaknesses": ["high fees"], "business_model": "Commission", "market_share": "20%",
+        "target_audience": "Labs", "source": "https://www.labx.com",
+    }],
+    customer_insights=[{"pain_point": "New equipment is expensive", "evidence": "Forums",
+                        "customer_quote": "We could not afford it"}],
+    pricing_models=[{"model_type": "Commission", "price_range": "5-15%", "value_metrics": "Per sale",
+                     "competitor_examples": "LabX", "source": "https://www.labx.com/fees"}],
+    regulatory_factors="Resold medical devices need recertification",
+    market_trends=[{"trend": "Budget cuts", "evidence": "NIH data", "impact_on_business": "More demand"}],
+    assumption_validations=[{"assumption": "Labs want cheaper equipment", "evidence": "Survey",
+                             "conclusion": "Validated", "confidence": "High"}],
+    recommendations=["Focus on centrifuges", "Offer warranties"],
+)
+
+SEGMENT = SegmentProfileReport(
+    segment_profile={"demographics": "Lab managers, 30-50", "psychographics": "Frugal",
+                     "market_size": "40,000 labs", "growth_trends": "Flat"},
+    customer_channels={"online_channels": "r/labrats", "offline_channels": "Trade shows",
+                       "influential_voices": "Core facility directors", "source": "https://example.org"},
+    customer_language=[{"pain_point": "Downtime", "direct_quotes": ["It broke again", "No spare parts"],
+                        "frequency": "Weekly"}],
+    existing_solutions=[{"solution": "eBay", "usage": "Ad hoc", "satisfaction": "Low",
+                         "gaps": "No warranty"}],
+    buying_behavior={"price_sensitivity": "High", "decision_factors": "Warranty",
+                     "purchasing_process": "Purchase orders"},
+    targeting_recommendations=["Start with core facilities"],
+)
+
+COMPETITORS = CompetitorProfileReport(
+    competitor_landscape={"direct_competitors": "LabX", "indirect_competitors": "eBay",
+                          "potential_future_competitors": "Amazon Business"},
+    competitor_profiles=[{
+        "name": "LabX", "company_size": "50 employees", "founding_date": "2010",
+        "business_model": "Commission", "target_customers": "Labs",
+        "unique_value_proposition": "Specialist marketplace", "key_features": "Auctions",
+        "pricing_strategy": "10% fee", "go_to_market_strategy": "SEO", "strengths": ["brand"],
+        "weaknesses": ["fees", "dated UX"], "source": "https://www.labx.com",
+    }],
+    market_positioning={"market_leaders": "LabX", "market_gaps": "Warranties",
+                        "differentiation_factors": "Certification"},
+    customer_feedback=[{"competitor": "LabX", "positive_feedback": ["selection"],
+                        "negative_feedback": ["fees"], "source": "https://www.trustpilot.com"}],
+    competitive_strategy=["Offer a warranty", "Undercut fees"],
+)
+
+
+def _views(document):
+    return (
+        {marker: document.sections.get(marker) for marker in SECTIONS},
+        {kind: document.records(kind) for kind in RECORDS},
+        document.bmc_elements(),
+        document.json_summary("key_assumptions"),
+    )
+
+
+@pytest.mark.parametrize("report", [ANALYSIS, MARKET_RESEARCH, SEGMENT, COMPETITORS],
+                         ids=["analysis", "market_research", "segment", "competitors"])
+def test_prebuilt_views_match_the_parsed_report(report):
+    text = report.to_report()
+    assert _views(report.to_document(text)) == _views(parse_report(text))
+
+
+def test_rendered_analysis_feeds_the_text_consumers():
+    text = ANALYSIS.to_report()
+    document = parse_report(text)
+    assert document.section("INITIAL THOUGHTS") == "A marketplace for refurbished lab equipment.\nBudgets are tight."
+    assert [record["ASSUMPTION"] for record in document.records("assumption")] == [
+        "Labs will buy used equipment with a warranty", "Sellers will list idle equipment",
+    ]
+    assert ("Value Proposition", "Certified used equipment") in document.bmc_elements()
+    assert extract_bmc_from_json(text)["customer_segments"] == "University labs"
+    assumptions = OrchestratorAgent.extract_assumptions(OrchestratorAgent.__new__(OrchestratorAgent), text)
+    assert assumptions == ["Labs will buy used equipment with a warranty", "Sellers will list idle equipment"]
+
+
+def test_optional_sources_are_left_out():
+    document = MARKET_RESEARCH.to_document()
+    assert "SOURCE" not in document.records("insight")[0].fields
+    assert document.records("competitor")[0]["STRENGTHS"] == "- brand - inventory"
+
+
+def test_a_structured_job_result_is_displayed_without_parsing():
+    class Output:
+        pydantic = ANALYSIS
+        raw = "unused"
+
+    text, structured = main.report_result(Output())
+    assert text == ANALYSIS.to_report()
+    st.session_state.pop("report_cache", None)
+    # As stored with a finished job and read back from the jobs table
+    main.cache_structured_report(text, json.loads(json.dumps(structured)))
+    document = main.get_report(text)
+    assert document.fields == []
+    assert _views(document) == _views(parse_report(text))
+
+
+def test_a_parsed_report_without_markers_still_finds_its_summary():
+    # No fields and the BMC view already built: only a prebuilt document skips the search
+    document = parse_report('{"note": "draft"}\n{"key_assumptions": ["Labs buy used"]}')
+    assert document.bmc_elements() == []
+    assert document.json_summary() == {"key_assumptions": ["Labs buy used"]}
+    assert document.json_summary("key_assumptions") == {"key_assumptions": ["Labs buy used"]}
+    assert MARKET_RESEARCH.to_document().json_summary("key_assumptions") is None
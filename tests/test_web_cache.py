@@ -0,0 +1,139 @@
+"""
+Page and chunk embedding caches behind the researcher's website tools, in fixture mode
+and with a counting fetcher and embedder (or a fake embeddings API) instead of the network.
+"""
+from types import SimpleNamespace
+import logging
+
+import pytest
+
+from tools import evidence_vectors, web_cache
+from tools.evidence_blobs import content_hash
+from tools.evidence_vectors import HashingEmbedder, OpenAIEmbedder
+from tools.web_cache import (
+    CachedScrapeWebsiteTool, CachedWebsiteSearchTool, EmbeddingCache, PageCache, fixture_name, normalize_url,
+    shared_embedding_cache
+)
+from utils.disk_cache import DiskCache
+
+PAGE = "\n\n".join([
+    "Acme Learning builds focus games for children with ADHD. " * 10,
+    "Pricing: a family subscription costs 9 dollars per month. " * 10,
+    "Our team is based in Berlin and was founded in 2019. " * 10,
+])
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return super().embed(texts)
+
+
+def test_urls_are_normalized():
+    assert normalize_url(" HTTPS://Acme.COM/Pricing/#plans ") == "https://acme.com/Pricing"
+    assert fixture_name("https://www.acme.com/about/") == "www_acme_com_about.txt"
+
+
+def test_pages_are_fetched_once(tmp_path):
+    fetched = []
+    pages = PageCache(DiskCache(str(tmp_path / "pages.sqlite3")), lambda url: fetched.append(url) or PAGE)
+    first = pages.get("https://acme.com/")
+    assert pages.get("https://ACME.com") == first
+    assert fetched == ["https://acme.com"]
+    assert first["text"] == PAGE and first["hash"] == content_hash(PAGE)
+
+    reopened = PageCache(DiskCache(str(tmp_path / "pages.sqlite3")), lambda url: fetched.append(url) or PAGE)
+    assert reopened.text("https://acme.com") == PAGE
+    assert len(fetched) == 1
+
+
+def test_unchanged_chunks_are_not_embedded_again(tmp_path):
+    embedder = CountingEmbedder()
+    embeddings = EmbeddingCache(embedder, DiskCache(str(tmp_path / "embeddings.sqlite3")))
+    first = embeddings.embed(["a chunk", "another chunk", "a chunk"])
+    assert embedder.texts == ["a chunk", "another chunk"]
+    assert first[0] == first[2]
+
+    assert embeddings.embed(["another chunk", "a new chunk"])[0] == first[1]
+    assert embedder.texts == ["a chunk", "another chunk", "a new chunk"]
+    assert embeddings.embedded == 3
+
+
+def test_fixture_mode_serves_pages_without_the_network(tmp_path):
+    (tmp_path / fixture_name("https://acme.com/about")).write_text(PAGE, encoding="utf-8")
+
+    def offline(url):
+        raise AssertionError("fixture mode must not fetch")
+
+    pages = PageCache(None, offline, fixtures_dir=str(tmp_path))
+    scrape = CachedScrapeWebsiteTool(page_cache=pages)
+    assert scrape._run(website_url="https://acme.com/about") == PAGE
+    with pytest.raises(FileNotFoundError):
+        pages.get("https://acme.com/missing")
+
+
+def test_website_search_ranks_cached_chunks(tmp_path):
+    (tmp_path / fixture_name("https://acme.com")).write_text(PAGE, encoding="utf-8")
+    embedder = CountingEmbedder()
+    search = CachedWebsiteSearchTool(
+        page_cache=PageCache(None, lambda url: "", fixtures_dir=str(tmp_path)),
+        embeddings=EmbeddingCache(embedder, DiskCache(str(tmp_path / "embeddings.sqlite3"))),
+        k=1,
+    )
+    assert "9 dollars per month" in search._run(
+        search_query="subscription pricing per month", website_url="https://acme.com"
+    )
+    embedded = len(embedder.texts)
+
+    search._run(search_query="where is the team based", website_url="https://acme.com")
+    # Only the new query was embedded; the page's chunks came from the cache
+    assert len(embedder.texts) == embedded + 1
+
+
+def test_falling_back_to_the_hashing_embedder_is_logged_once(monkeypatch, caplog):
+    def no_model():
+        raise OSError("all-MiniLM-L6-v2 is not in the local cache")
+
+    monkeypatch.setattr(evidence_vectors, "SentenceTransformerEmbedder", no_model)
+    monkeypatch.setattr(evidence_vectors, "_fallback_logged", False)
+    with caplog.at_level(logging.WARNING, logger="tools.evidence_vectors"):
+        assert isinstance(evidence_vectors.default_embedder(), HashingEmbedder)
+        assert isinstance(evidence_vectors.default_embedder(), HashingEmbedder)
+    assert len(caplog.records) == 1
+    assert "hashing embedder" in caplog.records[0].getMessage()
+    assert "not in the local cache" in caplog.records[0].getMessage()
+
+
+class FakeEmbeddingsAPI:
+    """Answers embeddings.create like the OpenAI client, with the items out of order."""
+
+    def __init__(self):
+        self.batches = []
+        self.embeddings = self
+
+    def create(self, model, input):
+        self.batches.append((model, list(input)))
+        data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+def test_website_search_keeps_the_openai_embeddings_unless_local_is_chosen(monkeypatch):
+    shared_embedding_cache.cache_clear()
+    assert shared_embedding_cache().embedder.name == "openai-text-embedding-3-small"
+    shared_embedding_cache.cache_clear()
+    monkeypatch.setattr(web_cache, "WEB_SEARCH_EMBEDDER", "local")
+    monkeypatch.setattr(web_cache, "default_embedder", HashingEmbedder)
+    assert isinstance(shared_embedding_cache().embedder, HashingEmbedder)
+    shared_embedding_cache.cache_clear()
+
+
+def test_openai_embedder_batches_and_keeps_input_order(monkeypatch):
+    embedder = OpenAIEmbedder()
+    embedder._client = api = FakeEmbeddingsAPI()
+    monkeypatch.setattr(OpenAIEmbedder, "batch_size", 2)
+    assert embedder.embed(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert api.batches == [("text-embedding-3-small", ["a", "bb"]), ("text-embedding-3-small", ["ccc"])]